@@ -7,8 +7,12 @@
 # published by the Free Software Foundation.
 
 import sys
+import queue
 import logging
-from . import version, config, option, output, extractor, job, util, exception
+import threading
+import collections
+from . import version, config, option, output, extractor, util, exception
+from . import retry
 
 __author__ = "Mike Fährmann"
 __copyright__ = "Copyright 2014-2023 Mike Fährmann"
@@ -123,6 +127,11 @@ def main():
             from . import formatter
             formatter._SEPARATOR = separator
 
+        # format string code generation
+        if config.get((), "format-compile"):
+            from . import formatter
+            formatter._COMPILE = True
+
         # eval globals
         path = config.get((), "globals")
         if path:
@@ -178,6 +187,7 @@ def main():
         if sources:
             import os
             modules = []
+            extractor._registry = False
 
             for source in sources:
                 if source:
@@ -251,6 +261,8 @@ def main():
                 return config.open_extern()
 
         else:
+            from . import job
+
             input_files = config.get((), "input-files")
             if input_files:
                 for input_file in input_files:
@@ -273,11 +285,14 @@ def main():
                 if config.get(("output",), "fallback", True):
                     jobtype.handle_url = \
                         staticmethod(jobtype.handle_url_fallback)
-            elif args.dump_json:
+            elif args.dump_json or args.json_lines:
                 jobtype = job.DataJob
+                if args.json_lines:
+                    config.set(("output",), "json-stream", "lines")
+                    args.dump_json = args.dump_json or 1
                 jobtype.resolve = args.dump_json - 1
             else:
-                jobtype = args.jobtype or job.DownloadJob
+                jobtype = getattr(job, args.jobtype or "DownloadJob")
 
             input_manager = InputManager()
             input_manager.log = input_log = logging.getLogger("inputfile")
@@ -316,6 +331,12 @@ def main():
                 input_manager.progress(pformat)
 
             # process input URLs
+            jobs = config.get((), "jobs")
+            if jobs and jobs > 1 and issubclass(jobtype, job.DownloadJob):
+                retval = JobScheduler(jobtype, input_manager, jobs).run()
+                retry.log_stats(log)
+                return retval
+
             retval = 0
             for url in input_manager:
                 try:
@@ -348,6 +369,7 @@ def main():
                     input_manager.error()
 
                 input_manager.next()
+            retry.log_stats(log)
             return retval
         return 0
 
@@ -507,25 +529,30 @@ class InputManager():
     def next(self):
         self._index += 1
 
-    def success(self):
-        if self._item:
-            self._rewrite()
+    def success(self, item=util.SENTINEL):
+        if item is util.SENTINEL:
+            item = self._item
+        if item:
+            self._rewrite(item)
 
-    def error(self):
+    def error(self, url=None, item=util.SENTINEL):
+        if item is util.SENTINEL:
+            url = self._url
+            item = self._item
         if self.err:
-            if self._item:
-                url, path, action, indicies = self._item
+            if item:
+                url, path, action, indicies = item
                 lines = self.files[path]
                 out = "".join(lines[i] for i in indicies)
                 if out and out[-1] == "\n":
                     out = out[:-1]
-                self._rewrite()
+                self._rewrite(item)
             else:
-                out = str(self._url)
+                out = str(url)
             self.err.info(out)
 
-    def _rewrite(self):
-        url, path, action, indicies = self._item
+    def _rewrite(self, item):
+        url, path, action, indicies = item
         lines = self.files[path]
         action(lines, indicies)
         try:
@@ -572,6 +599,165 @@ class InputManager():
         return url
 
 
+class JobScheduler():
+    """Run jobs for multiple input URLs concurrently
+
+    At most 'jobs' jobs are active at the same time and at most
+    'category-jobs' (default: 'jobs') of them for URLs of the same
+    extractor category. Input URLs are only read ahead until 'jobs' of them
+    are waiting for a free slot.
+    Input file updates and error file entries are handled
+    on the main thread once a job has finished.
+    Jobs running in worker threads only print skipped and completed files.
+    """
+
+    def __init__(self, jobtype, input_manager, jobs):
+        self.jobtype = jobtype
+        self.input_manager = input_manager
+        self.jobs = jobs
+        self.log = logging.getLogger("gallery-dl")
+
+        self.retval = 0
+        self.active = 0
+        self.categories = {}
+        self.pending = collections.OrderedDict()
+        self.waiting = 0
+        self.done = queue.Queue()
+
+    def run(self):
+        input_manager = self.input_manager
+
+        try:
+            for url in input_manager:
+                if isinstance(url, ExtendedUrl):
+                    # changing config values would affect running jobs
+                    self.wait()
+                    for opts in url.gconfig:
+                        config.set(*opts)
+                    if url.lconfig:
+                        with config.apply(url.lconfig):
+                            self.run_job(url.value, input_manager._item)
+                        input_manager.next()
+                        continue
+                    url = url.value
+
+                extr = extractor.find(url)
+                if extr:
+                    self.submit(url, input_manager._item, extr)
+                else:
+                    self.log.error("Unsupported URL '%s'", url)
+                    self.retval |= 64
+                    input_manager.error(url, input_manager._item)
+
+                input_manager.next()
+
+            self.wait()
+        except BaseException:
+            self.pending.clear()
+            self.waiting = 0
+            raise
+        return self.retval
+
+    def submit(self, url, item, extr):
+        """Queue a job for 'extr' and start it when possible"""
+        category = extr.category
+        entry = (url, item, extr, extr.config("category-jobs") or self.jobs)
+        try:
+            self.pending[category].append(entry)
+        except KeyError:
+            self.pending[category] = collections.deque((entry,))
+        self.waiting += 1
+        self.dispatch()
+
+        while self.waiting >= self.jobs:
+            self.wait_one()
+
+    def run_job(self, url, item, extr=None):
+        """Run a single job in the current thread"""
+        self.log.debug("Starting %s for '%s'", self.jobtype.__name__, url)
+        try:
+            status = self.execute(url, extr)
+        except exception.NoExtractorError:
+            self.log.error("Unsupported URL '%s'", url)
+            self.retval |= 64
+            self.input_manager.error(url, item)
+        else:
+            self.finalize(url, item, status)
+
+    def execute(self, url, extr=None, concurrent=False):
+        while True:
+            try:
+                job = self.jobtype(extr or url)
+                if concurrent:
+                    # concurrent progress output would garble the terminal
+                    from .job import ChildOutput
+                    job.out = ChildOutput(job.out)
+                return job.run()
+            except exception.StopExtraction:
+                return None
+            except exception.TerminateExtraction:
+                return None
+            except exception.RestartExtraction:
+                self.log.debug("Restarting '%s'", url)
+                extr = None
+
+    def finalize(self, url, item, status):
+        if status is None:
+            return
+        if status:
+            self.retval |= status
+            self.input_manager.error(url, item)
+        else:
+            self.input_manager.success(item)
+
+    def dispatch(self):
+        """Start pending jobs until reaching any concurrency limit"""
+        categories = self.categories
+
+        for category, entries in tuple(self.pending.items()):
+            while entries and self.active < self.jobs and \
+                    categories.get(category, 0) < entries[0][3]:
+                entry = entries.popleft()
+                self.waiting -= 1
+                self.active += 1
+                categories[category] = categories.get(category, 0) + 1
+                threading.Thread(
+                    target=self._worker, args=(entry,), daemon=True).start()
+
+            if not entries:
+                del self.pending[category]
+            if self.active >= self.jobs:
+                break
+
+    def wait(self):
+        """Wait until all pending and active jobs are finished"""
+        while self.active:
+            self.wait_one()
+
+    def wait_one(self):
+        """Wait until an active job is finished and handle its result"""
+        entry, status, exc = self.done.get()
+        url, item, extr, _ = entry
+
+        self.active -= 1
+        self.categories[extr.category] -= 1
+        if exc is not None:
+            raise exc
+        self.finalize(url, item, status)
+        self.dispatch()
+
+    def _worker(self, entry):
+        url, item, extr, _ = entry
+        self.log.debug("Starting %s for '%s'", self.jobtype.__name__, url)
+
+        try:
+            status = self.execute(url, extr, True)
+        except BaseException as exc:
+            self.done.put((entry, None, exc))
+        else:
+            self.done.put((entry, status, None))
+
+
 class ExtendedUrl():
     """URL with attached config key-value pairs"""
     __slots__ = ("value", "gconfig", "lconfig")
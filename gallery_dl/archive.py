@@ -9,35 +9,55 @@
 """Download Archives"""
 
 import os
+import math
+import time
+import struct
+import hashlib
 import logging
-from . import util, formatter
+import threading
+from . import util, text, formatter
 
 log = logging.getLogger("archive")
 
 
 def connect(path, prefix, format,
-            table=None, mode=None, pragma=None, kwdict=None, cache_key=None):
+            table=None, mode=None, pragma=None, kwdict=None, cache_key=None,
+            batch_size=None, batch_interval=None, bloom=None):
     keygen = formatter.parse(prefix + format).format_map
 
+    if kwdict is not None and table:
+        table = formatter.parse(table).format_map(kwdict)
+
     if isinstance(path, str) and path.startswith(
             ("postgres://", "postgresql://")):
         if mode == "memory":
-            cls = DownloadArchivePostgresqlMemory
-        else:
-            cls = DownloadArchivePostgresql
+            return DownloadArchivePostgresqlMemory(
+                path, keygen, table, pragma, cache_key)
+        if mode == "batch":
+            return DownloadArchivePostgresqlBatch(
+                path, keygen, table, pragma, cache_key,
+                batch_size, batch_interval)
+        return DownloadArchivePostgresql(
+            path, keygen, table, pragma, cache_key)
+
+    path = util.expand_path(path)
+    if kwdict is not None and "{" in path:
+        path = formatter.parse(path).format_map(kwdict)
+
+    if mode == "memory":
+        archive = DownloadArchiveMemory(
+            path, keygen, table, pragma, cache_key)
+    elif mode == "batch":
+        archive = DownloadArchiveBatch(
+            path, keygen, table, pragma, cache_key,
+            batch_size, batch_interval)
     else:
-        path = util.expand_path(path)
-        if kwdict is not None and "{" in path:
-            path = formatter.parse(path).format_map(kwdict)
-        if mode == "memory":
-            cls = DownloadArchiveMemory
-        else:
-            cls = DownloadArchive
-
-    if kwdict is not None and table:
-        table = formatter.parse(table).format_map(kwdict)
+        archive = DownloadArchive(
+            path, keygen, table, pragma, cache_key)
 
-    return cls(path, keygen, table, pragma, cache_key)
+    if bloom and path != ":memory:":
+        archive.bloom_enable(bloom)
+    return archive
 
 
 def sanitize(name):
@@ -46,27 +66,21 @@ def sanitize(name):
 
 class DownloadArchive():
     _sqlite3 = None
+    _bloom = None
+    _handles = {}
+    _handles_lock = threading.Lock()
+    keys = ()
 
     def __init__(self, path, keygen, table=None, pragma=None, cache_key=None):
         if self._sqlite3 is None:
             DownloadArchive._sqlite3 = __import__("sqlite3")
 
-        try:
-            con = self._sqlite3.connect(
-                path, timeout=60, check_same_thread=False)
-        except self._sqlite3.OperationalError:
-            os.makedirs(os.path.dirname(path))
-            con = self._sqlite3.connect(
-                path, timeout=60, check_same_thread=False)
-        con.isolation_level = None
-
+        table = "archive" if table is None else sanitize(table)
+        self.path = path
         self.keygen = keygen
-        self.connection = con
-        self.close = con.close
-        self.cursor = cursor = con.cursor()
+        self._table = table
         self._cache_key = cache_key or "_archive_key"
-
-        table = "archive" if table is None else sanitize(table)
+        self._prefetched = ()
         self._stmt_select = (
             "SELECT 1 "
             "FROM " + table + " "
@@ -76,32 +90,198 @@ class DownloadArchive():
             "INSERT OR IGNORE INTO " + table + " "
             "(entry) VALUES (?)")
 
-        if pragma:
-            for stmt in pragma:
-                cursor.execute("PRAGMA " + stmt)
-
-        try:
-            cursor.execute("CREATE TABLE IF NOT EXISTS " + table + " "
-                           "(entry TEXT PRIMARY KEY) WITHOUT ROWID")
-        except self._sqlite3.OperationalError:
-            # fallback for missing WITHOUT ROWID support (#553)
-            cursor.execute("CREATE TABLE IF NOT EXISTS " + table + " "
-                           "(entry TEXT PRIMARY KEY)")
+        self._handle = handle = self._acquire(path, table, pragma)
+        self.connection = handle.connection
+        self.cursor = handle.connection.cursor()
+        self._lock = handle.lock
+        self._bloom = handle.blooms.get(table)
+
+    @classmethod
+    def _acquire(cls, path, table, pragma):
+        """Return a shared handle for the database at 'path'"""
+        with cls._handles_lock:
+            handle = cls._handles.get(path)
+            if handle is None:
+                handle = ArchiveHandle(cls._sqlite3, path, pragma)
+                if path != ":memory:":
+                    cls._handles[path] = handle
+            handle.acquire(table)
+        return handle
+
+    def close(self):
+        """Release this archive's database handle"""
+        with self._handles_lock:
+            handle = self._handle
+            if handle.release(self._table) and \
+                    self._handles.get(self.path) is handle:
+                del self._handles[self.path]
 
     def add(self, kwdict):
         """Add item described by 'kwdict' to archive"""
         key = kwdict.get(self._cache_key) or self.keygen(kwdict)
-        self.cursor.execute(self._stmt_insert, (key,))
+        with self._lock:
+            self.cursor.execute(self._stmt_insert, (key,))
+            if self._bloom is not None:
+                self._bloom.add(key)
 
     def check(self, kwdict):
         """Return True if the item described by 'kwdict' exists in archive"""
         key = kwdict[self._cache_key] = self.keygen(kwdict)
-        self.cursor.execute(self._stmt_select, (key,))
-        return self.cursor.fetchone()
+        if key in self._prefetched:
+            return True
+        if self._bloom is not None and key not in self._bloom:
+            return False
+        return self._select(key)
+
+    def _select(self, key):
+        with self._lock:
+            self.cursor.execute(self._stmt_select, (key,))
+            return self.cursor.fetchone()
+
+    def prefetch(self, kwdicts):
+        """Look up all items described by 'kwdicts' with as few queries
+        as possible and return a list with one boolean per item
+
+        Found items are remembered for subsequent check() calls until the
+        next prefetch(). Missing items are not, since other archives
+        sharing this database might add them in the meantime.
+        """
+        keys = [self.keygen(kwdict) for kwdict in kwdicts]
+        found = {key for key in keys if key in self.keys}
+
+        query = keys
+        if self._bloom is not None:
+            query = [key for key in keys if key in self._bloom]
+
+        cursor = self.cursor
+        with self._lock:
+            for index in range(0, len(query), 500):
+                chunk = query[index:index+500]
+                cursor.execute(
+                    "SELECT entry FROM " + self._table + " WHERE entry IN "
+                    "(" + ",".join("?" * len(chunk)) + ")", chunk)
+                found.update(row[0] for row in cursor.fetchall())
+
+        self._prefetched = found
+        return [key in found for key in keys]
 
     def finalize(self):
         pass
 
+    def bloom_enable(self, maxsize=True):
+        """Answer check() calls for new entries with a Bloom filter
+
+        The filter gets stored next to the database file and is only
+        rebuilt when the database got modified by something else.
+        """
+        if maxsize is True:
+            maxsize = 134217728  # 128 MiB
+        elif isinstance(maxsize, str):
+            maxsize = text.parse_bytes(maxsize)
+        if not maxsize or maxsize < 0:
+            return
+
+        table = self._table
+        handle = self._handle
+        with self._lock:
+            bloom = handle.blooms.get(table)
+            if bloom is None:
+                if handle.tables[table] > 1:
+                    # other archives for this table are already open
+                    # and would not update a new filter
+                    return
+                bloom = handle.blooms[table] = self._bloom_load(
+                    table, maxsize)
+
+        self._bloom = bloom
+
+    def _bloom_load(self, table, maxsize):
+        path = self.path + ("" if table == "archive" else
+                            "." + table.strip('"')) + ".bloom"
+        bloom = BloomFilter.load(path, BloomFilter.signature(self.path))
+
+        if bloom is None or bloom.capacity < bloom.count:
+            self.cursor.execute("SELECT count(*) FROM " + table)
+            count = self.cursor.fetchone()[0]
+            bloom = BloomFilter(max(count * 2, 65536), maxsize)
+
+            self.cursor.execute("SELECT entry FROM " + table)
+            add = bloom.add
+            for row in self.cursor:
+                add(row[0])
+            bloom.modified = True
+            log.debug("Built Bloom filter for '%s' (%s entries)",
+                      self.path, count)
+
+        log.debug("Bloom filter for '%s': %s KiB, %s hash functions, "
+                  "%.3f%% false positive rate", self.path,
+                  len(bloom.bits) // 1024, bloom.hashes,
+                  bloom.error_rate() * 100.0)
+
+        bloom.path = path
+        return bloom
+
+
+class DownloadArchiveBatch(DownloadArchive):
+    """Write entries in batches of 'size' entries or every 'interval' seconds
+
+    Pending entries get written when closing the archive at the latest,
+    regardless of job status. A crash loses at most one batch.
+    """
+
+    def __init__(self, path, keygen, table=None, pragma=None, cache_key=None,
+                 size=None, interval=None):
+        DownloadArchive.__init__(
+            self, path, keygen, table, pragma, cache_key)
+        self.keys = set()
+        self.size = 100 if size is None else size
+        self.interval = 10.0 if interval is None else interval
+        self._flushed = time.monotonic()
+
+    def add(self, kwdict):
+        key = kwdict.get(self._cache_key) or self.keygen(kwdict)
+        self.keys.add(key)
+        if self._bloom is not None:
+            with self._lock:
+                self._bloom.add(key)
+        if len(self.keys) >= self.size or \
+                time.monotonic() - self._flushed >= self.interval:
+            self.flush()
+
+    def check(self, kwdict):
+        key = kwdict[self._cache_key] = self.keygen(kwdict)
+        if key in self.keys or key in self._prefetched:
+            return True
+        if self._bloom is not None and key not in self._bloom:
+            return False
+        return self._select(key)
+
+    def flush(self):
+        """Write all pending entries in a single transaction"""
+        self._flushed = time.monotonic()
+        if not self.keys:
+            return
+
+        cursor = self.cursor
+        with self._lock, self.connection:
+            try:
+                cursor.execute("BEGIN")
+            except self._sqlite3.OperationalError:
+                pass
+            cursor.executemany(
+                self._stmt_insert, ((key,) for key in self.keys))
+        self.keys.clear()
+
+    def close(self):
+        try:
+            self.flush()
+        except Exception as exc:
+            log.error("%s when writing %s archive entries: %s",
+                      exc.__class__.__name__, len(self.keys), exc)
+        DownloadArchive.close(self)
+
+    finalize = flush
+
 
 class DownloadArchiveMemory(DownloadArchive):
 
@@ -111,23 +291,26 @@ class DownloadArchiveMemory(DownloadArchive):
         self.keys = set()
 
     def add(self, kwdict):
-        self.keys.add(
-            kwdict.get(self._cache_key) or
-            self.keygen(kwdict))
+        key = kwdict.get(self._cache_key) or self.keygen(kwdict)
+        self.keys.add(key)
+        if self._bloom is not None:
+            with self._lock:
+                self._bloom.add(key)
 
     def check(self, kwdict):
         key = kwdict[self._cache_key] = self.keygen(kwdict)
-        if key in self.keys:
+        if key in self.keys or key in self._prefetched:
             return True
-        self.cursor.execute(self._stmt_select, (key,))
-        return self.cursor.fetchone()
+        if self._bloom is not None and key not in self._bloom:
+            return False
+        return self._select(key)
 
     def finalize(self):
         if not self.keys:
             return
 
         cursor = self.cursor
-        with self.connection:
+        with self._lock, self.connection:
             try:
                 cursor.execute("BEGIN")
             except self._sqlite3.OperationalError:
@@ -141,64 +324,344 @@ class DownloadArchiveMemory(DownloadArchive):
                 cursor.executemany(stmt, ((key,) for key in self.keys))
 
 
+class ArchiveHandle():
+    """SQLite connection shared by all archives of the same database file
+
+    Archives only use their connection while holding 'lock'.
+    """
+
+    def __init__(self, sqlite3, path, pragma=None):
+        try:
+            con = sqlite3.connect(
+                path, timeout=60, check_same_thread=False)
+        except sqlite3.OperationalError:
+            os.makedirs(os.path.dirname(path))
+            con = sqlite3.connect(
+                path, timeout=60, check_same_thread=False)
+        con.isolation_level = None
+
+        self.path = path
+        self.connection = con
+        self.lock = threading.RLock()
+        self.refcount = 0
+        self.tables = {}
+        self.blooms = {}
+        self._sqlite3 = sqlite3
+
+        if pragma:
+            cursor = con.cursor()
+            for stmt in pragma:
+                cursor.execute("PRAGMA " + stmt)
+
+    def acquire(self, table):
+        """Register a new user of 'table' and create it if necessary"""
+        self.refcount += 1
+        if table in self.tables:
+            self.tables[table] += 1
+            return
+
+        with self.lock:
+            cursor = self.connection.cursor()
+            try:
+                cursor.execute("CREATE TABLE IF NOT EXISTS " + table + " "
+                               "(entry TEXT PRIMARY KEY) WITHOUT ROWID")
+            except self._sqlite3.OperationalError:
+                # fallback for missing WITHOUT ROWID support (#553)
+                cursor.execute("CREATE TABLE IF NOT EXISTS " + table + " "
+                               "(entry TEXT PRIMARY KEY)")
+        self.tables[table] = 1
+
+    def release(self, table):
+        """Unregister a user of 'table'
+
+        Close the connection and store modified Bloom filters
+        when there are no users left and return True in that case.
+        """
+        self.tables[table] -= 1
+        self.refcount -= 1
+        if self.refcount > 0:
+            return False
+
+        self.connection.close()
+        if self.blooms:
+            signature = BloomFilter.signature(self.path)
+            for bloom in self.blooms.values():
+                if not bloom.modified:
+                    continue
+                try:
+                    bloom.store(bloom.path, signature)
+                except OSError as exc:
+                    log.warning(
+                        "Unable to store Bloom filter at '%s' (%s: %s)",
+                        bloom.path, exc.__class__.__name__, exc)
+        return True
+
+
+class BloomFilter():
+    """Probabilistic set of strings without false negatives"""
+    MAGIC = b"GDL-BLOOM-1\n"
+
+    def __init__(self, capacity, maxsize, error_rate=0.01,
+                 bits=None, hashes=None, count=0):
+        if bits is None:
+            # optimal number of bits and hash functions for 'capacity'
+            size = -capacity * math.log(error_rate) / (math.log(2) ** 2)
+            size = min(int(size) // 8 + 1, maxsize)
+            bits = bytearray(size)
+            hashes = max(1, round(size * 8 / capacity * math.log(2)))
+
+        self.bits = bits
+        self.size = len(bits) * 8
+        self.hashes = hashes
+        self.capacity = capacity
+        self.count = count
+        self.modified = False
+        self.path = None
+
+    def __contains__(self, key):
+        bits = self.bits
+        for index in self._indices(key):
+            if not bits[index >> 3] & (1 << (index & 7)):
+                return False
+        return True
+
+    def add(self, key):
+        bits = self.bits
+        for index in self._indices(key):
+            bits[index >> 3] |= 1 << (index & 7)
+        self.count += 1
+        self.modified = True
+
+    def error_rate(self):
+        """Return the expected false positive rate"""
+        return (1.0 - math.exp(
+            -self.hashes * self.count / self.size)) ** self.hashes
+
+    def _indices(self, key):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    @staticmethod
+    def signature(path):
+        """Return size and modification time of a database and its WAL"""
+        result = []
+        for p in (path, path + "-wal"):
+            try:
+                stat = os.stat(p)
+                result.append(stat.st_size)
+                result.append(stat.st_mtime_ns)
+            except OSError:
+                result.append(0)
+                result.append(0)
+        return result
+
+    @classmethod
+    def load(cls, path, signature):
+        try:
+            with open(path, "rb") as fp:
+                if fp.read(len(cls.MAGIC)) != cls.MAGIC:
+                    return None
+                capacity, hashes, count, *sig = struct.unpack(
+                    "<QQQqqqq", fp.read(56))
+                if sig != signature:
+                    return None
+                bits = bytearray(fp.read())
+        except (OSError, struct.error):
+            return None
+        return cls(capacity, len(bits), bits=bits, hashes=hashes, count=count)
+
+    def store(self, path, signature):
+        with open(path + ".tmp", "wb") as fp:
+            fp.write(self.MAGIC)
+            fp.write(struct.pack("<QQQqqqq", self.capacity, self.hashes,
+                                 self.count, *signature))
+            fp.write(self.bits)
+        os.replace(path + ".tmp", path)
+        self.modified = False
+
+
 class DownloadArchivePostgresql():
+    """Download archive stored in a PostgreSQL database
+
+    Archives with the same URI created by the same thread share a
+    connection, which stays open until the last of them gets closed.
+    Jobs running in different threads use different connections.
+    """
     _psycopg = None
+    _handles = {}
+    _tables = set()
+    _lock = threading.Lock()
+    keys = ()
 
     def __init__(self, uri, keygen, table=None, pragma=None, cache_key=None):
         if self._psycopg is None:
             DownloadArchivePostgresql._psycopg = __import__("psycopg")
 
-        self.connection = con = self._psycopg.connect(uri)
-        self.cursor = cursor = con.cursor()
-        self.close = con.close
+        self.uri = uri
         self.keygen = keygen
         self._cache_key = cache_key or "_archive_key"
+        self._prefetched = ()
+        self._handle = handle = self._acquire(uri)
 
         table = "archive" if table is None else sanitize(table)
+        self._table = table
         self._stmt_select = (
             "SELECT true "
             "FROM " + table + " "
             "WHERE entry=%s "
             "LIMIT 1")
+        self._stmt_select_any = (
+            "SELECT entry "
+            "FROM " + table + " "
+            "WHERE entry = ANY(%s)")
         self._stmt_insert = (
             "INSERT INTO " + table + " (entry) "
             "VALUES (%s) "
             "ON CONFLICT DO NOTHING")
 
+        if (uri, table) in self._tables:
+            return
         try:
-            cursor.execute("CREATE TABLE IF NOT EXISTS " + table + " "
+            handle.execute("CREATE TABLE IF NOT EXISTS " + table + " "
                            "(entry TEXT PRIMARY KEY)")
-            con.commit()
         except Exception as exc:
             log.error("%s: %s when creating '%s' table: %s",
-                      con, exc.__class__.__name__, table, exc)
-            con.rollback()
+                      handle.connection, exc.__class__.__name__, table, exc)
+            self.close()
             raise
+        self._tables.add((uri, table))
+
+    @property
+    def connection(self):
+        return self._handle.connection
+
+    @classmethod
+    def _acquire(cls, uri):
+        key = (uri, threading.get_ident())
+        with cls._lock:
+            handle = cls._handles.get(key)
+            if handle is None:
+                handle = cls._handles[key] = PostgresqlHandle(
+                    cls._psycopg, uri)
+                handle.key = key
+            handle.refcount += 1
+            return handle
+
+    def close(self):
+        handle = self._handle
+        with self._lock:
+            handle.refcount -= 1
+            if handle.refcount > 0:
+                return
+            if self._handles.get(handle.key) is handle:
+                del self._handles[handle.key]
+        handle.close()
 
     def add(self, kwdict):
         key = kwdict.get(self._cache_key) or self.keygen(kwdict)
         try:
-            self.cursor.execute(self._stmt_insert, (key,))
-            self.connection.commit()
+            self._handle.execute(self._stmt_insert, (key,))
         except Exception as exc:
             log.error("%s: %s when writing entry: %s",
                       self.connection, exc.__class__.__name__, exc)
-            self.connection.rollback()
 
     def check(self, kwdict):
         key = kwdict[self._cache_key] = self.keygen(kwdict)
+        if key in self._prefetched:
+            return True
         try:
-            self.cursor.execute(self._stmt_select, (key,))
-            return self.cursor.fetchone()
+            return self._handle.execute(
+                self._stmt_select, (key,)).fetchone()
         except Exception as exc:
             log.error("%s: %s when checking entry: %s",
                       self.connection, exc.__class__.__name__, exc)
-            self.connection.rollback()
             return False
 
+    def prefetch(self, kwdicts):
+        """Look up all items described by 'kwdicts' with a single query"""
+        keys = [self.keygen(kwdict) for kwdict in kwdicts]
+        found = {key for key in keys if key in self.keys}
+        try:
+            cursor = self._handle.execute(self._stmt_select_any, (keys,))
+            found.update(row[0] for row in cursor.fetchall())
+        except Exception as exc:
+            log.error("%s: %s when checking entries: %s",
+                      self.connection, exc.__class__.__name__, exc)
+            return [key in found for key in keys]
+
+        self._prefetched = found
+        return [key in found for key in keys]
+
     def finalize(self):
         pass
 
+    def _insert_many(self, keys):
+        """Write 'keys' with COPY and a single INSERT"""
+        self._handle.insert_many(self._table, keys)
+
+
+class PostgresqlHandle():
+    """Autocommit connection to a PostgreSQL database
+
+    All statements run while holding 'lock', so a handle can be used
+    by multiple threads. Lost connections get re-established once per
+    statement.
+    """
+
+    def __init__(self, psycopg, uri):
+        self.uri = uri
+        self.key = None
+        self.refcount = 0
+        self.lock = threading.RLock()
+        self._psycopg = psycopg
+        self.connection = psycopg.connect(uri, autocommit=True)
+
+    def execute(self, stmt, args=None):
+        """Execute 'stmt' and return a cursor with its results"""
+        with self.lock:
+            try:
+                return self.connection.execute(stmt, args)
+            except self._psycopg.OperationalError:
+                if not self.connection.closed:
+                    raise
+                self.reconnect()
+            return self.connection.execute(stmt, args)
+
+    def insert_many(self, table, keys):
+        """Write 'keys' to 'table' with COPY and a single INSERT"""
+        with self.lock:
+            if self.connection.closed:
+                self.reconnect()
+            con = self.connection
+            with con.transaction():
+                cursor = con.cursor()
+                cursor.execute(
+                    "CREATE TEMPORARY TABLE IF NOT EXISTS gallery_dl_entries "
+                    "(entry TEXT) ON COMMIT DELETE ROWS")
+                with cursor.copy(
+                        "COPY gallery_dl_entries (entry) FROM STDIN") as copy:
+                    for key in keys:
+                        copy.write_row((key,))
+                cursor.execute(
+                    "INSERT INTO " + table + " (entry) "
+                    "SELECT entry FROM gallery_dl_entries "
+                    "ON CONFLICT DO NOTHING")
+
+    def reconnect(self):
+        log.debug("Reconnecting to PostgreSQL database")
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+        self.connection = self._psycopg.connect(self.uri, autocommit=True)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
 
 class DownloadArchivePostgresqlMemory(DownloadArchivePostgresql):
 
@@ -216,24 +679,54 @@ class DownloadArchivePostgresqlMemory(DownloadArchivePostgresql):
         key = kwdict[self._cache_key] = self.keygen(kwdict)
         if key in self.keys:
             return True
-        try:
-            self.cursor.execute(self._stmt_select, (key,))
-            return self.cursor.fetchone()
-        except Exception as exc:
-            log.error("%s: %s when checking entry: %s",
-                      self.connection, exc.__class__.__name__, exc)
-            self.connection.rollback()
-            return False
+        return DownloadArchivePostgresql.check(self, kwdict)
 
     def finalize(self):
         if not self.keys:
             return
         try:
-            self.cursor.executemany(
-                self._stmt_insert,
-                ((key,) for key in self.keys))
-            self.connection.commit()
+            self._insert_many(self.keys)
         except Exception as exc:
             log.error("%s: %s when writing entries: %s",
                       self.connection, exc.__class__.__name__, exc)
-            self.connection.rollback()
+
+
+class DownloadArchivePostgresqlBatch(DownloadArchivePostgresql):
+
+    def __init__(self, path, keygen, table=None, pragma=None, cache_key=None,
+                 size=None, interval=None):
+        DownloadArchivePostgresql.__init__(
+            self, path, keygen, table, pragma, cache_key)
+        self.keys = set()
+        self.size = 100 if size is None else size
+        self.interval = 10.0 if interval is None else interval
+        self._flushed = time.monotonic()
+
+    def add(self, kwdict):
+        self.keys.add(
+            kwdict.get(self._cache_key) or
+            self.keygen(kwdict))
+        if len(self.keys) >= self.size or \
+                time.monotonic() - self._flushed >= self.interval:
+            self.flush()
+
+    check = DownloadArchivePostgresqlMemory.check
+
+    def flush(self):
+        self._flushed = time.monotonic()
+        if not self.keys:
+            return
+        try:
+            self._insert_many(self.keys)
+        except Exception as exc:
+            log.error("%s: %s when writing %s entries: %s",
+                      self.connection, exc.__class__.__name__,
+                      len(self.keys), exc)
+        else:
+            self.keys.clear()
+
+    def close(self):
+        self.flush()
+        DownloadArchivePostgresql.close(self)
+
+    finalize = flush
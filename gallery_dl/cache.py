@@ -8,13 +8,15 @@
 
 """Decorators to keep function results in an in-memory and database cache"""
 
-import sqlite3
 import pickle
 import time
 import os
 import functools
+import threading
 from . import config, util
 
+sqlite3 = None  # imported on first use by _init()
+
 
 class CacheDecorator():
     """Simplified in-memory cache"""
@@ -94,9 +96,16 @@ class DatabaseCacheDecorator():
         except KeyError:
             pass
 
+        db = self.database()
+        if db is None:
+            value = self.func(*args, **kwargs)
+            expires = timestamp + self.maxage
+            self.cache[key] = value, expires
+            return value
+
         # database lookup
         fullkey = "%s-%s" % (self.key, key)
-        with self.database() as db:
+        with db:
             cursor = db.cursor()
             try:
                 cursor.execute("BEGIN EXCLUSIVE")
@@ -125,7 +134,10 @@ class DatabaseCacheDecorator():
     def update(self, key, value):
         expires = int(time.time()) + self.maxage
         self.cache[key] = value, expires
-        with self.database() as db:
+        db = self.database()
+        if db is None:
+            return
+        with db:
             db.execute(
                 "INSERT OR REPLACE INTO data VALUES (?,?,?)",
                 ("%s-%s" % (self.key, key), pickle.dumps(value), expires),
@@ -136,20 +148,23 @@ class DatabaseCacheDecorator():
             del self.cache[key]
         except KeyError:
             pass
-        with self.database() as db:
+        db = self.database()
+        if db is None:
+            return
+        with db:
             db.execute(
                 "DELETE FROM data WHERE key=?",
                 ("%s-%s" % (self.key, key),),
             )
 
-    def database(self):
-        if self._init:
-            self.db.execute(
-                "CREATE TABLE IF NOT EXISTS data "
-                "(key TEXT PRIMARY KEY, value TEXT, expires INTEGER)"
-            )
-            DatabaseCacheDecorator._init = False
-        return self.db
+    @staticmethod
+    def database():
+        """Return the database connection or None if it is unavailable"""
+        if DatabaseCacheDecorator._init:
+            with _lock:
+                if DatabaseCacheDecorator._init:
+                    _init()
+        return DatabaseCacheDecorator.db
 
 
 def memcache(maxage=None, keyarg=None):
@@ -170,7 +185,7 @@ def cache(maxage=3600, keyarg=None):
 
 def clear(module):
     """Delete database entries for 'module'"""
-    db = DatabaseCacheDecorator.db
+    db = DatabaseCacheDecorator.database()
     if not db:
         return None
 
@@ -212,17 +227,30 @@ def _path():
 
 
 def _init():
+    """Open the database file
+
+    Called on first use of a DatabaseCacheDecorator instead of at import
+    time, i.e. after all config files got loaded.
+    """
+    global sqlite3
+    import sqlite3
+
+    DatabaseCacheDecorator._init = False
+    DatabaseCacheDecorator.db = None
     try:
         dbfile = _path()
 
         # restrict access permissions for new db files
         os.close(os.open(dbfile, os.O_CREAT | os.O_RDONLY, 0o600))
 
-        DatabaseCacheDecorator.db = sqlite3.connect(
-            dbfile, timeout=60, check_same_thread=False)
+        db = sqlite3.connect(dbfile, timeout=60, check_same_thread=False)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS data "
+            "(key TEXT PRIMARY KEY, value TEXT, expires INTEGER)"
+        )
+        DatabaseCacheDecorator.db = db
     except (OSError, TypeError, sqlite3.OperationalError):
-        global cache
-        cache = memcache
+        pass
 
 
-_init()
+_lock = threading.Lock()
@@ -11,6 +11,7 @@
 import sys
 import os.path
 import logging
+from types import MappingProxyType
 from . import util
 
 log = logging.getLogger("config")
@@ -19,8 +20,47 @@ log = logging.getLogger("config")
 # --------------------------------------------------------------------
 # internals
 
-_config = {}
+class _Config(dict):
+    """Root config dict invalidating cached views when modified directly"""
+    __slots__ = ()
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        _invalidate()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        _invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        dict.clear(self)
+        _invalidate()
+
+    def pop(self, *args):
+        _invalidate()
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        _invalidate()
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        _invalidate()
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        _invalidate()
+
+
+_config = _Config()
 _files = []
+_views = {}
+_generation = 0
 
 if util.WINDOWS:
     _default_configs = [
@@ -184,6 +224,7 @@ def load(files=None, strict=False, loads=util.json_loads):
             else:
                 util.combine_dict(_config, conf)
             _files.append(pathfmt)
+            _invalidate()
 
             if "subconfigs" in conf:
                 subconfigs = conf["subconfigs"]
@@ -254,6 +295,62 @@ def interpolate_common(common, paths, key, default=None, conf=_config):
     return default
 
 
+def view(path):
+    """Return a read-only mapping of all values visible from 'path'
+
+    view(path).get(key, default) returns the same value as
+    interpolate(path, key, default). Mappings get cached until
+    the configuration is modified by set(), unset(), load(), etc.
+    or its top level gets modified directly.
+    """
+    try:
+        return _views[path]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable 'path', e.g. a list
+        return view(tuple(path))
+
+    generation = _generation
+    values = {}
+    _flatten(values, path, _config)
+    values.update(_config)
+
+    result = MappingProxyType(values)
+    if generation == _generation:
+        _views[path] = result
+    return result
+
+
+def view_common(common, paths):
+    """Return a read-only mapping of all values visible
+    from multiple 'paths' along a 'common' ancestor
+
+    view_common(common, paths).get(key, default) returns the same value
+    as interpolate_common(common, paths, key, default).
+    """
+    key = (common, tuple(paths))
+    try:
+        return _views[key]
+    except KeyError:
+        pass
+    except TypeError:  # unhashable 'common' or 'paths' elements
+        return view_common(tuple(common), [tuple(path) for path in paths])
+
+    generation = _generation
+    values = {}
+    conf = _flatten(values, common, _config)
+    if conf is not None:
+        # values of earlier paths take precedence
+        for path in reversed(key[1]):
+            _flatten(values, path, conf)
+    values.update(_config)
+
+    result = MappingProxyType(values)
+    if generation == _generation:
+        _views[key] = result
+    return result
+
+
 def accumulate(path, key, conf=_config):
     """Accumulate the values of 'key' along 'path'"""
     result = []
@@ -287,6 +384,7 @@ def set(path, key, value, conf=_config):
         except KeyError:
             conf[p] = conf = {}
     conf[key] = value
+    _invalidate()
 
 
 def setdefault(path, key, value, conf=_config):
@@ -296,6 +394,7 @@ def setdefault(path, key, value, conf=_config):
             conf = conf[p]
         except KeyError:
             conf[p] = conf = {}
+    _invalidate()
     return conf.setdefault(key, value)
 
 
@@ -307,6 +406,7 @@ def unset(path, key, conf=_config):
         del conf[key]
     except Exception:
         pass
+    _invalidate()
 
 
 class apply():
@@ -328,3 +428,25 @@ class apply():
                 unset(path, key)
             else:
                 set(path, key, value)
+
+
+def _flatten(values, path, conf):
+    """Update 'values' with the contents of all dicts along 'path'
+
+    Returns the last dict or None if 'path' does not fully exist.
+    """
+    for p in path:
+        try:
+            conf = conf[p]
+        except Exception:
+            return None
+        if not isinstance(conf, dict):
+            return None
+        values.update(conf)
+    return conf
+
+
+def _invalidate():
+    global _generation
+    _generation += 1
+    _views.clear()
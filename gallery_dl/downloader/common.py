@@ -43,7 +43,7 @@ class DownloaderBase():
 
     def config(self, key, default=None):
         """Interpolate downloader config value for 'key'"""
-        return config.interpolate(("downloader", self.scheme), key, default)
+        return config.view(("downloader", self.scheme)).get(key, default)
 
     def config_opts(self, key, default=None, conf=_config):
         if key in conf:
@@ -51,7 +51,7 @@ class DownloaderBase():
         value = self.opts.get(key, util.SENTINEL)
         if value is not util.SENTINEL:
             return value
-        return config.interpolate(("downloader", self.scheme), key, default)
+        return config.view(("downloader", self.scheme)).get(key, default)
 
     def _extractor_config(self, extractor):
         path = extractor._cfgpath
@@ -8,11 +8,18 @@
 
 """Downloader module for http:// and https:// URLs"""
 
+import os
+import ssl
+import json
 import time
+import hashlib
+import threading
 import mimetypes
+import http.client
+import requests
 from requests.exceptions import RequestException, ConnectionError, Timeout
 from .common import DownloaderBase
-from .. import text, util, output
+from .. import text, util, output, ratelimit
 from ssl import SSLError
 
 
@@ -38,8 +45,12 @@ class HttpDownloader(DownloaderBase):
         self.verify = self.config("verify", extractor._verify)
         self.mtime = self.config("mtime", True)
         self.rate = self.config("rate")
+        self.segments = self.config("segments")
         interval_429 = self.config("sleep-429")
 
+        if self.config("http2", False):
+            self.session = self._http2_session(self.session)
+
         if not self.config("consume-content", False):
             # this resets the underlying TCP connection, and therefore
             # if the program makes another request to the same domain,
@@ -80,11 +91,31 @@ class HttpDownloader(DownloaderBase):
             self.receive = self._receive_rate
             if self.progress < 0.0:
                 self.progress = 0.0
+        if self.segments:
+            if self.rate:
+                self.log.debug("Segmented downloads disabled by rate limit")
+            if self.rate or self.segments <= 1:
+                self.segments = 0
         if interval_429 is None:
             self.interval_429 = extractor._interval_429
         else:
             self.interval_429 = util.build_duration_func(interval_429)
 
+        self.retry = extractor._retry
+
+        rate = self.config("request-rate")
+        if rate is None:
+            self.ratelimit = extractor._ratelimit
+        elif rate:
+            self.ratelimit = ratelimit.build(
+                rate, self.config("request-burst", 1),
+                self.config("request-rate-scope", "host"),
+                extractor.category)
+            if self.ratelimit is None:
+                self.log.warning("Invalid request rate (%r)", rate)
+        else:
+            self.ratelimit = None
+
     def download(self, url, pathfmt):
         try:
             return self._download_impl(url, pathfmt)
@@ -99,6 +130,7 @@ class HttpDownloader(DownloaderBase):
     def _download_impl(self, url, pathfmt):
         response = None
         tries = code = 0
+        retry_after = backoff = 0.0
         msg = ""
 
         metadata = self.metadata
@@ -110,26 +142,44 @@ class HttpDownloader(DownloaderBase):
 
         if self.part and not metadata:
             pathfmt.part_enable(self.partdir)
+        segments = self.segments
+        hash_names = kwdict.get("_http_hash")
+        hashes = None
+        restart = False
 
         while True:
-            if tries:
+            if restart:
+                # start over without counting a failed attempt
+                restart = False
+            elif tries:
+                headers = response.headers if code else None
                 if response:
                     self.release_conn(response)
                     response = None
 
+                self.retry.failure(url)
                 self.log.warning("%s (%s/%s)", msg, tries, self.retries+1)
                 if tries > self.retries:
                     return False
 
-                if code == 429 and self.interval_429:
-                    s = self.interval_429()
-                    time.sleep(s if s > tries else tries)
-                else:
-                    time.sleep(tries)
+                seconds = backoff = self.retry.delay(
+                    url, tries, backoff, headers)
+                if code == 429 and (retry_after or self.interval_429):
+                    s = retry_after or self.interval_429()
+                    if s > seconds:
+                        seconds = s
+                time.sleep(seconds)
                 code = 0
+                retry_after = 0.0
+
+            if not self.retry.check(url):
+                self.log.warning(
+                    "Too many failed requests to '%s' (circuit open)",
+                    text.root_from_url(url))
+                return False
 
             tries += 1
-            file_header = None
+            file_header = hashes = None
 
             # collect HTTP headers
             headers = {"Accept": "*/*"}
@@ -143,7 +193,19 @@ class HttpDownloader(DownloaderBase):
             #   partial content
             file_size = pathfmt.part_size()
             if file_size:
-                headers["Range"] = "bytes={}-".format(file_size)
+                state_path = pathfmt.temppath + ".segments"
+                if os.path.exists(state_path):
+                    # preallocated file of a segmented download
+                    file_size = 0
+                    if not segments:
+                        util.remove_file(state_path)
+                else:
+                    headers["Range"] = "bytes={}-".format(file_size)
+
+            if self.ratelimit:
+                seconds = self.ratelimit.reserve(url)
+                if seconds > 0.0:
+                    time.sleep(seconds)
 
             # connect to (remote) source
             try:
@@ -175,9 +237,11 @@ class HttpDownloader(DownloaderBase):
             # check response
             code = response.status_code
             if code == 200 or code in expected_status:  # OK
+                self.retry.success(url)
                 offset = 0
                 size = response.headers.get("Content-Length")
             elif code == 206:  # Partial Content
+                self.retry.success(url)
                 offset = file_size
                 size = response.headers["Content-Range"].rpartition("/")[2]
             elif code == 416 and file_size:  # Requested Range Not Satisfiable
@@ -189,6 +253,9 @@ class HttpDownloader(DownloaderBase):
                 if challenge is not None:
                     self.log.warning(challenge)
 
+                if code == 429 and self.ratelimit:
+                    retry_after = self.ratelimit.penalize(
+                        url, response.headers.get("Retry-After"))
                 if code in self.retry_codes or 500 <= code < 600:
                     continue
                 retry = kwdict.get("_http_retry")
@@ -263,7 +330,7 @@ class HttpDownloader(DownloaderBase):
                     pathfmt.part_enable(self.partdir)
                 metadata = False
 
-            content = response.iter_content(self.chunk_size)
+            content = self._iter_content(response)
 
             # check filename extension against file header
             if adjust_extension and not offset and \
@@ -282,6 +349,31 @@ class HttpDownloader(DownloaderBase):
                     response.close()
                     return True
 
+            # download content in multiple concurrent segments
+            if segments and not offset and size and \
+                    size >= SEGMENT_SIZE_MIN * 2 and \
+                    response.headers.get("Accept-Ranges") == "bytes" and \
+                    response.headers.get("Content-Encoding", "identity") \
+                    == "identity":
+                self.downloading = True
+                result = self._download_segments(
+                    url, pathfmt, response, content, file_header,
+                    size, headers)
+                if result is None:
+                    self.log.debug("Server ignored range request; "
+                                   "downloading '%s' as a single stream", url)
+                    segments = 0
+                    tries -= 1
+                    restart = True
+                    continue
+                if not result:
+                    return False
+                break
+
+            if self.segments:
+                # state of an earlier segmented download attempt
+                util.remove_file(pathfmt.temppath + ".segments")
+
             # set open mode
             if not offset:
                 mode = "w+b"
@@ -303,6 +395,12 @@ class HttpDownloader(DownloaderBase):
                         self._adjust_extension(pathfmt, fp.read(16))
                     fp.seek(offset)
 
+                if hash_names:
+                    hashes = self._hash_init(
+                        hash_names, fp, file_header, offset)
+                    if hashes:
+                        content = _iter_hash(content, hashes)
+
                 self.out.start(pathfmt.path)
                 try:
                     self.receive(fp, content, size, offset)
@@ -321,6 +419,9 @@ class HttpDownloader(DownloaderBase):
             break
 
         self.downloading = False
+        if hashes:
+            kwdict["_http_digests"] = {
+                name: h.hexdigest() for name, h in hashes}
         if self.mtime:
             if "_http_lastmodified" in kwdict:
                 kwdict["_mtime"] = kwdict["_http_lastmodified"]
@@ -343,6 +444,259 @@ class HttpDownloader(DownloaderBase):
                 "closing the connection anyway", exc.__class__.__name__, exc)
             response.close()
 
+    def _download_segments(self, url, pathfmt, response, content,
+                           file_header, size, headers):
+        """Download 'url' as multiple byte ranges at the same time
+
+        Return True on success, False on failure,
+        and None when the server does not support range requests.
+        """
+        state_path = pathfmt.temppath + ".segments"
+        ranges = self._segments_load(state_path, size)
+        if ranges is None:
+            count = min(self.segments, size // SEGMENT_SIZE_MIN)
+            step = size // count
+            ranges = [[step * i, step * (i + 1) - 1] for i in range(count)]
+            ranges[-1][1] = size - 1
+            mode = "w+b"
+        else:
+            mode = "r+b"
+            self.log.debug("Resuming segmented download")
+
+        abort = threading.Event()
+        unsupported = []
+
+        with pathfmt.open(mode) as fp:
+            fd = fp.fileno()
+            if mode == "w+b":
+                try:
+                    os.posix_fallocate(fd, 0, size)
+                except (AttributeError, OSError):
+                    os.ftruncate(fd, size)
+            self._segments_store(state_path, size, ranges)
+
+            # continue the initial response as first segment
+            if ranges[0][0]:
+                initial = None
+                response.close()
+            else:
+                initial = (response, content)
+                if file_header:
+                    _pwrite(fd, file_header, 0)
+                    ranges[0][0] = len(file_header)
+
+            threads = []
+            for segment in ranges:
+                if segment[0] > segment[1]:
+                    continue
+                thread = threading.Thread(
+                    target=self._download_segment, daemon=True,
+                    args=(url, fd, segment, headers, abort, unsupported,
+                          initial if segment is ranges[0] else None))
+                thread.start()
+                threads.append(thread)
+
+            self.out.start(pathfmt.path)
+            time_start = time.monotonic()
+            bytes_start = _segments_done(ranges, size)
+            try:
+                for thread in threads:
+                    while thread.is_alive():
+                        thread.join(1.0)
+                        self._segments_store(state_path, size, ranges)
+
+                        time_elapsed = time.monotonic() - time_start
+                        if self.progress is not None and \
+                                time_elapsed > self.progress:
+                            bytes_done = _segments_done(ranges, size)
+                            self.out.progress(size, bytes_done, int(
+                                (bytes_done - bytes_start) / time_elapsed))
+            finally:
+                abort.set()
+                for thread in threads:
+                    thread.join()
+                self._segments_store(state_path, size, ranges)
+
+        if unsupported:
+            util.remove_file(state_path)
+            util.remove_file(pathfmt.temppath)
+            return None
+        if _segments_done(ranges, size) < size:
+            output.stderr_write("\n")
+            return False
+
+        util.remove_file(state_path)
+        return True
+
+    def _download_segment(self, url, fd, segment, headers,
+                          abort, unsupported, initial=None):
+        tries = 0
+        backoff = 0.0
+        msg = ""
+
+        while segment[0] <= segment[1] and not abort.is_set():
+            if initial:
+                response, content = initial
+                initial = None
+            else:
+                if tries:
+                    self.log.warning("%s (bytes %s-%s, %s/%s)",
+                                     msg, segment[0], segment[1],
+                                     tries, self.retries+1)
+                    if tries > self.retries:
+                        abort.set()
+                        return
+                    backoff = self.retry.delay(url, tries, backoff)
+                    time.sleep(backoff)
+                tries += 1
+
+                if self.ratelimit:
+                    seconds = self.ratelimit.reserve(url)
+                    if seconds > 0.0:
+                        time.sleep(seconds)
+
+                range_headers = headers.copy()
+                range_headers["Range"] = "bytes={}-{}".format(*segment)
+                try:
+                    response = self.session.request(
+                        "GET", url,
+                        stream=True,
+                        headers=range_headers,
+                        timeout=self.timeout,
+                        proxies=self.proxies,
+                        verify=self.verify,
+                    )
+                except (RequestException, SSLError) as exc:
+                    msg = str(exc)
+                    continue
+
+                code = response.status_code
+                if code != 206:
+                    response.close()
+                    if code == 200:
+                        unsupported.append(segment)
+                        abort.set()
+                        return
+                    msg = "'{} {}' for '{}'".format(
+                        code, response.reason, url)
+                    continue
+                content = self._iter_content(response)
+
+            pos, end = segment
+            msg = "Connection closed"
+            try:
+                for data in content:
+                    if pos + len(data) > end:
+                        data = data[:end + 1 - pos]
+                    _pwrite(fd, data, pos)
+                    pos += len(data)
+                    segment[0] = pos
+                    if pos > end or abort.is_set():
+                        break
+            except (RequestException, SSLError, OSError) as exc:
+                msg = str(exc)
+            finally:
+                response.close()
+
+    @staticmethod
+    def _segments_load(path, size):
+        try:
+            with open(path) as fp:
+                state = json.load(fp)
+            if state["size"] == size:
+                return state["segments"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _segments_store(self, path, size, ranges):
+        try:
+            with open(path, "w") as fp:
+                json.dump({"size": size, "segments": ranges}, fp)
+        except OSError as exc:
+            self.log.debug("Unable to store segment state (%s: %s)",
+                           exc.__class__.__name__, exc)
+
+    def _http2_session(self, session):
+        """Return a copy of 'session' sending HTTPS requests over HTTP/2"""
+        try:
+            adapter = _http2_adapter()
+        except ImportError as exc:
+            self.log.warning("Unable to enable HTTP/2 (%s: %s)",
+                             exc.__class__.__name__, exc)
+            return session
+
+        http2 = requests.Session()
+        http2.__dict__.update(session.__dict__)
+        http2.adapters = session.adapters.copy()
+        http2.mount("https://", adapter)
+        return http2
+
+    def _hash_init(self, names, fp, file_header, offset):
+        """Return hash objects for all algorithms in 'names'
+
+        Data already present in 'fp', the first 'offset' bytes,
+        gets hashed immediately.
+        """
+        try:
+            hashes = [(name, hashlib.new(name)) for name in names]
+        except ValueError as exc:
+            self.log.debug("Unable to compute digests while downloading "
+                           "(%s: %s)", exc.__class__.__name__, exc)
+            return None
+
+        if file_header:
+            for _, h in hashes:
+                h.update(file_header)
+        elif offset:
+            # resumed download
+            fp.seek(0)
+            remaining = offset
+            while remaining > 0:
+                data = fp.read(min(remaining, 1048576))
+                if not data:
+                    break
+                for _, h in hashes:
+                    h.update(data)
+                remaining -= len(data)
+            fp.seek(offset)
+
+        return hashes
+
+    def _iter_content(self, response):
+        """Return an iterator over the content of 'response'
+
+        Whenever possible, read data directly from the underlying
+        http.client.HTTPResponse into a single reusable buffer
+        instead of allocating new bytes objects for every chunk.
+        Each yielded chunk is only valid until requesting the next one.
+        """
+        raw = response.raw
+        fp = getattr(raw, "_fp", None)
+        if not isinstance(fp, http.client.HTTPResponse) or raw.chunked or \
+                len(getattr(raw, "_decoded_buffer", ())) or \
+                response.headers.get("Content-Encoding", "identity") \
+                != "identity":
+            return response.iter_content(self.chunk_size)
+        return self._iter_readinto(raw, fp)
+
+    def _iter_readinto(self, raw, fp):
+        readinto = fp.readinto
+        view = memoryview(bytearray(self.chunk_size))
+
+        while True:
+            try:
+                size = readinto(view)
+            except (http.client.HTTPException, OSError) as exc:
+                raise ConnectionError(exc)
+            if not size:
+                break
+            yield view[:size]
+
+        if fp.length == 0:
+            # complete response; return connection to its pool
+            raw.release_conn()
+
     @staticmethod
     def receive(fp, content, bytes_total, bytes_start):
         write = fp.write
@@ -406,6 +760,223 @@ class HttpDownloader(DownloaderBase):
         return False
 
 
+class HTTP2Adapter(requests.adapters.BaseAdapter):
+    """Transport adapter sending requests over HTTP/2 by using httpx
+
+    All downloaders share the same connection pool,
+    multiplexing concurrent requests to a host over a single connection.
+    """
+    # connection-specific headers are not allowed in HTTP/2
+    HOP_BY_HOP = frozenset((
+        "connection", "keep-alive", "proxy-connection",
+        "transfer-encoding", "upgrade", "host",
+    ))
+
+    def __init__(self, httpx):
+        requests.adapters.BaseAdapter.__init__(self)
+        self.httpx = httpx
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True,
+             cert=None, proxies=None):
+        httpx = self.httpx
+        key = (verify, requests.utils.select_proxy(request.url, proxies))
+        client = self._client(key)
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        else:
+            timeout = httpx.Timeout(timeout)
+
+        headers = [
+            (key, value)
+            for key, value in request.headers.items()
+            if key.lower() not in self.HOP_BY_HOP
+        ]
+
+        try:
+            response = client.send(httpx.Request(
+                request.method, request.url, headers=headers,
+                content=request.body,
+                extensions={"timeout": timeout.as_dict()},
+            ), stream=True)
+        except httpx.ConnectTimeout as exc:
+            raise requests.exceptions.ConnectTimeout(exc, request=request)
+        except httpx.TimeoutException as exc:
+            raise requests.exceptions.ReadTimeout(exc, request=request)
+        except httpx.TransportError as exc:
+            raise ConnectionError(exc, request=request)
+
+        resp = requests.Response()
+        resp.status_code = response.status_code
+        resp.reason = response.reason_phrase
+        resp.headers = requests.structures.CaseInsensitiveDict(
+            response.headers)
+        resp.encoding = requests.utils.get_encoding_from_headers(
+            resp.headers)
+        resp.raw = HTTP2Body(
+            response, httpx, lambda: self.discard(key, client))
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        requests.cookies.extract_cookies_to_jar(
+            resp.cookies, request, resp.raw)
+        return resp
+
+    def close(self):
+        with self.lock:
+            for client in self.clients.values():
+                client.close()
+            self.clients.clear()
+
+    def discard(self, key, client):
+        """Stop using 'client' for new requests"""
+        with self.lock:
+            if self.clients.get(key) is client:
+                del self.clients[key]
+
+    def _client(self, key):
+        try:
+            return self.clients[key]
+        except KeyError:
+            pass
+
+        verify, proxy = key
+        if isinstance(verify, str):
+            verify = ssl.create_default_context(cafile=verify)
+        with self.lock:
+            client = self.clients.get(key)
+            if client is None:
+                client = self.clients[key] = self.httpx.Client(
+                    http2=True, verify=verify, proxy=proxy,
+                    trust_env=False, follow_redirects=False)
+        return client
+
+
+class HTTP2Body():
+    """File-like wrapper around a streamed httpx response"""
+    chunked = False
+    # httpx neither resets unfinished streams nor acknowledges
+    # their remaining data, which would eventually stall
+    # the whole connection when closing responses early
+    DRAIN_LIMIT = 8388608  # 8 MiB
+
+    def __init__(self, response, httpx, discard=None):
+        self.response = response
+        self.httpx = httpx
+        self.discard = discard
+        self.finished = False
+        self._chunks = response.iter_bytes()
+        self._buffer = b""
+        # allow requests to extract cookies from response headers
+        self._original_response = self.msg = self
+
+    def get_all(self, name, default=None):
+        return self.response.headers.get_list(name) or default
+
+    def read(self, amt=None, decode_content=True):
+        data = self._buffer
+        try:
+            if amt is None:
+                data += b"".join(self._chunks)
+                self._buffer = b""
+                self.finished = True
+                return data
+            while len(data) < amt:
+                chunk = next(self._chunks, None)
+                if chunk is None:
+                    self.finished = True
+                    break
+                data = data + chunk if data else chunk
+        except self.httpx.TimeoutException as exc:
+            raise requests.exceptions.ReadTimeout(exc)
+        except self.httpx.HTTPError as exc:
+            raise ConnectionError(exc)
+
+        if len(data) > amt:
+            self._buffer = data[amt:]
+            return data[:amt]
+        self._buffer = b""
+        return data
+
+    def stream(self, amt=65536, decode_content=True):
+        while True:
+            data = self.read(amt)
+            if not data:
+                return
+            yield data
+
+    def close(self):
+        response = self.response
+        if not self.finished and not response.is_closed:
+            self.finished = True
+            remaining = text.parse_int(response.headers.get(
+                "Content-Length"), -1) - response.num_bytes_downloaded
+            try:
+                if 0 <= remaining <= self.DRAIN_LIMIT:
+                    for _ in self._chunks:
+                        pass
+                elif self.discard is not None:
+                    # use a new connection for future requests
+                    self.discard()
+            except self.httpx.HTTPError:
+                pass
+        response.close()
+
+    def release_conn(self):
+        pass
+
+
+def _iter_hash(content, hashes):
+    """Update all 'hashes' with each chunk of 'content'"""
+    for data in content:
+        for _, h in hashes:
+            h.update(data)
+        yield data
+
+
+def _segments_done(ranges, size):
+    """Return the number of downloaded bytes of a segmented download"""
+    return size - sum(end + 1 - pos for pos, end in ranges)
+
+
+def _pwrite(fd, data, offset):
+    """Write all of 'data' to file descriptor 'fd' at 'offset'"""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+
+
+if not hasattr(os, "pwrite"):
+    _pwrite_lock = threading.Lock()
+
+    def _pwrite(fd, data, offset):  # noqa F811
+        with _pwrite_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+
+
+def _http2_adapter():
+    global _http2
+    with _http2_lock:
+        if _http2 is None:
+            httpx = __import__("httpx")
+            __import__("h2")
+            _http2 = HTTP2Adapter(httpx)
+    return _http2
+
+
+_http2 = None
+_http2_lock = threading.Lock()
+
+
+SEGMENT_SIZE_MIN = 1048576  # 1 MiB
+
 MIME_TYPES = {
     "image/jpeg"    : "jpg",
     "image/jpg"     : "jpg",
@@ -6,8 +6,12 @@
 # it under the terms of the GNU General Public License version 2 as
 # published by the Free Software Foundation.
 
+import os
 import sys
+import json
+import threading
 from ..util import re_compile
+from .. import config, util, version
 
 modules = [
     "2ch",
@@ -225,11 +229,17 @@ modules = [
 
 def find(url):
     """Find a suitable extractor for the given URL"""
-    for cls in _list_classes():
-        match = cls.pattern.match(url)
-        if match:
-            return cls(match)
-    return None
+    if _index is None:
+        with _lock:
+            if _registry is None:
+                _registry_init()
+            if _index is None and not _registry:
+                # loading modules and building the index is not thread-safe
+                return _find(url, _list_classes())
+
+    if _index is not None:
+        return _find(url, _index.candidates(url))
+    return _registry_find(url)
 
 
 def add(cls):
@@ -253,15 +263,23 @@ def add_module(module):
 
 def extractors():
     """Yield all available extractor classes"""
-    return sorted(
-        _list_classes(),
-        key=lambda x: x.__name__
-    )
+    with _lock:
+        return sorted(
+            _list_classes(),
+            key=lambda x: x.__name__
+        )
 
 
 # --------------------------------------------------------------------
 # internals
 
+def _find(url, classes):
+    for cls in classes:
+        match = cls.pattern.match(url)
+        if match:
+            return cls(match)
+    return None
+
 
 def _list_classes():
     """Yield available extractor classes"""
@@ -271,6 +289,12 @@ def _list_classes():
         yield from add_module(module)
 
     globals()["_list_classes"] = lambda : _cache
+    # all modules are loaded; look up further URLs in an index
+    try:
+        from .. import urlindex
+    except (ImportError, AttributeError):
+        return  # regex parser internals unavailable; test every pattern
+    globals()["_index"] = urlindex.PatternIndex(_cache)
 
 
 def _modules_internal():
@@ -300,5 +324,168 @@ def _get_classes(module):
     ]
 
 
+# --------------------------------------------------------------------
+# registry
+
+class _RegistryEntry():
+    """Extractor class stored in a registry file"""
+    __slots__ = ("module", "name", "source", "flags", "_pattern")
+
+    def __init__(self, module, name, source, flags):
+        self.module = module
+        self.name = name
+        self.source = source
+        self.flags = flags
+        self._pattern = None
+
+    @property
+    def pattern(self):
+        if self._pattern is None:
+            self._pattern = re_compile(self.source, self.flags)
+        return self._pattern
+
+    def load(self):
+        """Import this entry's module and return its extractor class"""
+        module = __import__(self.module, globals(), None, (), 1)
+        cls = getattr(module, self.name, None)
+        if cls is not None:
+            for cls_ in _get_classes(module):
+                if isinstance(cls_.pattern, str):
+                    cls_.pattern = re_compile(cls_.pattern)
+        return cls
+
+
+def _registry_init():
+    """Load or create the extractor registry file"""
+    global _registry
+    _registry = False
+    try:
+        from .. import urlindex
+    except (ImportError, AttributeError):
+        return
+
+    path = _registry_path()
+    if not path:
+        return
+    key = _registry_key()
+
+    try:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+        if data["key"] == key:
+            index = urlindex.PatternIndex()
+            for module, name, source, flags, keys in data["extractors"]:
+                index.values.append(
+                    _RegistryEntry(module, name, source, flags))
+                index.insert(keys)
+            _registry = index
+            return
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # import all modules and store their extractors' patterns
+    extractors = []
+    prefix = __name__ + "."
+    names = set(modules)
+    for cls in _list_classes():
+        module = cls.__module__
+        if not module.startswith(prefix) or module[len(prefix):] not in names:
+            continue
+        pattern = cls.pattern
+        keys = urlindex.pattern_keys(pattern.pattern, pattern.flags)
+        extractors.append((
+            module[len(prefix):], cls.__name__, pattern.pattern,
+            pattern.flags, sorted(keys) if keys is not None else None,
+        ))
+
+    temppath = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(temppath, "w", encoding="utf-8") as fp:
+            json.dump({"key": key, "extractors": extractors}, fp)
+        os.replace(temppath, path)
+    except OSError:
+        pass
+
+
+def _registry_find(url):
+    for cls in _cache:
+        match = cls.pattern.match(url)
+        if match:
+            return cls(match)
+
+    for entry in _registry.candidates(url):
+        if entry.pattern.match(url):
+            cls = entry.load()
+            if cls is not None:
+                match = cls.pattern.match(url)
+                if match:
+                    return cls(match)
+
+            # outdated registry; remove it and fall back to a linear search
+            globals()["_registry"] = False
+            try:
+                os.unlink(_registry_path())
+            except (OSError, TypeError):
+                pass
+            return find(url)
+
+    return None
+
+
+def _registry_path():
+    path = config.get(("extractor",), "registry", True)
+    if path is True:
+        from .. import cache
+        try:
+            path = cache._path()
+        except OSError:
+            return None
+        if path and path != ":memory:":
+            return os.path.join(os.path.dirname(path), "extractors.json")
+    elif path:
+        return util.expand_path(path)
+    return None
+
+
+def _registry_key():
+    """Return a string identifying the current set of extractor patterns"""
+    import hashlib
+    directory = os.path.dirname(__file__)
+    data = [version.__version__]
+
+    for name in modules:
+        try:
+            stat = os.stat(os.path.join(directory, name + ".py"))
+            data.append("{}:{}:{}".format(
+                name, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            data.append(name)
+
+    # options changing extractor patterns at import time
+    for category, key in _registry_options:
+        data.append(repr(config.get(("extractor", category), key)))
+
+    # custom instances of BaseExtractor categories,
+    # i.e. entries with a 'root' value (see BaseExtractor.update())
+    extr_conf = config.get((), "extractor")
+    if isinstance(extr_conf, dict):
+        for name, conf in extr_conf.items():
+            if isinstance(conf, dict) and any(
+                    isinstance(info, dict) and "root" in info
+                    for info in conf.values()):
+                data.append("{}:{}".format(name, json.dumps(
+                    conf, sort_keys=True, default=str)))
+
+    return hashlib.sha1("\n".join(data).encode()).hexdigest()
+
+
+_registry_options = (
+    ("bunkr"  , "tlds"),
+    ("generic", "enabled"),
+    ("ytdl"   , "enabled"),
+)
+_registry = None
+_lock = threading.RLock()
 _cache = []
+_index = None
 _module_iter = _modules_internal()
@@ -23,6 +23,7 @@ import threading
 from requests.adapters import HTTPAdapter
 from .message import Message
 from .. import config, output, text, util, cache, exception
+from .. import ratelimit, retry
 urllib3 = requests.packages.urllib3
 
 
@@ -46,7 +47,9 @@ class Extractor():
     request_interval = 0.0
     request_interval_min = 0.0
     request_interval_429 = 60.0
-    request_timestamp = 0.0
+    request_timestamps = {}  # category -> time of its last request
+    archive_probe = False  # True when archived() checks an archive
+    request_lock = threading.Lock()
 
     def __init__(self, match):
         self.log = logging.getLogger(self.category)
@@ -84,7 +87,7 @@ class Extractor():
         return 0
 
     def config(self, key, default=None):
-        return config.interpolate(self._cfgpath, key, default)
+        return config.view(self._cfgpath).get(key, default)
 
     def config2(self, key, key2, default=None, sentinel=util.SENTINEL):
         value = self.config(key, sentinel)
@@ -114,8 +117,8 @@ class Extractor():
         return default
 
     def _config_shared(self, key, default=None):
-        return config.interpolate_common(
-            ("extractor",), self._cfgpath, key, default)
+        return config.view_common(
+            ("extractor",), self._cfgpath).get(key, default)
 
     def _config_shared_accumulate(self, key):
         first = True
@@ -161,16 +164,42 @@ class Extractor():
 
         response = None
         tries = 1
+        retry_after = backoff = 0.0
+        cached = self._httpcache and method == "GET" and \
+            not kwargs.get("stream") and kwargs.get("data") is None
 
         if self._interval:
-            seconds = (self._interval() -
-                       (time.time() - Extractor.request_timestamp))
+            # reserve a time slot for this request, so that concurrent
+            # requests of the same category, e.g. prefetched pages,
+            # keep their distance
+            timestamps = Extractor.request_timestamps
+            with Extractor.request_lock:
+                now = time.time()
+                slot = timestamps.get(self.category, 0.0) + self._interval()
+                if slot < now:
+                    slot = now
+                timestamps[self.category] = slot
+            seconds = slot - now
             if seconds > 0.0:
                 self.sleep(seconds, "request")
 
         while True:
+            if not self._retry.check(url):
+                raise exception.HttpError(
+                    "Too many failed requests to '{}' (circuit open)".format(
+                        text.root_from_url(url)), response)
+
+            if self._ratelimit:
+                seconds = self._ratelimit.reserve(url)
+                if seconds > 0.0:
+                    self.sleep(seconds, "rate limit")
+
             try:
-                response = session.request(method, url, **kwargs)
+                if cached:
+                    response = self._httpcache.request(
+                        session, url, self._httpcache_ttl, kwargs)
+                else:
+                    response = session.request(method, url, **kwargs)
             except requests.exceptions.ConnectionError as exc:
                 code = 0
                 try:
@@ -199,6 +228,7 @@ class Extractor():
                 ):
                     if encoding:
                         response.encoding = encoding
+                    self._retry.success(url)
                     return response
                 if notfound and code == 404:
                     raise exception.NotFoundError(notfound)
@@ -210,27 +240,33 @@ class Extractor():
                 if challenge is not None:
                     self.log.warning(challenge)
 
+                if code == 429 and self._ratelimit:
+                    # back off even when '_handle_429()' takes care of it
+                    retry_after = self._ratelimit.penalize(
+                        url, response.headers.get("Retry-After"))
                 if code == 429 and self._handle_429(response):
                     continue
-                elif code == 429 and self._interval_429:
+                elif code == 429 and (self._ratelimit or self._interval_429):
                     pass
                 elif code not in retry_codes and code < 500:
                     break
 
             finally:
-                Extractor.request_timestamp = time.time()
+                self._request_finished()
 
+            self._retry.failure(url)
             self.log.debug("%s (%s/%s)", msg, tries, retries+1)
             if tries > retries:
                 break
 
-            seconds = tries
+            seconds = backoff = self._retry.delay(
+                url, tries, backoff, response.headers if code else None)
             if self._interval:
                 s = self._interval()
                 if seconds < s:
                     seconds = s
-            if code == 429 and self._interval_429:
-                s = self._interval_429()
+            if code == 429 and (retry_after or self._interval_429):
+                s = retry_after or self._interval_429()
                 if seconds < s:
                     seconds = s
                 self.wait(seconds=seconds, reason="429 Too Many Requests")
@@ -240,6 +276,13 @@ class Extractor():
 
         raise exception.HttpError(msg, response)
 
+    def _request_finished(self):
+        timestamps = Extractor.request_timestamps
+        with Extractor.request_lock:
+            now = time.time()
+            if timestamps.get(self.category, 0.0) < now:
+                timestamps[self.category] = now
+
     def request_location(self, url, **kwargs):
         kwargs.setdefault("method", "HEAD")
         kwargs.setdefault("allow_redirects", False)
@@ -279,6 +322,90 @@ class Extractor():
                        seconds, reason)
         time.sleep(seconds)
 
+    def archived(self, kwdict):
+        """Return True if the item described by 'kwdict' is already
+        in the current job's download archive
+
+        Extractors can use this to avoid requesting additional metadata
+        for items that get skipped anyway.
+        Always returns False unless 'archive-probe' is enabled,
+        which is indicated by 'archive_probe'.
+        """
+        return False
+
+    def archived_many(self, kwdicts):
+        """Return a list of archived() results for all 'kwdicts'
+
+        Looks up all items with a single archive query if possible.
+        """
+        return [self.archived(kwdict) for kwdict in kwdicts]
+
+    def _prefetch_pages(self, fetch, page, step=1):
+        """Return an iterator over fetch(page), fetch(page+step), ...
+
+        Fetches up to 'page-prefetch' pages ahead in background threads
+        while preserving their order, and stops after the first empty one.
+        Returns None when prefetching is disabled.
+        """
+        num = self.config("page-prefetch", 0)
+        if not num or num <= 0:
+            return None
+        return self._prefetch_pages_impl(fetch, page, step, num)
+
+    def _prefetch_pages_impl(self, fetch, page, step, num):
+        import collections
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(num)
+        futures = collections.deque()
+        try:
+            for _ in range(num):
+                futures.append(executor.submit(fetch, page))
+                page += step
+
+            while True:
+                result = futures.popleft().result()
+                if not result:
+                    yield result
+                    return
+                futures.append(executor.submit(fetch, page))
+                page += step
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(False)
+
+    def _map_window(self, func, items):
+        """Return an iterator over func(item) for each of 'items'
+
+        Calls 'func' for up to 'metadata-parallel' upcoming items
+        in background threads while preserving their order.
+        'items' itself gets consumed by the calling thread.
+        """
+        num = self.config("metadata-parallel", 0)
+        if not num or num <= 1:
+            return map(func, items)
+        return self._map_window_impl(func, items, num)
+
+    def _map_window_impl(self, func, items, num):
+        import collections
+        from concurrent.futures import ThreadPoolExecutor
+
+        executor = ThreadPoolExecutor(num)
+        futures = collections.deque()
+        try:
+            for item in items:
+                futures.append(executor.submit(func, item))
+                if len(futures) >= num:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(False)
+
     def input(self, prompt, echo=True):
         self._check_input_allowed(prompt)
 
@@ -338,6 +465,33 @@ class Extractor():
             self.config("sleep-429", self.request_interval_429),
         )
 
+        backoff = self.config("retry-backoff", "linear")
+        if backoff not in retry.BACKOFF:
+            self.log.warning("Invalid retry backoff method (%r)", backoff)
+        self._retry = retry.RetryPolicy(
+            backoff,
+            self.config("retry-delay-max", 300.0),
+            self.config("retry-circuit"),
+            self.config("retry-circuit-timeout", 60.0),
+        )
+
+        if self.config("http-cache", False):
+            from .. import httpcache
+            self._httpcache = httpcache.get()
+            self._httpcache_ttl = self.config("http-cache-ttl", 0)
+        else:
+            self._httpcache = None
+
+        rate = self.config("request-rate")
+        if rate:
+            self._ratelimit = ratelimit.build(
+                rate, self.config("request-burst", 1),
+                self.config("request-rate-scope", "host"), self.category)
+            if self._ratelimit is None:
+                self.log.warning("Invalid request rate (%r)", rate)
+        else:
+            self._ratelimit = None
+
         if self._retries < 0:
             self._retries = float("inf")
         if not self._retry_codes:
@@ -127,11 +127,18 @@ class DanbooruExtractor(BaseExtractor):
         params["limit"] = self.per_page
         params["page"] = self.page_start
 
-        first = True
-        while True:
-            posts = self.request(url, params=params).json()
+        def fetch(page):
+            posts = self.request(url, params=dict(params, page=page)).json()
             if isinstance(posts, dict):
                 posts = posts["posts"]
+            return posts
+
+        pages = None if prefix else self._prefetch_pages(
+            fetch, params["page"] or 1)
+
+        first = True
+        while True:
+            posts = next(pages) if pages else fetch(params["page"])
 
             if posts:
                 if self.includes:
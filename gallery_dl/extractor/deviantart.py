@@ -155,6 +155,8 @@ class DeviantartExtractor(Extractor):
                 deviation.update(data)
 
             self.prepare(deviation)
+            if self.comments and "comments" not in deviation:
+                deviation["comments"] = self._deviation_comments(deviation)
             yield Message.Directory, deviation
 
             if "content" in deviation:
@@ -264,12 +266,6 @@ class DeviantartExtractor(Extractor):
         deviation["date"] = text.parse_timestamp(
             deviation["published_time"])
 
-        if self.comments:
-            deviation["comments"] = (
-                self._extract_comments(deviation["deviationid"], "deviation")
-                if deviation["stats"]["comments"] else ()
-            )
-
         # filename metadata
         sub = re.compile(r"\W").sub
         deviation["filename"] = "".join((
@@ -278,6 +274,28 @@ class DeviantartExtractor(Extractor):
             deviation["index_base36"],
         ))
 
+    def _deviation_comments(self, deviation):
+        """Return comments of 'deviation'
+
+        Comments of archived deviations only get requested
+        when their authors' avatars are needed.
+        """
+        if not deviation["stats"]["comments"] or (
+                self.archive_probe and not self.comments_avatars and
+                self._deviation_archived(deviation)):
+            return ()
+        return self._extract_comments(deviation["deviationid"], "deviation")
+
+    def _deviation_archived(self, deviation):
+        """Return True if the main file of 'deviation' is in the archive"""
+        content = deviation.get("content")
+        if not content:
+            return False
+        kwdict = deviation.copy()
+        kwdict["extension"] = text.ext_from_url(
+            content.get("filename") or content["src"])
+        return self.archived(kwdict)
+
     @staticmethod
     def commit(deviation, target):
         url = target["src"]
@@ -75,8 +75,15 @@ class GelbooruBase():
                     tags = [t for t in tags if not t.startswith(tag)]
                 tags = "{} id:{}".format(" ".join(tags), op)
 
+        if pid:
+            pages = self._prefetch_pages(
+                lambda pid: self._api_request(dict(params, pid=pid)),
+                params["pid"])
+        else:
+            pages = None
+
         while True:
-            posts = self._api_request(params)
+            posts = next(pages) if pages else self._api_request(params)
 
             yield from posts
 
@@ -665,11 +665,14 @@ class KemonoAPI():
         offset = text.parse_int(params.get("o"))
         params["o"] = offset - offset % batch
 
-        while True:
-            data = self._call(endpoint, params)
+        def fetch(offset):
+            data = self._call(endpoint, dict(params, o=offset))
+            return data.get(key) if key else data
+
+        pages = self.extractor._prefetch_pages(fetch, params["o"], batch)
 
-            if key:
-                data = data.get(key)
+        while True:
+            data = next(pages) if pages else fetch(params["o"])
             if not data:
                 return
             yield from data
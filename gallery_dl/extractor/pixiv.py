@@ -59,36 +59,29 @@ class PixivExtractor(Extractor):
         ratings = {0: "General", 1: "R-18", 2: "R-18G"}
         metadata = self.metadata()
 
+        def extract(works):
+            for work in works:
+                if not work["user"]["id"]:
+                    continue
+                files = self._extract_files(work)
+                extend = not (files and self.archive_probe and
+                              self._files_archived(work, files))
+                if extend and self.meta_user:
+                    # fill the 'user_detail' cache on this thread
+                    # to only request each user once
+                    self.api.user_detail(str(work["user"]["id"]))
+                yield work, files, extend
+
+        def extend(args):
+            work, files, extend = args
+            if extend:
+                self._extend_work(work)
+            return work, files
+
         works = self.works()
         if self.max_posts:
             works = itertools.islice(works, self.max_posts)
-        for work in works:
-            if not work["user"]["id"]:
-                continue
-
-            files = self._extract_files(work)
-
-            if self.meta_user:
-                work.update(self.api.user_detail(str(work["user"]["id"])))
-            if self.meta_comments:
-                if work["total_comments"] and not work.get("_ajax"):
-                    try:
-                        work["comments"] = list(
-                            self.api.illust_comments(work["id"]))
-                    except Exception:
-                        work["comments"] = ()
-                else:
-                    work["comments"] = ()
-            if self.meta_bookmark and work["is_bookmarked"]:
-                detail = self.api.illust_bookmark_detail(work["id"])
-                work["tags_bookmark"] = [tag["name"] for tag in detail["tags"]
-                                         if tag["is_registered"]]
-            if self.meta_captions and not work.get("caption") and \
-                    not work.get("_mypixiv") and not work.get("_ajax"):
-                body = self._request_ajax("/illust/" + str(work["id"]))
-                if body:
-                    work["caption"] = text.unescape(body["illustComment"])
-
+        for work, files in self._map_window(extend, extract(works)):
             if transform_tags:
                 transform_tags(work)
             work["num"] = 0
@@ -104,6 +97,43 @@ class PixivExtractor(Extractor):
                 work["date_url"] = self._date_from_url(url)
                 yield Message.Url, url, text.nameext_from_url(url, work)
 
+    def _extend_work(self, work):
+        """Add user, comment, bookmark, and caption metadata to 'work'"""
+        if self.meta_user:
+            work.update(self.api.user_detail(str(work["user"]["id"])))
+        if self.meta_comments:
+            if work["total_comments"] and not work.get("_ajax"):
+                try:
+                    work["comments"] = list(
+                        self.api.illust_comments(work["id"]))
+                except Exception:
+                    work["comments"] = ()
+            else:
+                work["comments"] = ()
+        if self.meta_bookmark and work["is_bookmarked"]:
+            detail = self.api.illust_bookmark_detail(work["id"])
+            work["tags_bookmark"] = [tag["name"] for tag in detail["tags"]
+                                     if tag["is_registered"]]
+        if self.meta_captions and not work.get("caption") and \
+                not work.get("_mypixiv") and not work.get("_ajax"):
+            body = self._request_ajax("/illust/" + str(work["id"]))
+            if body:
+                work["caption"] = text.unescape(body["illustComment"])
+
+    def _files_archived(self, work, files):
+        """Return True if all 'files' of 'work' are in the download archive"""
+        kwdicts = []
+        for num, file in enumerate(files):
+            kwdict = work.copy()
+            kwdict["suffix"] = ""
+            kwdict["num"] = num
+            kwdict.update(file)
+            kwdicts.append(text.nameext_from_url(file["url"], kwdict))
+        if not all(self.archived_many(kwdicts)):
+            return False
+        self.log.debug("%s: Skipping metadata of archived work", work["id"])
+        return True
+
     def _extract_files(self, work):
         meta_single_page = work["meta_single_page"]
         meta_pages = work["meta_pages"]
@@ -121,6 +121,9 @@ class StringFormatter():
             else:
                 self.format_map = lambda _: format_string
             del self.result, self.fields
+        elif _COMPILE:
+            self.format_map = _Compiler(default, fmt).compile(format_string)
+            del self.result, self.fields
 
     def format_map(self, kwdict):
         """Apply 'kwdict' to the initial format_string and return its result"""
@@ -242,22 +245,139 @@ class TemplateFStringFormatter(FStringFormatter):
         FStringFormatter.__init__(self, fstring, default, fmt)
 
 
+class _Compiler():
+    """Generate Python code equivalent to StringFormatter.format_map()
+
+    Each replacement field gets turned into an inline expression
+    or a try-except block instead of a call to a closure.
+    Conversions and format specifiers without '_FORMAT_SPECIFIERS'
+    get called directly, everything else reuses the regular
+    format functions.
+    """
+
+    def __init__(self, default=NONE, fmt=format):
+        self.fmt = fmt
+        self.namespace = {"_default": default, "_fmt": fmt}
+        self.lines = []
+
+    def compile(self, format_string):
+        parts = []
+        for literal_text, field_name, format_spec, conversion in \
+                _string.formatter_parser(format_string):
+            if literal_text:
+                parts.append(repr(literal_text))
+            if field_name:
+                parts.append(self.field(field_name, format_spec, conversion))
+
+        self.lines.append('    return "".join(({},))'.format(", ".join(parts)))
+        source = "def format_map(kwdict):\n" + "\n".join(self.lines)
+        exec(compile(source, "<format string>", "exec"), self.namespace)
+        return self.namespace["format_map"]
+
+    def field(self, field_name, format_spec, conversion):
+        value = self.access(field_name)
+
+        if conversion:
+            value = "{}({})".format(
+                self.constant(_CONVERSIONS[conversion]), value)
+            if not format_spec:
+                return value
+
+        if not format_spec:
+            return "_fmt({})".format(value)
+        if format_spec[0] not in _FORMAT_SPECIFIERS:
+            return "format({}, {!r})".format(value, format_spec)
+        return "{}({})".format(self.constant(
+            _build_format_func(format_spec, self.fmt)), value)
+
+    def access(self, field_name):
+        if "|" in field_name:
+            return self.access_list(field_name.split("|"))
+
+        if field_name[0] == "'":
+            return repr(field_name[1:-1])
+
+        key, getters = _parse_field_name(field_name)
+        if key not in _GLOBALS and not getters:
+            return "(kwdict[{0!r}] if {0!r} in kwdict else _default)".format(
+                key)
+
+        variable = self.variable()
+        self.lines.extend((
+            "    try:",
+            "        {} = {}".format(variable, self.expression(key, getters)),
+            "    except Exception:",
+            "        {} = _default".format(variable),
+        ))
+        return variable
+
+    def access_list(self, field_names):
+        variable = self.variable()
+        indent = "    "
+
+        for field_name in field_names:
+            key, getters = _parse_field_name(field_name)
+            self.lines.extend((
+                indent + "try:",
+                indent + "    {} = {}".format(
+                    variable, self.expression(key, getters)),
+                indent + "except Exception:",
+                indent + "    {} = None".format(variable),
+                indent + "if not {}:".format(variable),
+            ))
+            indent += "    "
+
+        self.lines[-1] = "    if {} is None:".format(variable)
+        self.lines.append("        {} = _default".format(variable))
+        return variable
+
+    def expression(self, key, getters):
+        if key in _GLOBALS:
+            expr = self.constant(_GLOBALS[key]) + "()"
+        else:
+            expr = "kwdict[{!r}]".format(key)
+
+        for getter, value in getters:
+            if getter is operator.itemgetter:
+                expr = "{}[{}]".format(expr, self.constant(value))
+            elif getter is operator.attrgetter:
+                expr = "getattr({}, {!r})".format(expr, value)
+            else:
+                expr = "{}({})".format(self.constant(getter(value)), expr)
+        return expr
+
+    def constant(self, value):
+        if value.__class__ is str or value.__class__ is int:
+            return repr(value)
+        name = "_c{}".format(len(self.namespace))
+        self.namespace[name] = value
+        return name
+
+    def variable(self):
+        return "v{}".format(len(self.lines))
+
+
 def parse_field_name(field_name):
+    first, rest = _parse_field_name(field_name)
+    return first, [getter(key) for getter, key in rest]
+
+
+def _parse_field_name(field_name):
     if field_name[0] == "'":
-        return "_lit", (operator.itemgetter(field_name[1:-1]),)
+        return "_lit", ((operator.itemgetter, field_name[1:-1]),)
 
     first, rest = _string.formatter_field_name_split(field_name)
-    funcs = []
+    getters = []
 
     for is_attr, key in rest:
         if is_attr:
-            func = operator.attrgetter
+            getter = operator.attrgetter
         else:
-            func = operator.itemgetter
+            getter = operator.itemgetter
             try:
                 if ":" in key:
                     if key[0] == "b":
-                        func = _bytesgetter
+                        getter = _bytesgetter
                         key = _slice(key[1:])
                     else:
                         key = _slice(key)
@@ -266,9 +386,9 @@ def parse_field_name(field_name):
             except TypeError:
                 pass  # key is an integer
 
-        funcs.append(func(key))
+        getters.append((getter, key))
 
-    return first, funcs
+    return first, getters
 
 
 def _slice(indices):
@@ -471,6 +591,7 @@ class Literal():
 _literal = Literal()
 
 _CACHE = {}
+_COMPILE = False
 _SEPARATOR = "/"
 _GLOBALS = {
     "_env": lambda: os.environ,
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Persistent cache for HTTP responses of API and page requests"""
+
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import sqlite3
+import datetime
+import threading
+import requests
+from . import config, text, util
+
+_instance = None
+_lock = threading.Lock()
+
+# request headers carrying credentials
+credential_header = re.compile(
+    r"(?i)auth|cookie|token|key|session|csrf").search
+
+
+class HttpCache():
+    """SQLite3 database of compressed HTTP responses
+
+    Entries younger than a request's 'ttl' get returned without sending
+    any request. Older entries get revalidated with 'If-None-Match' and
+    'If-Modified-Since' headers. The least recently used entries get
+    removed when the size of all bodies exceeds 'maxsize'.
+
+    Responses get stored under their request URL and the values of all
+    headers that might carry credentials, e.g. 'Authorization' and
+    'Cookie', so they only get reused for the same account.
+    """
+
+    def __init__(self, path, maxsize=0):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.db = db = sqlite3.connect(
+            path, timeout=60, check_same_thread=False,
+            isolation_level=None)
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, "
+            "url TEXT, "
+            "headers TEXT, "
+            "encoding TEXT, "
+            "body BLOB, "
+            "size INTEGER, "
+            "stored INTEGER, "
+            "accessed INTEGER)"
+        )
+        self.size = db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def request(self, session, url, ttl=0, kwargs=None):
+        """Send a GET request for 'url' or return a cached response"""
+        if kwargs is None:
+            kwargs = {}
+
+        request = session.prepare_request(requests.Request(
+            "GET", url,
+            params=kwargs.get("params"),
+            headers=kwargs.get("headers"),
+            cookies=kwargs.get("cookies"),
+            auth=kwargs.get("auth"),
+        ))
+        key = self.key(request)
+        entry = self.get(key)
+
+        if entry is not None:
+            _, headers, encoding, body, stored = entry
+            now = time.time()
+            if ttl and now - stored < ttl:
+                self.touch(key, stored)
+                return self.response(entry, request)
+
+            validators = {}
+            if "etag" in headers:
+                validators["If-None-Match"] = headers["etag"]
+            if "last-modified" in headers:
+                validators["If-Modified-Since"] = headers["last-modified"]
+            if validators:
+                kwargs = kwargs.copy()
+                if kwargs.get("headers"):
+                    validators = dict(kwargs["headers"], **validators)
+                kwargs["headers"] = validators
+
+        response = session.request("GET", url, **kwargs)
+        code = response.status_code
+
+        if code == 304 and entry is not None:
+            self.touch(key, time.time())
+            return self.response(entry, request)
+        if code == 200 and self.cacheable(response, ttl):
+            self.store(key, response)
+        return response
+
+    def cacheable(self, response, ttl):
+        headers = response.headers
+        if "no-store" in headers.get("cache-control", ""):
+            return False
+        return ttl or "etag" in headers or "last-modified" in headers
+
+    def key(self, request):
+        """Return the cache key for a prepared request"""
+        credentials = sorted(
+            (name.lower(), value)
+            for name, value in request.headers.items()
+            if credential_header(name)
+        )
+        if not credentials:
+            return request.url
+        return "{}\n{}".format(request.url, hashlib.sha1(
+            json.dumps(credentials).encode()).hexdigest())
+
+    def response(self, entry, request):
+        """Build a requests.Response object from a cache entry"""
+        url, headers, encoding, body, stored = entry
+        if request.url != url:
+            # final URL after redirects
+            request = request.copy()
+            request.url = url
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = url
+        response.request = request
+        response.headers = requests.structures.CaseInsensitiveDict(headers)
+        response.encoding = encoding
+        response._content = body
+        response.elapsed = datetime.timedelta()
+        response.from_cache = True
+        return response
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, headers, encoding, body, stored "
+                "FROM responses WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        url, headers, encoding, body, stored = row
+        try:
+            return (url, json.loads(headers), encoding,
+                    zlib.decompress(body), stored)
+        except (ValueError, zlib.error):
+            return None
+
+    def touch(self, key, stored):
+        with self.lock:
+            self.db.execute(
+                "UPDATE responses SET stored=?, accessed=? WHERE key=?",
+                (int(stored), time.time(), key))
+
+    def store(self, key, response):
+        headers = {
+            key.lower(): value
+            for key, value in response.headers.items()
+            if key.lower() != "set-cookie"
+        }
+        body = zlib.compress(response.content)
+        size = len(body)
+        now = time.time()
+
+        with self.lock:
+            db = self.db
+            row = db.execute(
+                "SELECT size FROM responses WHERE key=?", (key,)).fetchone()
+            if row is not None:
+                self.size -= row[0]
+            db.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, url, headers, encoding, body, size, stored, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, json.dumps(headers), response.encoding,
+                 body, size, int(now), now))
+            self.size += size
+
+            if self.maxsize and self.size > self.maxsize:
+                self._evict(self.size - self.maxsize * 0.9)
+
+    def _evict(self, amount):
+        keys = []
+        freed = 0
+        for key, size in self.db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed"
+        ).fetchall():
+            keys.append((key,))
+            freed += size
+            if freed >= amount:
+                break
+
+        self.db.executemany("DELETE FROM responses WHERE key=?", keys)
+        self.size -= freed
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.size = 0
+
+    def close(self):
+        self.db.close()
+
+
+def get():
+    """Return the shared HttpCache instance or None"""
+    global _instance
+
+    if _instance is None:
+        with _lock:
+            if _instance is None:
+                _instance = _init()
+    return _instance or None
+
+
+def _init():
+    path = _path()
+    if not path:
+        return False
+
+    maxsize = config.get(("cache",), "http-size", "256M")
+    if isinstance(maxsize, str):
+        maxsize = text.parse_bytes(maxsize)
+
+    try:
+        # restrict access permissions for new db files
+        os.close(os.open(path, os.O_CREAT | os.O_RDONLY, 0o600))
+        return HttpCache(path, maxsize)
+    except (OSError, sqlite3.Error):
+        return False
+
+
+def _path():
+    path = config.get(("cache",), "http-file", True)
+    if path is True:
+        from . import cache
+        try:
+            path = cache._path()
+        except OSError:
+            return None
+        if path and path != ":memory:":
+            return os.path.join(os.path.dirname(path), "http.sqlite3")
+    elif path:
+        return util.expand_path(path)
+    return None
@@ -7,8 +7,10 @@
 # published by the Free Software Foundation.
 
 import sys
+import json
 import errno
 import logging
+import threading
 import functools
 import collections
 
@@ -28,6 +30,7 @@ from . import (
 )
 from .extractor.message import Message
 stdout_write = output.stdout_write
+_visited_lock = threading.Lock()
 
 
 class Job():
@@ -151,22 +154,40 @@ class Job():
         try:
             for msg in extractor:
                 self.dispatch(msg)
+            self.handle_pending()
         except exception.StopExtraction as exc:
             if exc.message:
                 log.error(exc.message)
             self.status |= exc.code
         except (exception.TerminateExtraction, exception.RestartExtraction):
             raise
-        except exception.GalleryDLException as exc:
+        except Exception as exc:
+            self.handle_exception(exc)
+        except BaseException:
+            self.status |= 1
+            raise
+        else:
+            if msg is None:
+                log.info("No results for %s", extractor.url)
+        finally:
+            self.handle_finalize()
+            extractor.finalize()
+
+        return self.status
+
+    def handle_exception(self, exc):
+        """Log an exception raised during extraction and update 'status'"""
+        log = self.extractor.log
+        if isinstance(exc, exception.GalleryDLException):
             log.error("%s: %s", exc.__class__.__name__, exc)
             log.debug("", exc_info=exc)
             self.status |= exc.code
-        except OSError as exc:
+        elif isinstance(exc, OSError):
             log.error("Unable to download data:  %s: %s",
                       exc.__class__.__name__, exc)
             log.debug("", exc_info=exc)
             self.status |= 128
-        except Exception as exc:
+        else:
             log.error(("An unexpected error occurred: %s - %s. "
                        "Please run gallery-dl again with the --verbose flag, "
                        "copy its output and report this issue on "
@@ -174,17 +195,6 @@ class Job():
                       exc.__class__.__name__, exc)
             log.debug("", exc_info=exc)
             self.status |= 1
-        except BaseException:
-            self.status |= 1
-            raise
-        else:
-            if msg is None:
-                log.info("No results for %s", extractor.url)
-        finally:
-            self.handle_finalize()
-            extractor.finalize()
-
-        return self.status
 
     def dispatch(self, msg):
         """Call the appropriate message handler"""
@@ -216,6 +226,9 @@ class Job():
     def handle_queue(self, url, kwdict):
         """Handle Message.Queue"""
 
+    def handle_pending(self):
+        """Finish work still running in the background"""
+
     def handle_finalize(self):
         """Handle job finalization"""
 
@@ -290,9 +303,33 @@ class DownloadJob(Job):
         self.downloaders = {}
         self.out = output.select()
         self.visited = parent.visited if parent else set()
+        self.workers = 0
+        self._deferred = None
         self._extractor_filter = None
+        self._archive_init = None
         self._skipcnt = 0
 
+        # jobs below a 'children-parallel' worker run their children
+        # sequentially instead of starting nested worker pools
+        self.pooled = parent.pooled if parent else False
+        children = self.extractor.config("children-parallel")
+        if children and children > 1 and not self.pooled:
+            self.children = children
+            self._children_executor = None
+        else:
+            self.children = 0
+
+    def _init(self):
+        Job._init(self)
+
+        # install before extraction starts,
+        # the archive itself gets opened on first use
+        cfg = self.extractor.config
+        if cfg("archive-probe") and cfg("archive") and cfg("skip", True):
+            self.extractor.archive_probe = True
+            self.extractor.archived = self._archive_probe
+            self.extractor.archived_many = self._archive_probe_many
+
     def handle_url(self, url, kwdict):
         """Download the resource specified in 'url'"""
         hooks = self.hooks
@@ -314,6 +351,10 @@ class DownloadJob(Job):
         if pathfmt.extension and not self.metadata_http:
             pathfmt.build_path()
 
+            if self.workers and pathfmt.realpath in self._downloading:
+                # wait for an earlier download to the same file
+                self.download_wait(pathfmt.realpath)
+
             if pathfmt.exists():
                 if archive and self._archive_write_skip:
                     archive.add(kwdict)
@@ -333,6 +374,10 @@ class DownloadJob(Job):
         if self.sleep:
             self.extractor.sleep(self.sleep(), "download")
 
+        if self.workers:
+            self.download_submit(url, kwdict)
+            return
+
         # download from URL
         if not self.download(url):
 
@@ -344,19 +389,29 @@ class DownloadJob(Job):
                 if self.download(url):
                     break
             else:
-                # download failed
-                self.status |= 4
-                self.log.error("Failed to download %s",
-                               pathfmt.filename or url)
-                if "error" in hooks:
-                    for callback in hooks["error"]:
-                        callback(pathfmt)
+                self.handle_download_error(url, pathfmt)
                 return
 
+        self.handle_download_success(kwdict, pathfmt)
+
+    def handle_download_error(self, url, pathfmt):
+        """Handle a failed download"""
+        self.status |= 4
+        self.log.error("Failed to download %s",
+                       pathfmt.filename or url)
+        if "error" in self.hooks:
+            for callback in self.hooks["error"]:
+                callback(pathfmt)
+
+    def handle_download_success(self, kwdict, pathfmt):
+        """Run post processors and finalize a successful download"""
+        hooks = self.hooks
+        archive = self.archive
+
         if not pathfmt.temppath:
             if archive and self._archive_write_skip:
                 archive.add(kwdict)
-            self.handle_skip()
+            self.handle_skip(pathfmt)
             return
 
         # run post processors
@@ -366,20 +421,144 @@ class DownloadJob(Job):
 
         # download succeeded
         pathfmt.finalize()
-        self.out.success(pathfmt.path)
         self._skipcnt = 0
-        if archive and self._archive_write_file:
-            archive.add(kwdict)
-        if "after" in hooks:
-            for callback in hooks["after"]:
+        if pathfmt.pending is not None:
+            # a post processor finishes this file in the background
+            self.deferred_submit(pathfmt)
+        else:
+            self.handle_download_finish(kwdict, pathfmt)
+
+    def handle_download_finish(self, kwdict, pathfmt):
+        """Record a finished file and run 'after' post processors"""
+        self.out.success(pathfmt.path)
+        if self.archive and self._archive_write_file:
+            self.archive.add(kwdict)
+        if "after" in self.hooks:
+            for callback in self.hooks["after"]:
                 callback(pathfmt)
 
+    def deferred_submit(self, pathfmt):
+        """Finish 'pathfmt' once its 'pending' future returned True
+
+        Files get finished in submission order.
+        """
+        if self._deferred is None:
+            self._deferred = collections.deque()
+        deferred = self._deferred
+
+        future = pathfmt.pending
+        pathfmt.pending = None
+        deferred.append((future, pathfmt.copy()))
+
+        while deferred and deferred[0][0].done():
+            self.deferred_complete()
+
+    def deferred_complete(self):
+        """Wait for the oldest deferred file and finish it"""
+        future, pathfmt = self._deferred.popleft()
+        if future.result():
+            self.handle_download_finish(pathfmt.kwdict, pathfmt)
+
+    def deferred_wait(self):
+        """Finish all deferred files"""
+        while self._deferred:
+            self.deferred_complete()
+
+    def download_submit(self, url, kwdict):
+        """Download 'url' in a worker thread
+
+        Downloads are finished in submission order on the calling thread,
+        so post processors, archive writes, and output stay sequential.
+        """
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(
+                self.workers, "download-worker")
+            self._pending = collections.deque()
+            self._local = threading.local()
+
+        # snapshot of the current PathFormat state with its own 'kwdict'
+        pathfmt = self.pathfmt.copy()
+        pathfmt.started = False
+        path = pathfmt.realpath
+        if path:
+            self._downloading.add(path)
+        self._pending.append((self._executor.submit(
+            self._download_worker, url, pathfmt), url, pathfmt, path))
+
+        if len(self._pending) >= self.workers * 2:
+            self.download_complete()
+
+    def download_complete(self):
+        """Wait for the oldest submitted download and finish it"""
+        future, url, pathfmt, path = self._pending.popleft()
+        self._downloading.discard(path)
+        success = future.result()
+        if pathfmt.started:
+            self.out.start(pathfmt.path)
+        if success:
+            self.handle_download_success(pathfmt.kwdict, pathfmt)
+        else:
+            self.handle_download_error(url, pathfmt)
+
+    def download_wait(self, path=None):
+        """Finish all pending downloads
+
+        With 'path', only wait until the download to 'path' is finished.
+        """
+        if self._executor is not None:
+            while self._pending:
+                self.download_complete()
+                if path and path not in self._downloading:
+                    break
+
+    def _download_worker(self, url, pathfmt):
+        local = self._local
+        try:
+            downloaders = local.downloaders
+        except AttributeError:
+            downloaders = local.downloaders = {}
+            local.out = WorkerOutput()
+        local.out.pathfmt = pathfmt
+
+        if self._download_url(url, pathfmt, downloaders):
+            return True
+
+        # use fallback URLs if available/enabled
+        kwdict = pathfmt.kwdict
+        fallback = kwdict.get("_fallback", ()) if self.fallback else ()
+        for num, url in enumerate(fallback, 1):
+            util.remove_file(pathfmt.temppath)
+            self.log.info("Trying fallback URL #%d", num)
+            if self._download_url(url, pathfmt, downloaders):
+                return True
+        return False
+
+    def _download_url(self, url, pathfmt, downloaders):
+        scheme = url.partition(":")[0]
+        downloader = self.get_downloader(scheme, downloaders)
+        if downloader:
+            if downloaders is not self.downloaders:
+                # concurrent progress output would garble the terminal
+                downloader.out = self._local.out
+            try:
+                return downloader.download(url, pathfmt)
+            except OSError as exc:
+                if exc.errno == errno.ENOSPC:
+                    raise
+                self.log.warning("%s: %s", exc.__class__.__name__, exc)
+                return False
+        self._write_unsupported(url)
+        return False
+
     def handle_directory(self, kwdict):
         """Set and create the target directory for downloads"""
         if not self.pathfmt:
             self.initialize(kwdict)
         else:
             if "post-after" in self.hooks:
+                if self.workers:
+                    self.download_wait()
                 for callback in self.hooks["post-after"]:
                     callback(self.pathfmt)
             self.pathfmt.set_directory(kwdict)
@@ -388,9 +567,11 @@ class DownloadJob(Job):
                 callback(self.pathfmt)
 
     def handle_queue(self, url, kwdict):
-        if url in self.visited:
-            return
-        self.visited.add(url)
+        visited = self.visited
+        with _visited_lock:
+            if url in visited:
+                return
+            visited.add(url)
 
         cls = kwdict.get("_extractor")
         if cls:
@@ -426,38 +607,130 @@ class DownloadJob(Job):
                     if kwdict:
                         job.kwdict.update(kwdict)
 
-            while True:
-                try:
-                    if pextr.config("parent-skip"):
-                        job._skipcnt = self._skipcnt
-                        status = job.run()
-                        self._skipcnt = job._skipcnt
-                    else:
-                        status = job.run()
-
-                    if status:
-                        self.status |= status
-                        if (status & 95 and   # not FormatError or OSError
-                                "_fallback" in kwdict and self.fallback):
-                            fallback = kwdict["_fallback"] = \
-                                iter(kwdict["_fallback"])
-                            try:
-                                url = next(fallback)
-                            except StopIteration:
-                                pass
-                            else:
-                                text.nameext_from_url(url, kwdict)
-                                if url.startswith("ytdl:"):
-                                    kwdict["extension"] = ""
-                                self.handle_url(url, kwdict)
-                    break
-                except exception.RestartExtraction:
-                    pass
+            if pextr.config("parent-skip"):
+                # skip counts get passed from one child to the next
+                job._skipcnt = self._skipcnt
+                status = self._run_child(job)
+                self._skipcnt = job._skipcnt
+            elif self.children:
+                return self.children_submit(job, kwdict)
+            else:
+                status = self._run_child(job)
+            self.handle_child_status(status, kwdict)
 
         else:
             self._write_unsupported(url)
 
+    def handle_child_status(self, status, kwdict):
+        """Handle the exit status of a finished child job"""
+        if not status:
+            return
+        self.status |= status
+        if (status & 95 and   # not FormatError or OSError
+                "_fallback" in kwdict and self.fallback):
+            fallback = kwdict["_fallback"] = iter(kwdict["_fallback"])
+            try:
+                url = next(fallback)
+            except StopIteration:
+                pass
+            else:
+                text.nameext_from_url(url, kwdict)
+                if url.startswith("ytdl:"):
+                    kwdict["extension"] = ""
+                self.handle_url(url, kwdict)
+
+    def children_submit(self, job, kwdict):
+        """Run child 'job' in a worker thread
+
+        Exit statuses get handled on the calling thread,
+        either in submission order or, with 'children-ordered'
+        disabled, in the order jobs finish.
+        """
+        if self._children_executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._children_executor = ThreadPoolExecutor(
+                self.children, "child-job")
+            self._children_pending = collections.deque()
+            self._children_ordered = self.extractor.config(
+                "children-ordered", True)
+
+        job.pooled = True
+        job.children = 0
+        # concurrent progress output would garble the terminal
+        job.out = ChildOutput(job.out)
+
+        self._children_pending.append((self._children_executor.submit(
+            self._run_child, job), kwdict))
+
+        if len(self._children_pending) >= self.children * 2:
+            self.children_complete()
+
+    def children_complete(self):
+        """Wait for a submitted child job and handle its exit status"""
+        pending = self._children_pending
+        if self._children_ordered:
+            future, kwdict = pending.popleft()
+        else:
+            from concurrent.futures import wait, FIRST_COMPLETED
+            done = wait([f for f, _ in pending], None, FIRST_COMPLETED)[0]
+            for index, (future, kwdict) in enumerate(pending):
+                if future in done:
+                    del pending[index]
+                    break
+        self.handle_child_status(future.result(), kwdict)
+
+    def children_wait(self):
+        """Wait for all submitted child jobs"""
+        if self._children_executor is not None:
+            while self._children_pending:
+                self.children_complete()
+
+    @staticmethod
+    def _run_child(job):
+        while True:
+            try:
+                return job.run()
+            except exception.RestartExtraction:
+                pass
+
+    def handle_pending(self):
+        if self.children and self._children_executor is not None:
+            self.children_wait()
+        if self.workers and self._executor is not None:
+            self.download_wait()
+        if self._deferred:
+            self.deferred_wait()
+
     def handle_finalize(self):
+        children = self.children and self._children_executor is not None
+        workers = self.workers and self._executor is not None
+
+        if children or workers or self._deferred:
+            # finish work left over after an exception in run()
+            try:
+                self.handle_pending()
+            except exception.StopExtraction as exc:
+                if exc.message:
+                    self.log.error(exc.message)
+                self.status |= exc.code
+                self._cancel_pending()
+            except (exception.TerminateExtraction,
+                    exception.RestartExtraction):
+                self._cancel_pending()
+                raise
+            except Exception as exc:
+                self.handle_exception(exc)
+                self._cancel_pending()
+            except BaseException:
+                self.status |= 1
+                self._cancel_pending()
+                raise
+            finally:
+                if children:
+                    self._children_executor.shutdown()
+                if workers:
+                    self._executor.shutdown()
+
         if self.archive:
             if not self.status:
                 self.archive.finalize()
@@ -484,8 +757,22 @@ class DownloadJob(Job):
                     for callback in hooks["finalize-success"]:
                         callback(pathfmt)
 
-    def handle_skip(self):
-        pathfmt = self.pathfmt
+    def _cancel_pending(self):
+        if self.children and self._children_executor is not None:
+            for future, _ in self._children_pending:
+                future.cancel()
+            self._children_pending.clear()
+        if self.workers and self._executor is not None:
+            for future, _, _, _ in self._pending:
+                future.cancel()
+            self._pending.clear()
+            self._downloading.clear()
+        if self._deferred:
+            self._deferred.clear()
+
+    def handle_skip(self, pathfmt=None):
+        if pathfmt is None:
+            pathfmt = self.pathfmt
         if "skip" in self.hooks:
             for callback in self.hooks["skip"]:
                 callback(pathfmt)
@@ -499,23 +786,14 @@ class DownloadJob(Job):
 
     def download(self, url):
         """Download 'url'"""
-        scheme = url.partition(":")[0]
-        downloader = self.get_downloader(scheme)
-        if downloader:
-            try:
-                return downloader.download(url, self.pathfmt)
-            except OSError as exc:
-                if exc.errno == errno.ENOSPC:
-                    raise
-                self.log.warning("%s: %s", exc.__class__.__name__, exc)
-                return False
-        self._write_unsupported(url)
-        return False
+        return self._download_url(url, self.pathfmt, self.downloaders)
 
-    def get_downloader(self, scheme):
+    def get_downloader(self, scheme, downloaders=None):
         """Return a downloader suitable for 'scheme'"""
+        if downloaders is None:
+            downloaders = self.downloaders
         try:
-            return self.downloaders[scheme]
+            return downloaders[scheme]
         except KeyError:
             pass
 
@@ -527,9 +805,9 @@ class DownloadJob(Job):
             self.log.error("'%s:' URLs are not supported/enabled", scheme)
 
         if cls and cls.scheme == "http":
-            self.downloaders["http"] = self.downloaders["https"] = instance
+            downloaders["http"] = downloaders["https"] = instance
         else:
-            self.downloaders[scheme] = instance
+            downloaders[scheme] = instance
         return instance
 
     def initialize(self, kwdict=None):
@@ -546,44 +824,16 @@ class DownloadJob(Job):
         if not cfg("download", True):
             # monkey-patch method to do nothing and always return True
             self.download = pathfmt.fix_extension
+        else:
+            workers = cfg("downloads-parallel")
+            if workers and workers > 1:
+                self.workers = workers
+                self._executor = None
+                # target paths of submitted downloads
+                self._downloading = set()
 
-        archive_path = cfg("archive")
-        if archive_path:
-            archive_table = cfg("archive-table")
-            archive_prefix = cfg("archive-prefix")
-            if archive_prefix is None:
-                archive_prefix = extr.category if archive_table is None else ""
-
-            archive_format = cfg("archive-format")
-            if archive_format is None:
-                archive_format = extr.archive_fmt
-
-            try:
-                self.archive = archive.connect(
-                    archive_path,
-                    archive_prefix,
-                    archive_format,
-                    archive_table,
-                    cfg("archive-mode"),
-                    cfg("archive-pragma"),
-                    kwdict,
-                )
-            except Exception as exc:
-                extr.log.warning(
-                    "Failed to open download archive at '%s' (%s: %s)",
-                    archive_path, exc.__class__.__name__, exc)
-            else:
-                extr.log.debug("Using download archive '%s'", archive_path)
-
-                events = cfg("archive-event")
-                if events is None:
-                    self._archive_write_file = True
-                    self._archive_write_skip = False
-                else:
-                    if isinstance(events, str):
-                        events = events.split(",")
-                    self._archive_write_file = ("file" in events)
-                    self._archive_write_skip = ("skip" in events)
+        if self._archive_init is None:
+            self.initialize_archive(kwdict)
 
         skip = cfg("skip", True)
         if skip:
@@ -668,6 +918,74 @@ class DownloadJob(Job):
                     for callback in self.hooks["init"]:
                         callback(pathfmt)
 
+    def initialize_archive(self, kwdict=None):
+        """Open the download archive"""
+        extr = self.extractor
+        cfg = extr.config
+        self._archive_init = True
+
+        archive_path = cfg("archive")
+        if archive_path:
+            archive_table = cfg("archive-table")
+            archive_prefix = cfg("archive-prefix")
+            if archive_prefix is None:
+                archive_prefix = extr.category if archive_table is None else ""
+
+            archive_format = cfg("archive-format")
+            if archive_format is None:
+                archive_format = extr.archive_fmt
+
+            try:
+                self.archive = archive.connect(
+                    archive_path,
+                    archive_prefix,
+                    archive_format,
+                    archive_table,
+                    cfg("archive-mode"),
+                    cfg("archive-pragma"),
+                    kwdict,
+                    batch_size=cfg("archive-batch-size"),
+                    batch_interval=cfg("archive-batch-interval"),
+                    bloom=cfg("archive-bloom"),
+                )
+            except Exception as exc:
+                extr.log.warning(
+                    "Failed to open download archive at '%s' (%s: %s)",
+                    archive_path, exc.__class__.__name__, exc)
+            else:
+                extr.log.debug("Using download archive '%s'", archive_path)
+
+                events = cfg("archive-event")
+                if events is None:
+                    self._archive_write_file = True
+                    self._archive_write_skip = False
+                else:
+                    if isinstance(events, str):
+                        events = events.split(",")
+                    self._archive_write_file = ("file" in events)
+                    self._archive_write_skip = ("skip" in events)
+
+    def _archive_probe(self, kwdict):
+        """Check the download archive on behalf of the extractor"""
+        kwdict = kwdict.copy()
+        self.update_kwdict(kwdict)
+        if self._archive_init is None:
+            self.initialize_archive(kwdict)
+        return bool(self.archive and self.archive.check(kwdict))
+
+    def _archive_probe_many(self, kwdicts):
+        """Check the download archive for multiple items at once"""
+        update = self.update_kwdict
+        kwdicts = [kwdict.copy() for kwdict in kwdicts]
+        for kwdict in kwdicts:
+            update(kwdict)
+
+        if self._archive_init is None and kwdicts:
+            self.initialize_archive(kwdicts[0])
+        if not self.archive:
+            return [False] * len(kwdicts)
+        return self.archive.prefetch(kwdicts)
+
     def register_hooks(self, hooks, options=None):
         expr = options.get("filter") if options else None
 
@@ -896,6 +1214,13 @@ class DataJob(Job):
         if self.resolve > 0:
             self.handle_queue = self.handle_queue_resolve
 
+        if file:
+            stream = config.get(("output",), "json-stream")
+            if stream:
+                self.data = DataStream(
+                    file, self.ascii, stream == "lines",
+                    config.get(("output",), "num-to-str", False))
+
     def run(self):
         self._init()
 
@@ -916,6 +1241,11 @@ class DataJob(Job):
         except BaseException:
             pass
 
+        if self.data.__class__ is DataStream:
+            if self.file:
+                self.data.close()
+            return 0
+
         # convert numbers to string
         if config.get(("output",), "num-to-str", False):
             for msg in self.data:
@@ -953,3 +1283,87 @@ class DataJob(Job):
         job = self.__class__(extr, self, None, self.ascii, self.resolve-1)
         job.data = self.data
         job.run()
+
+        if self.data.__class__ is DataStream and self.data.fp is None:
+            raise exception.StopExtraction()
+
+
+class DataStream():
+    """Write DataJob messages to 'fp' as soon as they get added
+
+    Either as a JSON array formatted like the output of util.dump_json()
+    or as JSON Lines with one compact message per line.
+    """
+
+    def __init__(self, fp, ensure_ascii=True, lines=False, num_to_str=False):
+        self.fp = fp
+        self.lines = lines
+        self.num_to_str = num_to_str
+        self.count = 0
+
+        if lines:
+            self.encode = json.JSONEncoder(
+                ensure_ascii=ensure_ascii, separators=(",", ":"),
+                default=util.json_default, sort_keys=True).encode
+        else:
+            self.encode = json.JSONEncoder(
+                ensure_ascii=ensure_ascii, indent=2,
+                default=util.json_default, sort_keys=True).encode
+
+    def __iter__(self):
+        return iter(())
+
+    def append(self, msg):
+        if self.fp is None:
+            return
+        if self.num_to_str and isinstance(msg[-1], dict):
+            util.transform_dict(msg[-1], util.number_to_string)
+
+        if self.lines:
+            data = self.encode(msg) + "\n"
+        else:
+            data = ("[\n  " if not self.count else ",\n  ") + \
+                self.encode(msg).replace("\n", "\n  ")
+        self.count += 1
+
+        try:
+            self.fp.write(data)
+        except (OSError, ValueError):
+            # stop extraction when output is no longer possible
+            self.fp = None
+            raise exception.StopExtraction()
+
+    def close(self):
+        fp = self.fp
+        if fp is None:
+            return
+        try:
+            if not self.lines:
+                fp.write("\n]\n" if self.count else "[]\n")
+            fp.flush()
+        except Exception:
+            pass
+        self.fp = None
+
+
+class ChildOutput(output.NullOutput):
+    """Output for jobs running concurrently in worker threads
+
+    Only skipped and completed downloads get printed.
+    """
+
+    def __init__(self, out):
+        self.skip = out.skip
+        self.success = out.success
+
+
+class WorkerOutput(output.NullOutput):
+    """Output for downloads in worker threads
+
+    Progress gets discarded, and the start of a download is only recorded
+    in 'pathfmt' to get printed on the job's thread.
+    """
+    pathfmt = None
+
+    def start(self, path):
+        self.pathfmt.started = True
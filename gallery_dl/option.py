@@ -12,7 +12,7 @@ import argparse
 import logging
 import os.path
 import sys
-from . import job, util, version
+from . import util, version
 
 
 class ConfigAction(argparse.Action):
@@ -329,6 +329,11 @@ def build_parser():
         dest="input", nargs=0, action=ConfigConstAction, const=False,
         help="Do not prompt for passwords/tokens",
     )
+    input.add_argument(
+        "--jobs",
+        dest="jobs", metavar="N", type=int, action=ConfigAction,
+        help="Number of input URLs to process concurrently (default: 1)",
+    )
 
     output = parser.add_argument_group("Output Options")
     output.add_argument(
@@ -369,19 +374,25 @@ def build_parser():
         dest="dump_json", action="store_const", const=128,
         help="Print JSON information; resolve intermediary URLs",
     )
+    output.add_argument(
+        "--json-lines",
+        dest="json_lines", action="store_true",
+        help="Print JSON information as one line per message "
+             "while extracting",
+    )
     output.add_argument(
         "-s", "--simulate",
-        dest="jobtype", action="store_const", const=job.SimulationJob,
+        dest="jobtype", action="store_const", const="SimulationJob",
         help="Simulate data extraction; do not download anything",
     )
     output.add_argument(
         "-E", "--extractor-info",
-        dest="jobtype", action="store_const", const=job.InfoJob,
+        dest="jobtype", action="store_const", const="InfoJob",
         help="Print extractor defaults and settings",
     )
     output.add_argument(
         "-K", "--list-keywords",
-        dest="jobtype", action="store_const", const=job.KeywordJob,
+        dest="jobtype", action="store_const", const="KeywordJob",
         help=("Print a list of available keywords and example values "
               "for the given URLs"),
     )
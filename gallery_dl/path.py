@@ -75,6 +75,7 @@ class PathFormat():
 
         self.kwdict = {}
         self.delete = False
+        self.pending = None
         self.prefix = ""
         self.filename = ""
         self.extension = ""
@@ -149,12 +150,25 @@ class PathFormat():
                 re.compile("[" + chars + "]").sub, repl)
         return func
 
+    def copy(self):
+        """Return a copy of this PathFormat with its own 'kwdict'"""
+        pathfmt = object.__new__(self.__class__)
+        pathfmt.__dict__ = attrs = self.__dict__.copy()
+        pathfmt.kwdict = self.kwdict.copy()
+
+        # rebind monkey-patched methods to the new object
+        for name, value in attrs.items():
+            if getattr(value, "__self__", None) is self:
+                attrs[name] = value.__func__.__get__(pathfmt)
+        return pathfmt
+
     def open(self, mode="wb"):
         """Open file and return a corresponding file object"""
         try:
             return open(self.temppath, mode)
         except FileNotFoundError:
-            os.makedirs(self.realdirectory)
+            # parallel downloads might create it at the same time
+            os.makedirs(self.realdirectory, exist_ok=True)
             return open(self.temppath, mode)
 
     def exists(self):
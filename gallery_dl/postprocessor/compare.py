@@ -10,6 +10,7 @@
 
 from .common import PostProcessor
 from .. import text, util, output, exception
+import hashlib
 import os
 
 
@@ -17,9 +18,17 @@ class ComparePP(PostProcessor):
 
     def __init__(self, job, options):
         PostProcessor.__init__(self, job)
+        self._equal_exc = self._equal_cnt = 0
+        # digests computed while downloading are only valid
+        # when no other post processor could have modified the file
+        self._digests = not job.hooks.get("file")
         if options.get("shallow"):
             self._compare = self._compare_size
-        self._equal_exc = self._equal_cnt = 0
+            hooks = {}
+        elif self._digests:
+            hooks = {"prepare-after": self.prepare}
+        else:
+            hooks = {}
 
         equal = options.get("equal")
         if equal:
@@ -32,15 +41,28 @@ class ComparePP(PostProcessor):
             elif equal == "exit":
                 self._equal_exc = SystemExit
 
-        job.register_hooks({"file": (
+        hooks["file"] = (
             self.enumerate
             if options.get("action") == "enumerate" else
             self.replace
-        )}, options)
+        )
+        job.register_hooks(hooks, options)
+
+    def prepare(self, pathfmt):
+        """Request a digest of the new file when an old one exists"""
+        kwdict = pathfmt.kwdict
+        kwdict.pop("_http_digests", None)
+        if os.path.exists(pathfmt.realpath):
+            names = kwdict.get("_http_hash")
+            if names is None:
+                kwdict["_http_hash"] = {"sha1"}
+            else:
+                names.add("sha1")
 
     def replace(self, pathfmt):
         try:
-            if self._compare(pathfmt.realpath, pathfmt.temppath):
+            if self._compare(pathfmt.realpath, pathfmt.temppath,
+                             pathfmt.kwdict if self._digests else None):
                 return self._equal(pathfmt)
         except OSError:
             pass
@@ -49,7 +71,9 @@ class ComparePP(PostProcessor):
     def enumerate(self, pathfmt):
         num = 1
         try:
-            while not self._compare(pathfmt.realpath, pathfmt.temppath):
+            kwdict = pathfmt.kwdict if self._digests else None
+            while not self._compare(pathfmt.realpath, pathfmt.temppath,
+                                    kwdict):
                 pathfmt.prefix = prefix = format(num) + "."
                 pathfmt.kwdict["extension"] = prefix + pathfmt.extension
                 pathfmt.build_path()
@@ -59,15 +83,29 @@ class ComparePP(PostProcessor):
             pass
         self._equal_cnt = 0
 
-    def _compare(self, f1, f2):
-        return self._compare_size(f1, f2) and self._compare_content(f1, f2)
+    def _compare(self, f1, f2, kwdict=None):
+        return (self._compare_size(f1, f2) and
+                self._compare_content(f1, f2, kwdict))
 
     @staticmethod
-    def _compare_size(f1, f2):
+    def _compare_size(f1, f2, kwdict=None):
         return os.stat(f1).st_size == os.stat(f2).st_size
 
     @staticmethod
-    def _compare_content(f1, f2):
+    def _compare_content(f1, f2, kwdict=None):
+        digests = kwdict.get("_http_digests") if kwdict else None
+        if digests and "sha1" in digests:
+            # only read the old file and compare it
+            # to the digest computed while downloading the new one
+            sha1 = hashlib.sha1()
+            with open(f1, "rb") as fp:
+                while True:
+                    data = fp.read(65536)
+                    if not data:
+                        break
+                    sha1.update(data)
+            return sha1.hexdigest() == digests["sha1"]
+
         size = 16384
         with open(f1, "rb") as fp1, open(f2, "rb") as fp2:
             while True:
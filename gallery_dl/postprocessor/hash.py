@@ -38,9 +38,45 @@ class HashPP(PostProcessor):
             events = ("file",)
         elif isinstance(events, str):
             events = events.split(",")
-        job.register_hooks({event: self.run for event in events}, options)
+        hooks = {event: self.run for event in events}
+        if "file" in hooks and not job.hooks.get("file"):
+            # digests computed while downloading are only valid
+            # when no other post processor could have modified the file
+            hooks["file"] = self.run_digests
+            if "prepare" not in hooks:
+                hooks["prepare"] = self.prepare
+        job.register_hooks(hooks, options)
+
+    def prepare(self, pathfmt):
+        """Request digests computed while downloading"""
+        kwdict = pathfmt.kwdict
+        kwdict.pop("_http_digests", None)
+        names = kwdict.get("_http_hash")
+        if names is None:
+            kwdict["_http_hash"] = {name for _, name in self.hashes}
+        else:
+            names.update(name for _, name in self.hashes)
 
     def run(self, pathfmt):
+        self._hash_file(pathfmt)
+
+        if self.filename:
+            pathfmt.build_path()
+
+    def run_digests(self, pathfmt):
+        kwdict = pathfmt.kwdict
+        digests = kwdict.get("_http_digests")
+        if not digests or not all(
+                name in digests for _, name in self.hashes):
+            return self.run(pathfmt)
+
+        for key, name in self.hashes:
+            kwdict[key] = digests[name]
+
+        if self.filename:
+            pathfmt.build_path()
+
+    def _hash_file(self, pathfmt):
         hashes = [
             (key, hashlib.new(name))
             for key, name in self.hashes
@@ -58,9 +94,6 @@ class HashPP(PostProcessor):
         for key, h in hashes:
             pathfmt.kwdict[key] = h.hexdigest()
 
-        if self.filename:
-            pathfmt.build_path()
-
     def _open(self, pathfmt):
         try:
             return open(pathfmt.temppath, "rb")
@@ -9,16 +9,26 @@
 """Write metadata to external files"""
 
 from .common import PostProcessor
-from .. import util, formatter
+from .. import util, text, formatter
+import collections
 import json
+import time
 import sys
 import os
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class MetadataPP(PostProcessor):
+    max_open = 16
 
     def __init__(self, job, options):
         PostProcessor.__init__(self, job)
+        # open JsonlWriter objects of this instance, keyed by path
+        self.writers = None
 
         mode = options.get("mode")
         cfmt = options.get("content-format") or options.get("format")
@@ -47,7 +57,7 @@ class MetadataPP(PostProcessor):
             ext = "txt"
         elif mode == "jsonl":
             self.write = self._write_json
-            self._json_encode = self._make_encoder(options).encode
+            self._json_encode = self._make_encoder_jsonl(options)
             omode = "a"
             filename = "data.jsonl"
         else:
@@ -83,25 +93,20 @@ class MetadataPP(PostProcessor):
 
         filename = options.get("filename", filename)
         extfmt = options.get("extension-format")
+        buffered = False
         if filename:
             if filename == "-":
                 self.run = self._run_stdout
             else:
                 self._filename = self._filename_custom
                 self._filename_fmt = formatter.parse(filename).format_map
+                buffered = (mode == "jsonl")
         elif extfmt:
             self._filename = self._filename_extfmt
             self._extension_fmt = formatter.parse(extfmt).format_map
         else:
             self.extension = options.get("extension", ext)
 
-        events = options.get("event")
-        if events is None:
-            events = ("file",)
-        elif isinstance(events, str):
-            events = events.split(",")
-        job.register_hooks({event: self.run for event in events}, options)
-
         self._init_archive(job, options, "_MD_")
         self.filter = self._make_filter(options)
         self.mtime = options.get("mtime")
@@ -110,16 +115,48 @@ class MetadataPP(PostProcessor):
         self.skip = options.get("skip", False)
         self.meta_path = options.get("metadata-path")
 
+        buffer = options.get("buffer", True)
+        if buffered and buffer and self.omode == "a" and \
+                not self.mtime and not self.skip:
+            if buffer is True:
+                buffer = 4096
+            elif isinstance(buffer, str):
+                buffer = text.parse_bytes(buffer)
+            self.buffer_size = buffer
+            self.buffer_interval = options.get("buffer-interval", 10.0)
+            self.writers = collections.OrderedDict()
+
+            # metadata paths only depend on the target directory
+            # when neither 'filename' nor 'directory' contain fields
+            if "{" not in filename and filename[0] != "\f" and \
+                    not isinstance(directory, list):
+                self.paths = {}
+            else:
+                self.paths = None
+
+            self.run = self._run_buffered
+
+        events = options.get("event")
+        if events is None:
+            events = ("file",)
+        elif isinstance(events, str):
+            events = events.split(",")
+        job.register_hooks({event: self.run for event in events}, options)
+
+        if self.writers is not None:
+            # write buffered lines after each post
+            # to limit what gets lost when interrupted
+            job.register_hooks({
+                "post-after": self.flush,
+                "finalize"  : self.finalize,
+            })
+
     def run(self, pathfmt):
         archive = self.archive
         if archive and archive.check(pathfmt.kwdict):
             return
 
-        if util.WINDOWS and pathfmt.extended:
-            directory = pathfmt._extended_path(self._directory(pathfmt))
-        else:
-            directory = self._directory(pathfmt)
-        path = directory + self._filename(pathfmt)
+        directory, path = self._path(pathfmt)
 
         if self.meta_path is not None:
             pathfmt.kwdict[self.meta_path] = path
@@ -143,6 +180,54 @@ class MetadataPP(PostProcessor):
             if mtime:
                 util.set_mtime(path, mtime)
 
+    def _run_buffered(self, pathfmt):
+        kwdict = pathfmt.kwdict
+        archive = self.archive
+        if archive and archive.check(kwdict):
+            return
+
+        paths = self.paths
+        if paths is None:
+            directory, path = self._path(pathfmt)
+        else:
+            try:
+                directory, path = paths[pathfmt.realdirectory]
+            except KeyError:
+                directory, path = paths[pathfmt.realdirectory] = \
+                    self._path(pathfmt)
+
+        if self.meta_path is not None:
+            kwdict[self.meta_path] = path
+
+        writers = self.writers
+        writer = writers.get(path)
+        if writer is None:
+            if len(writers) >= self.max_open:
+                writers.popitem(False)[1].close()
+            writer = writers[path] = JsonlWriter(
+                path, directory, self.encoding)
+        else:
+            writers.move_to_end(path)
+
+        if self.filter:
+            kwdict = self.filter(kwdict)
+        writer.write(self._json_encode(kwdict) + "\n")
+        if writer.size >= self.buffer_size or \
+                time.monotonic() - writer.flushed >= self.buffer_interval:
+            writer.flush()
+
+        if archive:
+            archive.add(pathfmt.kwdict)
+
+    def flush(self, pathfmt):
+        for writer in self.writers.values():
+            writer.flush()
+
+    def finalize(self, pathfmt):
+        writers = self.writers
+        while writers:
+            writers.popitem(False)[1].close()
+
     def _run_stdout(self, pathfmt):
         self.write(sys.stdout, pathfmt.kwdict)
 
@@ -168,6 +253,13 @@ class MetadataPP(PostProcessor):
             except Exception:
                 pass
 
+    def _path(self, pathfmt):
+        if util.WINDOWS and pathfmt.extended:
+            directory = pathfmt._extended_path(self._directory(pathfmt))
+        else:
+            directory = self._directory(pathfmt)
+        return directory, directory + self._filename(pathfmt)
+
     def _base(self, pathfmt):
         return pathfmt.realdirectory
 
@@ -268,6 +360,29 @@ class MetadataPP(PostProcessor):
         if not private:
             return util.filter_dict
 
+    def _make_encoder_jsonl(self, options):
+        encode = self._make_encoder(options).encode
+        if orjson is None or options.get("ascii") or \
+                options.get("indent") is not None or \
+                options.get("separators") not in ((",", ":"), [",", ":"]):
+            return encode
+
+        # orjson only supports compact, non-ASCII-escaped output;
+        # dates get formatted by 'default' like they are by 'encode'
+        dumps = orjson.dumps
+        default = util.json_default
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if options.get("sort"):
+            option |= orjson.OPT_SORT_KEYS
+
+        def encode_orjson(obj):
+            try:
+                return dumps(obj, default, option).decode()
+            except TypeError:
+                # integers larger than 64 bit, etc
+                return encode(obj)
+        return encode_orjson
+
     @staticmethod
     def _make_encoder(options, indent=None):
         return json.JSONEncoder(
@@ -280,6 +395,43 @@ class MetadataPP(PostProcessor):
         )
 
 
+class JsonlWriter():
+    """Buffer lines for a file opened in append mode"""
+
+    def __init__(self, path, directory, encoding="utf-8"):
+        try:
+            self.fp = open(path, "ab", buffering=0)
+        except FileNotFoundError:
+            os.makedirs(directory, exist_ok=True)
+            self.fp = open(path, "ab", buffering=0)
+        self.encoding = encoding
+        self.lines = []
+        self.size = 0
+        self.flushed = time.monotonic()
+
+    def write(self, line):
+        self.lines.append(line)
+        self.size += len(line)
+
+    def flush(self):
+        if self.lines:
+            # write complete lines with a single call
+            # to not interleave them with other writers
+            data = memoryview("".join(self.lines).encode(self.encoding))
+            # unbuffered writes can be partial
+            while data:
+                data = data[self.fp.write(data):]
+            self.lines.clear()
+            self.size = 0
+        self.flushed = time.monotonic()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.fp.close()
+
+
 def _traverse(obj, key):
     name, _, key = key.partition("[")
     obj = obj[name]
@@ -10,10 +10,12 @@
 
 from .common import PostProcessor
 from .. import util, output
+import collections
 import subprocess
 import tempfile
 import zipfile
 import shutil
+import io
 import os
 
 try:
@@ -37,7 +39,9 @@ class UgoiraPP(PostProcessor):
         self.metadata = options.get("metadata", True)
         self.mtime = options.get("mtime", True)
         self.skip = options.get("skip", True)
+        self.pipe = options.get("pipe", False)
         self.uniform = self._convert_zip = self._convert_files = False
+        self._mkvmerge = False
 
         ffmpeg = options.get("ffmpeg-location")
         self.ffmpeg = util.expand_path(ffmpeg) if ffmpeg else "ffmpeg"
@@ -57,6 +61,7 @@ class UgoiraPP(PostProcessor):
         if mode == "mkvmerge":
             self._process = self._process_mkvmerge
             self._finalize = self._finalize_mkvmerge
+            self._mkvmerge = True
         elif mode == "image2":
             self._process = self._process_image2
             self._finalize = None
@@ -65,6 +70,7 @@ class UgoiraPP(PostProcessor):
                 ext = "zip"
             self._convert_impl = self.convert_to_archive
             self._tempdir = util.NullContext
+            self.pipe = False
         else:
             self._process = self._process_concat
             self._finalize = None
@@ -98,11 +104,17 @@ class UgoiraPP(PostProcessor):
         if self.prevent_odd:
             args += ("-vf", "crop=iw-mod(iw\\,2):ih-mod(ih\\,2)")
 
-        job.register_hooks({
+        self.workers = options.get("workers", 0) if self.pipe else 0
+        self._executor = None
+
+        hooks = {
             "prepare": self.prepare,
             "file"   : self.convert_from_zip,
             "after"  : self.convert_from_files,
-        }, options)
+        }
+        if self.workers:
+            hooks["finalize"] = self.convert_wait
+        job.register_hooks(hooks, options)
 
     def prepare(self, pathfmt):
         self._convert_zip = self._convert_files = False
@@ -137,29 +149,34 @@ class UgoiraPP(PostProcessor):
         self._zip_source = True
         self._zip_ext = ext = pathfmt.extension
 
-        with self._tempdir() as tempdir:
-            if tempdir:
-                try:
-                    with zipfile.ZipFile(pathfmt.temppath) as zfile:
-                        zfile.extractall(tempdir)
-                except FileNotFoundError:
-                    pathfmt.realpath = pathfmt.temppath
-                    return
-                except Exception as exc:
-                    pathfmt.realpath = pathfmt.temppath
-                    self.log.error(
-                        "%s: Unable to extract frames from %s (%s: %s)",
-                        pathfmt.kwdict.get("id"), pathfmt.filename,
-                        exc.__class__.__name__, exc)
-                    return self.log.debug("", exc_info=exc)
+        if self.pipe:
+            converted = self.convert_pipe(pathfmt)
+        else:
+            with self._tempdir() as tempdir:
+                if tempdir:
+                    try:
+                        with zipfile.ZipFile(pathfmt.temppath) as zfile:
+                            zfile.extractall(tempdir)
+                    except FileNotFoundError:
+                        pathfmt.realpath = pathfmt.temppath
+                        return
+                    except Exception as exc:
+                        pathfmt.realpath = pathfmt.temppath
+                        self.log.error(
+                            "%s: Unable to extract frames from %s (%s: %s)",
+                            pathfmt.kwdict.get("id"), pathfmt.filename,
+                            exc.__class__.__name__, exc)
+                        return self.log.debug("", exc_info=exc)
 
-            if self.convert(pathfmt, tempdir):
-                if self.delete:
-                    pathfmt.delete = True
-                elif pathfmt.extension != ext:
-                    self.log.info(pathfmt.filename)
-                    pathfmt.set_extension(ext)
-                    pathfmt.build_path()
+                converted = self.convert(pathfmt, tempdir)
+
+        if converted:
+            if self.delete:
+                pathfmt.delete = True
+            elif pathfmt.extension != ext:
+                self.log.info(pathfmt.filename)
+                pathfmt.set_extension(ext)
+                pathfmt.build_path()
 
     def convert_from_files(self, pathfmt):
         if not self._convert_files:
@@ -199,6 +216,200 @@ class UgoiraPP(PostProcessor):
 
         return self._convert_impl(pathfmt, tempdir)
 
+    def convert_pipe(self, pathfmt):
+        """Convert frames by streaming them from the downloaded ZIP archive
+
+        With 'workers' enabled, the conversion runs in a background thread
+        on an in-memory copy of the archive.
+        """
+        zpath = pathfmt.temppath
+        pathfmt.set_extension(self.extension)
+        pathfmt.build_path()
+        if self.skip and pathfmt.exists():
+            return True
+        os.makedirs(pathfmt.realdirectory, exist_ok=True)
+
+        mtime = pathfmt.kwdict.get("_mtime") if self.mtime else None
+        paths = (pathfmt.realpath, pathfmt.path)
+
+        if not self.workers:
+            if self._convert_pipe(zpath, self._frames, paths, mtime):
+                return True
+            pathfmt.realpath = pathfmt.temppath
+            return False
+
+        try:
+            with open(zpath, "rb") as fp:
+                data = fp.read()
+        except OSError as exc:
+            self.log.error("Unable to read %s (%s: %s)",
+                           zpath, exc.__class__.__name__, exc)
+            pathfmt.realpath = pathfmt.temppath
+            return False
+
+        if self.delete:
+            # keep frames if the conversion fails
+            fallback = paths[0].rpartition(".")[0] + ".zip"
+        else:
+            fallback = None
+
+        if self._executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(self.workers, "ugoira")
+            self._pending = collections.deque()
+
+        # let the job finish this file after its conversion
+        pathfmt.pending = future = self._executor.submit(
+            self._convert_background,
+            data, self._frames, paths, mtime, fallback)
+        self._pending.append(future)
+        if len(self._pending) >= self.workers * 2:
+            self._pending.popleft().result()
+        return True
+
+    def convert_wait(self, pathfmt=None):
+        """Wait for all background conversions to finish"""
+        if self._executor is None:
+            return
+        try:
+            while self._pending:
+                self._pending.popleft().result()
+        finally:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _convert_background(self, data, frames, paths, mtime, fallback):
+        if self._convert_pipe(io.BytesIO(data), frames, paths, mtime):
+            return True
+        if fallback:
+            self.log.info("Writing frames to %s", fallback)
+            with open(fallback, "wb") as fp:
+                fp.write(data)
+        return False
+
+    def _convert_pipe(self, source, frames, paths, mtime):
+        try:
+            zfile = zipfile.ZipFile(source)
+        except FileNotFoundError:
+            return False
+        except Exception as exc:
+            self.log.error("Unable to read frames for %s (%s: %s)",
+                           paths[0], exc.__class__.__name__, exc)
+            return False
+
+        try:
+            with zfile, tempfile.TemporaryDirectory() as tempdir:
+                self._encode_pipe(zfile, frames, paths, tempdir)
+        except OSError as exc:
+            output.stderr_write("\n")
+            self.log.error("Unable to invoke FFmpeg (%s: %s)",
+                           exc.__class__.__name__, exc)
+            self.log.debug("", exc_info=exc)
+        except Exception as exc:
+            output.stderr_write("\n")
+            self.log.error("%s: %s", exc.__class__.__name__, exc)
+            self.log.debug("", exc_info=exc)
+        else:
+            if mtime:
+                util.set_mtime(paths[0], mtime)
+            return True
+
+        util.remove_file(paths[0])
+        return False
+
+    def _encode_pipe(self, zfile, frames, paths, tempdir):
+        if self._mkvmerge:
+            out = tempdir + "/temp." + self.extension
+            args = [self.ffmpeg, "-f", "image2pipe", "-i", "-"]
+            sequence = [frame["file"] for frame in frames]
+        else:
+            out = paths[0]
+            args, sequence = self._process_pipe(frames)
+        if self.args_pp:
+            args += self.args_pp
+        if self.args:
+            args += self.args
+
+        if self.twopass:
+            if "-f" not in self.args:
+                args += ("-f", self.extension)
+            args += ("-passlogfile", tempdir + "/ffmpeg2pass", "-pass")
+            self._exec_pipe(args + ["1", "-y", os.devnull], zfile, sequence)
+            self._exec_pipe(args + ["2", out], zfile, sequence)
+        else:
+            self._exec_pipe(args + [out], zfile, sequence)
+
+        if self._mkvmerge:
+            args = [
+                self.mkvmerge,
+                "-o", paths[1],  # mkvmerge does not support "raw" paths
+                "--timecodes", "0:" + self._write_mkvmerge_timecodes(
+                    tempdir, frames),
+            ]
+            if self.extension == "webm":
+                args.append("--webm")
+            args += ("=", out)
+            self._exec(args)
+
+    def _process_pipe(self, frames):
+        """Return ffmpeg arguments and the sequence of frames to pipe
+
+        image2pipe only supports a constant input frame rate,
+        so frames with longer delays get repeated as necessary.
+        """
+        rate_in, rate_out = self.calculate_framerate(frames)
+        if rate_in:
+            sequence = [frame["file"] for frame in frames]
+        else:
+            delay = max(self._delay_gcd(frames), 10)
+            rate_in = "1000/{}".format(delay)
+            sequence = []
+            ts = index = 0
+            for frame in frames:
+                ts += frame["delay"]
+                end = max(int(ts / delay + 0.5), index + 1)
+                sequence.extend((frame["file"],) * (end - index))
+                index = end
+
+        args = [self.ffmpeg, "-f", "image2pipe",
+                "-framerate", rate_in, "-i", "-"]
+        if rate_out:
+            args += ("-r", str(rate_out))
+        return args, sequence
+
+    def _exec_pipe(self, args, zfile, sequence):
+        self.log.debug(args)
+        out = None if self.output else subprocess.DEVNULL
+        process = util.Popen(
+            args, stdin=subprocess.PIPE, stdout=out, stderr=out)
+
+        try:
+            write = process.stdin.write
+            name = data = None
+            for file in sequence:
+                if file != name:
+                    name = file
+                    data = zfile.read(name)
+                write(data)
+        except BrokenPipeError:
+            pass
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+        finally:
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        retcode = process.wait()
+        if retcode:
+            output.stderr_write("\n")
+            raise ValueError("Non-zero exit status when running {} ({})"
+                             .format(args, retcode))
+        return retcode
+
     def convert_to_animation(self, pathfmt, tempdir):
         # process frames and collect command-line arguments
         args = self._process(pathfmt, tempdir)
@@ -373,7 +584,8 @@ class UgoiraPP(PostProcessor):
         args = [
             self.mkvmerge,
             "-o", pathfmt.path,  # mkvmerge does not support "raw" paths
-            "--timecodes", "0:" + self._write_mkvmerge_timecodes(tempdir),
+            "--timecodes", "0:" + self._write_mkvmerge_timecodes(
+                tempdir, self._frames),
         ]
         if self.extension == "webm":
             args.append("--webm")
@@ -398,12 +610,12 @@ class UgoiraPP(PostProcessor):
             fp.write("\n".join(content))
         return ffconcat
 
-    def _write_mkvmerge_timecodes(self, tempdir):
+    def _write_mkvmerge_timecodes(self, tempdir, frames):
         content = ["# timecode format v2"]
         append = content.append
 
         delay_sum = 0
-        for frame in self._frames:
+        for frame in frames:
             append(str(delay_sum))
             delay_sum += frame["delay"]
         append(str(delay_sum))
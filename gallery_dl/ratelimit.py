@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Token bucket rate limits shared by extractors and downloaders"""
+
+import time
+import threading
+
+_buckets = {}
+_lock = threading.Lock()
+
+
+class TokenBucket():
+    """Allow 'rate' requests per second with bursts of up to 'burst'
+
+    Each 'penalize()' call halves the current rate, down to 1/8 of its
+    configured value. Each following request restores 1/16 of it.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = self.rate_max = rate
+        self.rate_min = rate / 8.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.timestamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Take one token and return the seconds to wait until it is valid"""
+        with self.lock:
+            now = time.monotonic()
+            if now > self.timestamp:
+                tokens = self.tokens + (now - self.timestamp) * self.rate
+                self.tokens = tokens if tokens < self.burst else self.burst
+                self.timestamp = now
+
+            self.tokens -= 1.0
+            seconds = self.timestamp - now
+            if self.tokens < 0.0:
+                seconds -= self.tokens / self.rate
+
+            if self.rate < self.rate_max:
+                rate = self.rate + self.rate_max / 16.0
+                self.rate = rate if rate < self.rate_max else self.rate_max
+
+        return seconds
+
+    def penalize(self, seconds=None):
+        """Reduce the current rate and block all requests for 'seconds'"""
+        with self.lock:
+            rate = self.rate * 0.5
+            self.rate = rate if rate > self.rate_min else self.rate_min
+
+            if seconds:
+                until = time.monotonic() + seconds
+                if until > self.timestamp:
+                    self.timestamp = until
+                    if self.tokens > 0.0:
+                        self.tokens = 0.0
+
+
+class RateLimiter():
+    """Select a shared TokenBucket by a URL's host or by category"""
+
+    def __init__(self, rate, burst=1, scope="host", category=None):
+        self.rate = float(rate)
+        self.burst = burst if burst and burst > 1 else 1
+        self.category = category if scope == "category" else None
+
+    def reserve(self, url):
+        """Return the seconds to wait before sending a request to 'url'"""
+        return self.bucket(url).reserve()
+
+    def penalize(self, url, retry_after=None):
+        """Handle a '429 Too Many Requests' response from 'url'
+
+        Returns the number of seconds from its 'Retry-After' header or 0.
+        """
+        seconds = parse_retry_after(retry_after) if retry_after else 0.0
+        self.bucket(url).penalize(seconds)
+        return seconds
+
+    def bucket(self, url):
+        if self.category:
+            key = self.category
+        else:
+            key = url.partition("://")[2].partition("/")[0].lower()
+
+        try:
+            return _buckets[key]
+        except KeyError:
+            pass
+
+        with _lock:
+            bucket = _buckets.get(key)
+            if bucket is None:
+                bucket = _buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+
+def build(rate, burst=1, scope="host", category=None):
+    """Return a RateLimiter for 'rate' requests per second or None"""
+    if not rate:
+        return None
+    try:
+        rate = float(rate)
+    except (TypeError, ValueError):
+        return None
+    if rate <= 0.0:
+        return None
+    return RateLimiter(rate, burst, scope, category)
+
+
+def parse_retry_after(value):
+    """Convert a 'Retry-After' header value to seconds"""
+    try:
+        seconds = float(value)
+    except ValueError:
+        from email.utils import parsedate_to_datetime
+        try:
+            date = parsedate_to_datetime(value)
+            seconds = date.timestamp() - time.time()
+        except Exception:
+            return 0.0
+    return seconds if seconds > 0.0 else 0.0
+
+
+def clear():
+    """Remove all shared buckets"""
+    with _lock:
+        _buckets.clear()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Retry delays and per-host circuit breakers"""
+
+import time
+import random
+import threading
+from . import ratelimit
+
+BACKOFF = ("linear", "exponential", "jitter")
+
+_circuits = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+class RetryPolicy():
+    """Compute delays between attempts of a failed request
+
+    Backoff methods:
+    - "linear": wait 1, 2, 3, ... seconds
+    - "exponential": wait 1, 2, 4, 8, ... seconds
+    - "jitter": wait a random time between 1 second
+                and 3 times the previous delay ("decorrelated jitter")
+
+    Delays requested by a server through 'Retry-After'
+    or 'X-RateLimit-Reset' headers take precedence if they are longer.
+
+    With 'circuit' set, 'circuit' consecutive failures for a host
+    prevent any further requests to it for 'circuit_timeout' seconds.
+    """
+
+    def __init__(self, backoff="linear", maximum=300.0,
+                 circuit=None, circuit_timeout=60.0):
+        self.backoff = backoff if backoff in BACKOFF else "linear"
+        self.maximum = maximum
+        self.circuit = circuit
+        self.circuit_timeout = circuit_timeout
+
+    def delay(self, url, tries, previous=0.0, headers=None):
+        """Return the number of seconds to wait before the next attempt"""
+        if self.backoff == "exponential":
+            seconds = min(2.0 ** (tries - 1), self.maximum)
+        elif self.backoff == "jitter":
+            seconds = min(random.uniform(
+                1.0, 3.0 * previous if previous > 1.0 else 3.0), self.maximum)
+        else:
+            seconds = float(tries)
+
+        if headers:
+            server = min(delay_from_headers(headers), self.maximum)
+            if server > seconds:
+                seconds = server
+
+        _count(url, "retries", seconds)
+        return seconds
+
+    def check(self, url):
+        """Return False if the circuit for 'url' is open"""
+        if not self.circuit:
+            return True
+        circuit = _circuits.get(_host(url))
+        if circuit is None or circuit[1] <= time.monotonic():
+            return True
+        _count(url, "rejected")
+        return False
+
+    def success(self, url):
+        """Close the circuit for 'url'"""
+        if self.circuit:
+            _circuits.pop(_host(url), None)
+
+    def failure(self, url):
+        """Register a failed attempt for 'url'"""
+        _count(url, "failures")
+        if not self.circuit:
+            return
+
+        host = _host(url)
+        with _lock:
+            circuit = _circuits.get(host)
+            if circuit is None:
+                circuit = _circuits[host] = [0, 0.0]
+            circuit[0] += 1
+            if circuit[0] >= self.circuit:
+                circuit[1] = time.monotonic() + self.circuit_timeout
+                opened = True
+            else:
+                opened = False
+        if opened:
+            _count(url, "circuit")
+
+
+def delay_from_headers(headers):
+    """Return the number of seconds a server asks to wait"""
+    value = headers.get("Retry-After")
+    if value:
+        return ratelimit.parse_retry_after(value)
+
+    value = headers.get("X-RateLimit-Reset")
+    if value and headers.get("X-RateLimit-Remaining", "0") == "0":
+        try:
+            seconds = float(value)
+        except ValueError:
+            return 0.0
+        if seconds > 1000000000.0:
+            # UNIX timestamp instead of a number of seconds
+            seconds -= time.time()
+        return seconds if seconds > 0.0 else 0.0
+
+    return 0.0
+
+
+def stats():
+    """Return a dict of per-host retry statistics
+
+    Each host maps to a dict with the number of 'retries', their total
+    'delay', the number of 'failures', how often its 'circuit' got opened,
+    and how many requests got 'rejected' because of that.
+    """
+    with _lock:
+        return {host: values.copy() for host, values in _stats.items()}
+
+
+def log_stats(log):
+    """Write per-host retry statistics to 'log' as debug messages"""
+    for host, values in sorted(stats().items()):
+        log.debug("Retry statistics for '%s': %s failures, %s retries "
+                  "(%.1fs delay), %s circuit openings, %s rejected requests",
+                  host, values["failures"], values["retries"],
+                  values["delay"], values["circuit"], values["rejected"])
+
+
+def clear():
+    """Reset all circuits and statistics"""
+    with _lock:
+        _circuits.clear()
+        _stats.clear()
+
+
+def _count(url, key, delay=None):
+    host = _host(url)
+    with _lock:
+        values = _stats.get(host)
+        if values is None:
+            values = _stats[host] = {
+                "retries": 0, "delay": 0.0, "failures": 0,
+                "circuit": 0, "rejected": 0}
+        values[key] += 1
+        if delay is not None:
+            values["delay"] += delay
+
+
+def _host(url):
+    return url.partition("://")[2].partition("/")[0].lower()
@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Index regular expressions by the URL hosts and prefixes they can match"""
+
+import re
+import threading
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+LITERAL = sre_parse.LITERAL
+NOT_LITERAL = sre_parse.NOT_LITERAL
+ANY = sre_parse.ANY
+IN = sre_parse.IN
+NEGATE = sre_parse.NEGATE
+RANGE = sre_parse.RANGE
+CATEGORY = sre_parse.CATEGORY
+BRANCH = sre_parse.BRANCH
+SUBPATTERN = sre_parse.SUBPATTERN
+ATOMIC_GROUP = getattr(sre_parse, "ATOMIC_GROUP", None)
+REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT,
+           getattr(sre_parse, "POSSESSIVE_REPEAT", None))
+ZEROWIDTH = (sre_parse.AT, sre_parse.ASSERT, sre_parse.ASSERT_NOT)
+AT = sre_parse.AT
+AT_END = (sre_parse.AT_END, sre_parse.AT_END_STRING)
+CATEGORIES_NOMATCH = (sre_parse.CATEGORY_DIGIT, sre_parse.CATEGORY_WORD,
+                      sre_parse.CATEGORY_SPACE)
+CATEGORIES_MATCH = (sre_parse.CATEGORY_NOT_DIGIT, sre_parse.CATEGORY_NOT_WORD,
+                    sre_parse.CATEGORY_NOT_SPACE)
+
+HOST = 0
+SUFFIX = 1
+PREFIX = 2
+
+DYNAMIC = "\0"      # placeholder for text not containing any TERMINATORS
+END = "\1"          # end of the matched string
+TERMINATORS = "/?#"
+SCHEMES = ("https://", "http://")
+PREFIX_MAX = 16
+VARIANTS_MAX = 1024
+
+split_host = re.compile(r"(?:https?://)?([^/?#\x01]*)").match
+unusual = re.compile(r"[^ -~]").search
+
+
+class PatternIndex():
+    """Select the patterns of a list that can possibly match a URL
+
+    Patterns get analyzed for the literal text at their start.
+    If that text determines the URL's host name, a pattern gets stored
+    under its full host name or, for patterns matching arbitrary
+    subdomains, under its host name suffix. Otherwise, its literal prefix
+    is used as key. Only patterns without any usable literal text
+    get tested for every URL.
+    """
+
+    def __init__(self, values=None):
+        self.values = values if values is not None else []
+        self.size = 0
+        self.hosts = {}
+        self.suffixes = {}
+        self.prefixes = {}
+        self.lengths = []
+        self.fallback = []
+        self.lock = threading.Lock()
+
+    def candidates(self, url):
+        """Return all values whose pattern might match 'url'"""
+        if self.size < len(self.values):
+            self.update()
+
+        url = str.lower(url)
+        if unusual(url):
+            # non-ASCII characters might get case-folded differently
+            # and newlines can get matched by '$'
+            return self.values
+
+        host = split_host(url).group(1)
+        buckets = [self.fallback]
+        append = buckets.append
+
+        positions = self.hosts.get(host)
+        if positions:
+            append(positions)
+
+        if self.suffixes:
+            get = self.suffixes.get
+            index = host.find(".")
+            while index >= 0:
+                index += 1
+                positions = get(host[index:])
+                if positions:
+                    append(positions)
+                index = host.find(".", index)
+
+        get = self.prefixes.get
+        for length in self.lengths:
+            positions = get(url[:length])
+            if positions:
+                append(positions)
+
+        values = self.values
+        if len(buckets) == 1:
+            return [values[pos] for pos in self.fallback]
+
+        positions = set()
+        for bucket in buckets:
+            positions.update(bucket)
+        return [values[pos] for pos in sorted(positions)]
+
+    def update(self):
+        """Index all values that got appended since the last update"""
+        with self.lock:
+            for value in self.values[self.size:]:
+                pattern = value.pattern
+                self.insert(pattern_keys(pattern.pattern, pattern.flags))
+
+    def insert(self, keys):
+        """Index the next value under 'keys' returned by pattern_keys()"""
+        position = self.size
+        self.size += 1
+
+        if keys is None:
+            self.fallback.append(position)
+            return
+
+        for kind, key in keys:
+            if kind == HOST:
+                table = self.hosts
+            elif kind == SUFFIX:
+                table = self.suffixes
+            else:
+                table = self.prefixes
+                if len(key) not in self.lengths:
+                    self.lengths = sorted(self.lengths + [len(key)])
+
+            try:
+                table[key].append(position)
+            except KeyError:
+                table[key] = [position]
+
+
+def pattern_keys(pattern, flags=0):
+    """Return a set of (kind, key) tuples describing 'pattern'
+
+    Every string matched by 'pattern' has a host name equal to
+    a HOST key, a host name ending with '.' + a SUFFIX key,
+    or starts with a PREFIX key.
+
+    Returns None if no such set of keys can be determined.
+    """
+    try:
+        items = sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+
+    keys = set()
+    for string, closed in _expand(items, True):
+        key = _key(string)
+        if key is None:
+            return None
+        keys.add(key)
+    return keys
+
+
+def _key(string):
+    match = split_host(string)
+    end = match.end()
+
+    if end < len(string):
+        # string contains the end of its host name
+        literal = string[:end+1]
+        if DYNAMIC in literal or not any(
+                scheme.startswith(literal) for scheme in SCHEMES):
+            host = match.group(1)
+            if DYNAMIC not in host:
+                return (HOST, host)
+            suffix = host.rpartition(DYNAMIC)[2].partition(".")[2]
+            if suffix:
+                return (SUFFIX, suffix)
+
+    prefix = string.partition(DYNAMIC)[0].partition(END)[0]
+    if prefix:
+        return (PREFIX, prefix[:PREFIX_MAX])
+    return None
+
+
+def _settled(string):
+    if DYNAMIC not in string and any(
+            scheme.startswith(string) for scheme in SCHEMES):
+        return False
+    match = split_host(string)
+    return match.end() < len(string) or len(string) >= 256
+
+
+def _expand(items, toplevel=False):
+    """Return a list of (string, closed) tuples for all literal
+    strings a sequence of regex items can match at its start"""
+    variants = {"": False}
+
+    for op, av in items:
+        alternatives = _alternatives(op, av)
+        result = {}
+
+        for string, closed in variants.items():
+            if closed:
+                result[string] = True
+                continue
+            for alt, alt_closed in alternatives:
+                alt = string + alt
+                if alt_closed or toplevel and _settled(alt):
+                    result[alt] = True
+                elif alt not in result:
+                    result[alt] = False
+
+        if len(result) > VARIANTS_MAX:
+            if toplevel:
+                return [(string, True) for string in variants]
+            return None
+        variants = result
+
+        if toplevel and all(variants.values()):
+            break
+
+    return list(variants.items())
+
+
+def _alternatives(op, av):
+    if op == LITERAL:
+        return ((chr(av).lower(), False),)
+
+    if op == IN:
+        if all(item[0] == LITERAL for item in av):
+            return [(chr(item[1]).lower(), False) for item in av]
+
+    elif op == SUBPATTERN or op == ATOMIC_GROUP:
+        result = _expand(av[-1] if op == SUBPATTERN else av)
+        if result is not None:
+            return result
+
+    elif op == BRANCH:
+        result = []
+        for items in av[1]:
+            variants = _expand(items)
+            if variants is None:
+                break
+            result.extend(variants)
+        else:
+            return result
+
+    elif op in REPEATS:
+        minimum, maximum, items = av
+        if maximum == 1:
+            result = _expand(items)
+            if result is not None:
+                if minimum == 0:
+                    result.append(("", False))
+                return result
+        elif minimum and _matches_any_seq(items, TERMINATORS):
+            # expand only the first repetition
+            result = _expand(items)
+            if result is not None:
+                return [(string, True) for string, _ in result]
+
+    elif op in ZEROWIDTH:
+        if op == AT and av in AT_END:
+            return ((END, True),)
+        return (("", False),)
+
+    if _matches_any(op, av, TERMINATORS):
+        return (("", True),)
+    return ((DYNAMIC, False),)
+
+
+def _matches_any(op, av, chars):
+    """Return False if the regex item (op, av) cannot match any 'chars'"""
+    if op == LITERAL:
+        return chr(av) in chars
+    if op == IN:
+        return any(_class_matches(av, char) for char in chars)
+    if op == SUBPATTERN:
+        return _matches_any_seq(av[-1], chars)
+    if op == ATOMIC_GROUP:
+        return _matches_any_seq(av, chars)
+    if op == BRANCH:
+        return any(_matches_any_seq(items, chars) for items in av[1])
+    if op in REPEATS:
+        return _matches_any_seq(av[2], chars)
+    if op in ZEROWIDTH:
+        return False
+    return True
+
+
+def _matches_any_seq(items, chars):
+    for op, av in items:
+        if _matches_any(op, av, chars):
+            return True
+    return False
+
+
+def _class_matches(items, char):
+    negate = False
+    result = False
+    code = ord(char)
+
+    for op, av in items:
+        if op == NEGATE:
+            negate = True
+        elif op == LITERAL:
+            if av == code:
+                result = True
+        elif op == RANGE:
+            if av[0] <= code <= av[1]:
+                result = True
+        elif op == CATEGORY:
+            if av in CATEGORIES_MATCH:
+                result = True
+            elif av not in CATEGORIES_NOMATCH:
+                return True
+        else:
+            return True
+
+    return result is not negate
@@ -14,8 +14,6 @@ import sys
 import json
 import time
 import random
-import getpass
-import hashlib
 import binascii
 import datetime
 import functools
@@ -23,8 +21,6 @@ import itertools
 import subprocess
 import collections
 import urllib.parse
-from http.cookiejar import Cookie
-from email.utils import mktime_tz, parsedate_tz
 from . import text, version, exception
 
 try:
@@ -145,6 +141,7 @@ def md5(s):
         s = b""
     elif isinstance(s, str):
         s = s.encode()
+    import hashlib
     return hashlib.md5(s).hexdigest()
 
 
@@ -154,6 +151,7 @@ def sha1(s):
         s = b""
     elif isinstance(s, str):
         s = s.encode()
+    import hashlib
     return hashlib.sha1(s).hexdigest()
 
 
@@ -369,6 +367,7 @@ def extract_headers(response):
 
     hlm = headers.get("last-modified")
     if hlm:
+        from email.utils import parsedate_tz
         data["date"] = datetime.datetime(*parsedate_tz(hlm)[:6])
 
     return data
@@ -441,6 +440,7 @@ def remove_directory(path):
 def set_mtime(path, mtime):
     try:
         if isinstance(mtime, str):
+            from email.utils import mktime_tz, parsedate_tz
             mtime = mktime_tz(parsedate_tz(mtime))
         os.utime(path, (time.time(), mtime))
     except Exception:
@@ -449,6 +449,7 @@ def set_mtime(path, mtime):
 
 def cookiestxt_load(fp):
     """Parse a Netscape cookies.txt file and add return its Cookies"""
+    from http.cookiejar import Cookie
     cookies = []
 
     for line in fp:
@@ -598,6 +599,7 @@ class LazyPrompt():
     __slots__ = ()
 
     def __str__(self):
+        import getpass
         return getpass.getpass()
 
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Compare regular and generated StringFormatter.format_map() functions"""
+
+import sys
+import timeit
+import argparse
+import datetime
+
+import util  # noqa F401
+from gallery_dl import formatter
+
+KWDICT = {
+    "category"   : "danbooru",
+    "subcategory": "post",
+    "id"         : 1234567,
+    "md5"        : "0123456789abcdef0123456789abcdef",
+    "filename"   : "0123456789abcdef0123456789abcdef",
+    "extension"  : "jpg",
+    "num"        : 3,
+    "count"      : 12,
+    "title"      : "Some Title With  Multiple Words",
+    "user"       : {"id": 98765, "name": "user_name"},
+    "tags"       : ["tag1", "tag2", "tag3", "tag4"],
+    "date"       : datetime.datetime(2010, 1, 1, 12, 34, 56),
+    "rating"     : "",
+}
+
+FORMATS = (
+    "{category}_{id}_{filename}.{extension}",
+    "{id}_{num:>02}_{title[:40]!l}.{extension}",
+    "{date:%Y-%m-%d} {user[name]|user[id]} - {title:R /_/}{num:?_//}."
+    "{extension}",
+    "{category}/{user[name]}/{date:%Y}/{tags:J, /L50/too many tags/} "
+    "{rating:?[/]/}{md5[:8]}_{missing|title!g}.{extension!l}",
+)
+
+
+def run(format_string, compiled, number):
+    formatter._COMPILE = compiled
+    fmt = formatter.StringFormatter(format_string)
+    return min(timeit.repeat(
+        lambda: fmt.format_map(KWDICT), number=number, repeat=5))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("formats", nargs="*", metavar="FORMAT")
+    parser.add_argument("-n", "--number", type=int, default=100000)
+    args = parser.parse_args()
+
+    print("{:>12} {:>12} {:>8}  {}".format(
+        "Regular", "Generated", "Speedup", "Format String"))
+    for format_string in args.formats or FORMATS:
+        regular = run(format_string, False, args.number)
+        compiled = run(format_string, True, args.number)
+        print("{:>11.3f}s {:>11.3f}s {:>7.2f}x  {}".format(
+            regular, compiled, regular / compiled, format_string))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Compare HTTP/1.1 and HTTP/2 file downloads against a local TLS server
+
+Requires 'httpx', 'h2', and an 'openssl' executable
+to generate a self-signed certificate.
+"""
+
+import os
+import ssl
+import sys
+import time
+import socket
+import argparse
+import tempfile
+import threading
+import subprocess
+import http.server
+import socketserver
+import concurrent.futures
+
+import util  # noqa F401
+import requests
+from gallery_dl.downloader import http as http_downloader
+
+import h2.config
+import h2.events
+import h2.connection
+
+
+class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, context, payload):
+        http.server.HTTPServer.__init__(
+            self, ("127.0.0.1", 0), HTTP1Handler)
+        self.socket = context.wrap_socket(self.socket, server_side=True)
+        self.payload = payload
+        self.handshakes = 0
+
+    def get_request(self):
+        sock, address = http.server.HTTPServer.get_request(self)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.handshakes += 1
+        return sock, address
+
+    def finish_request(self, request, client_address):
+        if request.selected_alpn_protocol() == "h2":
+            serve_http2(request, self.payload)
+        else:
+            HTTP1Handler(request, client_address, self)
+
+
+class HTTP1Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payload = self.server.payload
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except OSError:
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_http2(sock, payload):
+    conn = h2.connection.H2Connection(
+        h2.config.H2Configuration(client_side=False))
+    conn.initiate_connection()
+    sock.sendall(conn.data_to_send())
+    pending = {}
+
+    def send_pending():
+        for stream_id, data in list(pending.items()):
+            while data:
+                size = min(conn.local_flow_control_window(stream_id),
+                           conn.max_outbound_frame_size, len(data))
+                if size <= 0:
+                    break
+                conn.send_data(stream_id, data[:size])
+                data = data[size:]
+            if data:
+                pending[stream_id] = data
+            else:
+                conn.end_stream(stream_id)
+                del pending[stream_id]
+
+    try:
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    conn.send_headers(event.stream_id, (
+                        (":status", "200"),
+                        ("content-type", "image/jpeg"),
+                        ("content-length", str(len(payload))),
+                    ))
+                    pending[event.stream_id] = memoryview(payload)
+                elif isinstance(event, h2.events.StreamReset):
+                    pending.pop(event.stream_id, None)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            send_pending()
+            sock.sendall(conn.data_to_send())
+    except (OSError, h2.exceptions.ProtocolError):
+        pass
+    finally:
+        sock.close()
+
+
+def generate_certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run((
+        "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+        "-keyout", key, "-out", cert, "-days", "1",
+        "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+    ), check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return cert, key
+
+
+def fetch(session, url, cert, close):
+    response = session.get(url, stream=True, verify=cert)
+    if close:
+        # what HttpDownloader does for skipped or rejected files
+        next(response.iter_content(16))
+        response.close()
+    else:
+        for _ in response.iter_content(32768):
+            pass
+        response.close()
+
+
+def run(transport, context, cert, args, workers, close):
+    server = Server(context, os.urandom(args.size))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "https://{}:{}/file.jpg".format(*server.server_address)
+
+    session = requests.Session()
+    if transport == "HTTP/2":
+        adapter = http_downloader.HTTP2Adapter(
+            http_downloader._http2_adapter().httpx)
+        session.mount("https://", adapter)
+
+    time_start = time.perf_counter()
+    if workers > 1:
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            for future in [pool.submit(fetch, session, url, cert, close)
+                           for _ in range(args.requests)]:
+                future.result()
+    else:
+        for _ in range(args.requests):
+            fetch(session, url, cert, close)
+    time_elapsed = time.perf_counter() - time_start
+
+    session.close()
+    if transport == "HTTP/2":
+        adapter.close()
+    server.shutdown()
+    server.server_close()
+    return time_elapsed, server.handshakes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--requests", type=int, default=200)
+    parser.add_argument("-s", "--size", type=int, default=256*1024)
+    parser.add_argument("-w", "--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cert, key = generate_certificate(tmpdir)
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert, key)
+        context.set_alpn_protocols(("h2", "http/1.1"))
+
+        print("{} requests, {} bytes each\n".format(args.requests, args.size))
+        print("{:<22} {:<9} {:>9} {:>11}".format(
+            "Scenario", "Protocol", "Seconds", "Handshakes"))
+        for name, workers, close in (
+            ("sequential", 1, False),
+            ("sequential, closed", 1, True),
+            ("{} workers".format(args.workers), args.workers, False),
+            ("{} workers, closed".format(args.workers), args.workers, True),
+        ):
+            for transport in ("HTTP/1.1", "HTTP/2"):
+                seconds, handshakes = run(
+                    transport, context, cert, args, workers, close)
+                print("{:<22} {:<9} {:>9.3f} {:>11}".format(
+                    name, transport, seconds, handshakes))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
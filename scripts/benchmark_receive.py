@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Measure HttpDownloader receive throughput against a local HTTP server"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import tracemalloc
+import http.server
+
+import util  # noqa F401
+from gallery_dl import extractor, output, path, config
+from gallery_dl.downloader import http as http_downloader
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        size = self.server.size
+        block = self.server.block
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+
+        try:
+            while size > 0:
+                self.wfile.write(block[:size])
+                size -= len(block)
+        except OSError:
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Job():
+
+    def __init__(self):
+        self.extractor = extractor.find("generic:https://example.org/")
+        self.extractor.initialize()
+        self.pathfmt = path.PathFormat(self.extractor)
+        self.out = output.NullOutput()
+        self.get_logger = lambda name: self.extractor.log
+
+
+class Counter():
+    """Count data buffers allocated by a content iterator"""
+
+    def __init__(self, content):
+        self.content = content
+        self.count = 0
+
+    def __iter__(self):
+        seen = None
+        for data in self.content:
+            # readinto() reuses the same underlying buffer
+            buffer = data.obj if isinstance(data, memoryview) else data
+            if buffer is not seen:
+                seen = buffer
+                self.count += 1
+            yield data
+
+
+def run(downloader, url, fp, readinto, trace):
+    response = downloader.session.get(url, stream=True)
+    if readinto:
+        content = downloader._iter_content(response)
+    else:
+        content = response.iter_content(downloader.chunk_size)
+    content = Counter(content)
+
+    fp.seek(0)
+    if trace:
+        tracemalloc.start()
+    time_start = time.perf_counter()
+    downloader.receive(fp, content, None, 0)
+    time_elapsed = time.perf_counter() - time_start
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    else:
+        peak = None
+
+    size = fp.tell()
+    response.close()
+    return size, time_elapsed, content.count, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-s", "--size", type=int, default=1024,
+                        help="response size in MiB (default: 1024)")
+    parser.add_argument("-c", "--chunk-size", type=int, action="append",
+                        help="chunk sizes to test "
+                             "(default: 32768, 131072, 1048576)")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-t", "--tracemalloc", action="store_true",
+                        help="measure peak memory usage (slow)")
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.size = args.size * 1048576
+    server.block = os.urandom(1048576)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://{}:{}/".format(*server.server_address)
+
+    print("{:<10} {:>10} {:>10} {:>15} {:>12}".format(
+        "Method", "Chunk", "MB/s", "Buffers per GB",
+        "Peak memory" if args.tracemalloc else ""))
+
+    with tempfile.TemporaryFile() as fp:
+        for chunk_size in args.chunk_size or (32768, 131072, 1048576):
+            config.set(("downloader", "http"), "chunk-size", chunk_size)
+            config.set(("downloader", "http"), "progress", None)
+            downloader = http_downloader.HttpDownloader(Job())
+
+            for method, readinto in (("iter", False), ("readinto", True)):
+                best = None
+                for _ in range(args.repeat):
+                    result = run(downloader, url, fp, readinto,
+                                 args.tracemalloc)
+                    if best is None or result[1] < best[1]:
+                        best = result
+
+                size, seconds, chunks, peak = best
+                print("{:<10} {:>10} {:>10.1f} {:>15.1f} {:>12}".format(
+                    method, chunk_size, size / seconds / 1000000,
+                    chunks * 1073741824 / size,
+                    "" if peak is None else peak))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
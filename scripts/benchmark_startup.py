@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Compare extractor lookup times with and without a registry file
+
+Each measurement runs in a new Python process and includes
+importing gallery_dl, finding an extractor for each given URL,
+and creating its instance.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+import util
+
+CODE = """
+import sys, time
+time_start = time.perf_counter()
+from gallery_dl import config, extractor
+config.set(("extractor",), "registry", {registry!r})
+for url in {urls!r}:
+    extractor.find(url)
+sys.stdout.write("{{}} {{}}".format(
+    time.perf_counter() - time_start,
+    sum(1 for m in sys.modules if m.startswith("gallery_dl.extractor."))))
+"""
+
+PROFILE = """
+import cProfile, pstats
+from gallery_dl import config, extractor
+config.set(("extractor",), "registry", {registry!r})
+cProfile.run("for url in {urls!r}: extractor.find(url)", "{output}")
+pstats.Stats("{output}").sort_stats("cumulative").print_stats({limit})
+"""
+
+URLS = (
+    "https://danbooru.donmai.us/posts/12345",
+    "https://www.pixiv.net/artworks/12345",
+    "https://example.org/image.jpg",
+    "generic:https://example.org/",
+)
+
+
+def run(code, registry, urls, **kwargs):
+    code = code.format(registry=registry, urls=urls, **kwargs)
+    return subprocess.run(
+        (sys.executable, "-c", code), cwd=util.ROOTDIR, check=True,
+        stdout=subprocess.PIPE, universal_newlines=True,
+    ).stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("urls", nargs="*", metavar="URL")
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="print cProfile statistics for each method")
+    parser.add_argument("--limit", type=int, default=20,
+                        help="number of profile entries to print")
+    args = parser.parse_args()
+    urls = tuple(args.urls) or URLS
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        registry = os.path.join(tmpdir, "extractors.json")
+        methods = (("modules", False), ("registry", registry))
+
+        # create registry file
+        time_start = time.perf_counter()
+        run(CODE, registry, urls)
+        print("Creating registry file: {:.3f}s\n".format(
+            time.perf_counter() - time_start))
+
+        if args.startup_profile:
+            for name, value in methods:
+                print("=" * 30, name, "=" * 30)
+                print(run(PROFILE, value, urls, limit=args.limit,
+                          output=os.path.join(tmpdir, "profile")))
+            return
+
+        print("{:<10} {:>10} {:>10} {:>10}".format(
+            "Method", "Best", "Mean", "Modules"))
+        for name, value in methods:
+            times = []
+            for _ in range(args.repeat):
+                seconds, modules = run(CODE, value, urls).split()
+                times.append(float(seconds))
+            print("{:<10} {:>9.3f}s {:>9.3f}s {:>10}".format(
+                name, min(times), sum(times) / len(times), modules))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
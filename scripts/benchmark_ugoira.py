@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+"""Compare Ugoira conversion times of extracted and piped frames
+
+Creates a synthetic Ugoira ZIP archive with ffmpeg's 'testsrc' source
+and converts copies of it like a sequence of downloaded files would be.
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import zipfile
+import argparse
+import tempfile
+import subprocess
+import collections
+
+import util  # noqa F401
+from gallery_dl import extractor, output, path, config
+from gallery_dl.postprocessor import ugoira
+
+
+class Job():
+
+    def __init__(self):
+        extr = extractor.find("generic:https://example.org/")
+        extr.directory_fmt = ("{category}",)
+        self.extractor = extr
+        self.pathfmt = path.PathFormat(extr)
+        self.out = output.NullOutput()
+        self.get_logger = logging.getLogger
+        self.hooks = collections.defaultdict(list)
+
+    def register_hooks(self, hooks, options):
+        for hook, callback in hooks.items():
+            self.hooks[hook].append(callback)
+
+    def run(self, event, pathfmt):
+        for callback in self.hooks[event]:
+            callback(pathfmt)
+
+
+def create_zip(ffmpeg, directory, frames, size):
+    framedir = os.path.join(directory, "frames")
+    os.mkdir(framedir)
+    subprocess.run((
+        ffmpeg, "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", "testsrc=size={}:rate=10".format(size),
+        "-frames:v", str(frames), framedir + "/%06d.jpg",
+    ), check=True)
+
+    names = sorted(os.listdir(framedir))
+    zpath = os.path.join(directory, "ugoira.zip")
+    with zipfile.ZipFile(zpath, "w") as zfile:
+        for name in names:
+            zfile.write(os.path.join(framedir, name), name)
+    shutil.rmtree(framedir)
+
+    # alternate between two delays to get a non-uniform frame rate
+    return zpath, [
+        {"file": name, "delay": 60 if index % 2 else 100}
+        for index, name in enumerate(names)
+    ]
+
+
+def run(zpath, frames, count, options):
+    with tempfile.TemporaryDirectory() as directory:
+        config.set((), "base-directory", directory)
+        job = Job()
+        ugoira.UgoiraPP(job, options)
+        pathfmt = job.pathfmt
+
+        start = time.perf_counter()
+        for num in range(count):
+            kwdict = {
+                "category" : "test",
+                "filename" : str(num),
+                "extension": "zip",
+                "_ugoira_frame_data": frames,
+            }
+            pathfmt.set_directory(kwdict)
+            pathfmt.set_filename(kwdict)
+            pathfmt.build_path()
+            os.makedirs(pathfmt.realdirectory, exist_ok=True)
+            shutil.copyfile(zpath, pathfmt.temppath)
+
+            job.run("prepare", pathfmt)
+            job.run("file", pathfmt)
+            pathfmt.finalize()
+        job.run("finalize", pathfmt)
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=8,
+                        help="number of conversions (default: 8)")
+    parser.add_argument("-f", "--frames", type=int, default=60)
+    parser.add_argument("-s", "--size", default="600x600")
+    parser.add_argument("-w", "--workers", type=int, default=4)
+    parser.add_argument("--mode", default="concat")
+    parser.add_argument("--ffmpeg", default="ffmpeg")
+    args = parser.parse_args()
+
+    if not shutil.which(args.ffmpeg):
+        sys.exit("'{}' not found".format(args.ffmpeg))
+
+    base = {"mode": args.mode, "ffmpeg-location": args.ffmpeg,
+            "ffmpeg-args": ("-c:v", "libvpx", "-deadline", "realtime")}
+    variants = (
+        ("extract", {}),
+        ("pipe", {"pipe": True}),
+        ("pipe + workers", {"pipe": True, "workers": args.workers}),
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        zpath, frames = create_zip(
+            args.ffmpeg, directory, args.frames, args.size)
+        print("{} conversions of {} frames ({}, {} mode)\n".format(
+            args.number, args.frames, args.size, args.mode))
+
+        reference = None
+        for name, options in variants:
+            seconds = run(zpath, frames, args.number, dict(base, **options))
+            if reference is None:
+                reference = seconds
+            print("{:<16} {:>8.2f}s {:>7.2f}x".format(
+                name, seconds, reference / seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -95,6 +95,97 @@ class TestConfig(unittest.TestCase):
         test(("Z1", "Z2", "A1", "A2", "A3"), 999, 8)
         test((), 9)
 
+    def test_view(self):
+        paths = ((), ("b",), ("b", "b"), ("a",), ("b", "x"), ("e", "f"))
+        keys = ("a", "b", "c", "d", "g")
+
+        def check():
+            for path in paths:
+                view = config.view(path)
+                for key in keys:
+                    self.assertEqual(
+                        view.get(key, "DEFAULT"),
+                        config.interpolate(path, key, "DEFAULT"),
+                        (path, key))
+
+        check()
+        self.assertIs(config.view(("b", "b")), config.view(("b", "b")))
+        self.assertEqual(config.view(("b", "b"))["c"], [8, 9])
+
+        view = config.view(("b", "b"))
+        with self.assertRaises(TypeError):
+            view["c"] = 1
+
+        config.set(("b",), "d", 4)
+        self.assertIsNot(config.view(("b", "b")), view)
+        self.assertEqual(config.view(("b", "b"))["d"], 4)
+        check()
+
+        config.set(("b", "b"), "d", 5)
+        config.set((), "c", "root")
+        config.set(("e",), "f", "not a dict")
+        check()
+
+        config.unset((), "a")
+        check()
+
+        with config.apply(((("b", "b"), "a", 6),)):
+            self.assertEqual(config.view(("b", "b"))["a"], 6)
+            check()
+        self.assertEqual(config.view(("b", "b"))["a"], 3)
+        check()
+
+    def test_view_list(self):
+        view = config.view(["b", "b"])
+        self.assertIs(view, config.view(("b", "b")))
+        self.assertEqual(view["c"], [8, 9])
+
+        view = config.view_common(["b"], [["b"], ("x",)])
+        self.assertEqual(view["c"], [8, 9])
+
+    def test_view_direct(self):
+        view = config.view(("b", "b"))
+
+        config._config.update({"d": 1})
+        self.assertIsNot(config.view(("b", "b")), view)
+        self.assertEqual(config.view(("b", "b"))["d"], 1)
+
+        config._config["d"] = 2
+        self.assertEqual(config.view(("b", "b"))["d"], 2)
+
+        del config._config["d"]
+        self.assertNotIn("d", config.view(("b", "b")))
+
+        config._config.setdefault("d", 3)
+        self.assertEqual(config.view(("b", "b"))["d"], 3)
+
+        config._config.pop("b")
+        self.assertNotIn("c", config.view(("b", "b")))
+
+        config.clear()
+        self.assertEqual(dict(config.view(("b", "b"))), {})
+
+    def test_view_common(self):
+        common = ("Z1", "Z2")
+        paths = [("A1", "A2"), ("B1",), ("C1", "C2", "C3")]
+
+        def check(key="KEY"):
+            self.assertEqual(
+                config.view_common(common, paths).get(key, "DEFAULT"),
+                config.interpolate_common(common, paths, key, "DEFAULT"))
+
+        check()
+        for path in (("Z1",), ("Z1", "Z2"), ("Z1", "Z2", "C1", "C2"),
+                     ("Z1", "Z2", "B1"), ("Z1", "Z2", "A1", "A2"),
+                     ("Z1", "A1", "A2"), ("Z1", "Z2", "A1", "A2", "A3"),
+                     ()):
+            config.set(path, "KEY", len(path))
+            check()
+            check("a")
+
+        config.set(("Z1",), "Z2", None)
+        check()
+
     def test_accumulate(self):
         self.assertEqual(config.accumulate((), "l"), [])
 
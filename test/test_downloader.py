@@ -13,6 +13,8 @@ import unittest
 from unittest.mock import Mock, MagicMock, patch
 
 import re
+import json
+import hashlib
 import logging
 import os.path
 import binascii
@@ -23,6 +25,7 @@ import http.server
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from gallery_dl import downloader, extractor, output, config, path  # noqa E402
 from gallery_dl.downloader.http import MIME_TYPES, SIGNATURE_CHECKS # noqa E402
+from gallery_dl.downloader import http as http_downloader  # noqa E402
 
 
 class MockDownloaderModule(Mock):
@@ -280,6 +283,33 @@ class TestHTTPDownloader(TestDownloaderBase):
         self._run_test("png", None, DATA["png"], "gif", "png")
         self._run_test("gif", None, DATA["gif"], "jpg", "gif")
 
+    def test_http_hash(self):
+        for input in (None, DATA["jpg"][:123]):
+            pathfmt = self._prepare_destination(extension="jpg")
+            if input:
+                # resume from .part file
+                os.makedirs(pathfmt.realdirectory, exist_ok=True)
+                with open(pathfmt.realpath + ".part", "wb") as fp:
+                    fp.write(input)
+            pathfmt.kwdict["_http_hash"] = {"md5", "sha1"}
+
+            self.assertTrue(self.downloader.download(
+                self.address + "/jpg", pathfmt))
+            self.assertEqual(pathfmt.kwdict["_http_digests"], {
+                "md5" : hashlib.md5(DATA["jpg"]).hexdigest(),
+                "sha1": hashlib.sha1(DATA["jpg"]).hexdigest(),
+            })
+
+    def test_http_readinto(self):
+        response = self.downloader.session.get(
+            self.address + "/jpg", stream=True)
+        content = self.downloader._iter_content(response)
+        self.assertEqual(content.__name__, "_iter_readinto")
+
+        chunks = list(bytes(chunk) for chunk in content)
+        self.assertEqual(b"".join(chunks), DATA["jpg"])
+        response.close()
+
     def test_http_filesize_min(self):
         url = self.address + "/gif"
         pathfmt = self._prepare_destination(None, extension=None)
@@ -299,6 +329,114 @@ class TestHTTPDownloader(TestDownloaderBase):
         self.assertEqual(pathfmt.temppath, "")
 
 
+class TestHTTP2Downloader(TestHTTPDownloader):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            adapter = http_downloader._http2_adapter()
+        except ImportError as exc:
+            raise unittest.SkipTest("cannot import httpx ({})".format(exc))
+
+        TestHTTPDownloader.setUpClass()
+        cls.downloader = downloader.find("http")(cls.job)
+        cls.downloader.session = session = \
+            cls.downloader._http2_session(cls.job.extractor.session)
+        session.mount("http://", adapter)
+
+    def test_http_readinto(self):
+        response = self.downloader.session.get(
+            self.address + "/jpg", stream=True)
+        content = self.downloader._iter_content(response)
+        self.assertNotEqual(content.__name__, "_iter_readinto")
+        self.assertEqual(b"".join(content), DATA["jpg"])
+        response.close()
+
+    def test_http2_session(self):
+        session = self.downloader.session
+        self.assertIsNot(session, self.job.extractor.session)
+        self.assertIs(session.headers, self.job.extractor.session.headers)
+        self.assertIs(session.cookies, self.job.extractor.session.cookies)
+        self.assertIsInstance(
+            session.get_adapter("https://example.org/"),
+            http_downloader.HTTP2Adapter)
+
+
+class TestHTTPDownloaderSegments(TestDownloaderBase):
+
+    @classmethod
+    def setUpClass(cls):
+        TestDownloaderBase.setUpClass()
+        config.set(("downloader", "http"), "segments", 4)
+        cls.downloader = downloader.find("http")(cls.job)
+
+        try:
+            server = http.server.ThreadingHTTPServer(
+                ("127.0.0.1", 0), HttpRequestHandler)
+        except OSError as exc:
+            raise unittest.SkipTest(
+                "cannot spawn local HTTP server ({})".format(exc))
+
+        server.daemon_threads = True
+        cls.address = "http://{}:{}".format(*server.server_address)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def test_segments(self):
+        self.assertEqual(self.downloader.segments, 4)
+        self._run_test(self.address + "/large", None, DATA["large"],
+                       "png", "png")
+
+    def test_segments_resume(self):
+        output = DATA["large"]
+        size = len(output)
+        pathfmt = self._prepare_destination(extension="png")
+        part = pathfmt.realpath + ".part"
+
+        os.makedirs(pathfmt.realdirectory, exist_ok=True)
+        with open(part, "wb") as fp:
+            fp.write(output[:1000000] + bytes(size - 1000000))
+        with open(part + ".segments", "w") as fp:
+            json.dump({"size": size, "segments": [
+                [1000000, 1499999], [1500000 + 12345, size-1]]}, fp)
+
+        self.assertTrue(self.downloader.download(
+            self.address + "/large", pathfmt))
+
+        with pathfmt.open("rb") as fp:
+            content = fp.read()
+        self.assertEqual(content[:1500000], output[:1500000])
+        self.assertEqual(content[1500000:1512345], bytes(12345))
+        self.assertEqual(content[1512345:], output[1512345:])
+        self.assertFalse(os.path.exists(part + ".segments"))
+
+    def test_segments_unsupported(self):
+        retries = self.downloader.retries
+        self.downloader.retries = 0
+        try:
+            with patch.object(self.downloader.log, "warning") as warning:
+                self._run_test(self.address + "/large-norange", None,
+                               DATA["large"], "png", "png")
+        finally:
+            self.downloader.retries = retries
+        warning.assert_not_called()
+
+    def test_segments_stale_state(self):
+        pathfmt = self._prepare_destination(extension="jpg")
+        part = pathfmt.realpath + ".part"
+
+        os.makedirs(pathfmt.realdirectory, exist_ok=True)
+        with open(part, "wb") as fp:
+            fp.write(bytes(100))
+        with open(part + ".segments", "w") as fp:
+            json.dump({"size": 100, "segments": [[10, 99]]}, fp)
+
+        self.assertTrue(self.downloader.download(
+            self.address + "/jpg", pathfmt))
+        self.assertFalse(os.path.exists(part + ".segments"))
+        with pathfmt.open("rb") as fp:
+            self.assertEqual(fp.read(), DATA["jpg"])
+
+
 class TestTextDownloader(TestDownloaderBase):
 
     @classmethod
@@ -326,17 +464,19 @@ class HttpRequestHandler(http.server.BaseHTTPRequestHandler):
             self.wfile.write(self.path.encode())
             return
 
-        headers = {"Content-Length": len(output)}
+        headers = {"Content-Length": len(output), "Accept-Ranges": "bytes"}
 
-        if "Range" in self.headers:
+        if "Range" in self.headers and not self.path.endswith("-norange"):
             status = 206
 
-            match = re.match(r"bytes=(\d+)-", self.headers["Range"])
+            match = re.match(r"bytes=(\d+)-(\d*)", self.headers["Range"])
             start = int(match.group(1))
+            end = int(match.group(2) or len(output)-1)
 
             headers["Content-Range"] = "bytes {}-{}/{}".format(
-                start, len(output)-1, len(output))
-            output = output[start:]
+                start, end, len(output))
+            headers["Content-Length"] = end + 1 - start
+            output = output[start:end+1]
         else:
             status = 200
 
@@ -408,6 +548,8 @@ for ext, content in SAMPLES:
 for idx, (_, content) in enumerate(SAMPLES):
     DATA["S{:>02}".format(idx)] = content
 
+DATA["large"] = DATA["large-norange"] = DATA["png"] + os.urandom(3000000)
+
 
 # reverse mime types mapping
 MIME_TYPES = {
@@ -10,14 +10,16 @@
 import os
 import sys
 import unittest
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 
 import time
 import string
+import tempfile
+import threading
 from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from gallery_dl import extractor, util  # noqa E402
+from gallery_dl import extractor, config, urlindex, util  # noqa E402
 from gallery_dl.extractor import mastodon  # noqa E402
 from gallery_dl.extractor.common import Extractor, Message  # noqa E402
 from gallery_dl.extractor.directlink import DirectlinkExtractor  # noqa E402
@@ -55,6 +57,8 @@ class TestExtractorModule(unittest.TestCase):
 
     def setUp(self):
         extractor._cache.clear()
+        extractor._index = None
+        extractor._registry = False
         extractor._module_iter = extractor._modules_internal()
         extractor._list_classes = _list_classes
 
@@ -70,6 +74,127 @@ class TestExtractorModule(unittest.TestCase):
             with self.assertRaises(TypeError):
                 extractor.find(invalid)
 
+    def test_find_index(self):
+        self.assertIsNone(extractor.find("/tmp/file.ext"))
+        self.assertIsNotNone(extractor._index)
+
+        for uri in self.VALID_URIS:
+            result = extractor.find(uri)
+            self.assertIsInstance(result, Extractor, uri)
+
+        extractor.add(FakeExtractor)
+        self.assertIsInstance(extractor.find("fake:foobar"), FakeExtractor)
+
+    def test_find_index_unavailable(self):
+        import gallery_dl
+        del gallery_dl.urlindex
+        try:
+            with patch.dict(sys.modules, {"gallery_dl.urlindex": None}):
+                self.assertIsNone(extractor.find("/tmp/file.ext"))
+                self.assertIsNone(extractor._index)
+
+                for uri in self.VALID_URIS:
+                    result = extractor.find(uri)
+                    self.assertIsInstance(result, Extractor, uri)
+        finally:
+            gallery_dl.urlindex = urlindex
+
+    def test_find_threads(self):
+        uris = self.VALID_URIS * 4 + ("/tmp/file.ext",)
+        results = {}
+
+        def find(index, uri):
+            results[index] = extractor.find(uri)
+
+        threads = [
+            threading.Thread(target=find, args=(index, uri))
+            for index, uri in enumerate(uris)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIsNotNone(extractor._index)
+        for index, uri in enumerate(uris):
+            if index == len(uris) - 1:
+                self.assertIsNone(results[index])
+            else:
+                self.assertIsInstance(results[index], Extractor, uri)
+                self.assertTrue(results[index].__class__.pattern.match(uri))
+
+    @unittest.skipIf(not results, "no test data")
+    def test_find_index_results(self):
+        classes = list(_list_classes())
+        index = urlindex.PatternIndex(classes)
+
+        for result in results.all():
+            url = result["#url"]
+            for uri in (url, url.upper(), url.partition("://")[2]):
+                candidates = index.candidates(uri)
+                for cls in classes:
+                    if cls.pattern.match(uri):
+                        self.assertIn(cls, candidates, uri)
+
+    def test_registry(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "extractors.json")
+            config.set(("extractor",), "registry", path)
+            try:
+                self._test_registry(path)
+            finally:
+                config.clear()
+
+    def _test_registry(self, path):
+        # create registry file
+        extractor._registry = None
+        self.assertIsInstance(extractor.find(self.VALID_URIS[0]), Extractor)
+        self.assertTrue(os.path.exists(path))
+        self.assertIsNotNone(extractor._index)
+        self.assertFalse(extractor._registry)
+
+        # use registry file
+        self.setUp()
+        extractor._registry = None
+        for uri in self.VALID_URIS:
+            self.assertIsInstance(extractor.find(uri), Extractor, uri)
+        self.assertIsNone(extractor.find("/tmp/file.ext"))
+        self.assertTrue(extractor._registry)
+        self.assertIsNone(extractor._index)
+        self.assertFalse(extractor._cache)
+
+        extractor.add(FakeExtractor)
+        self.assertIsInstance(extractor.find("fake:foobar"), FakeExtractor)
+
+        # outdated registry file
+        for entry in extractor._registry.values:
+            if entry.name == "DirectlinkExtractor":
+                entry.name = "DirectlinkOldExtractor"
+        self.assertIsInstance(
+            extractor.find(self.VALID_URIS[0]), DirectlinkExtractor)
+        self.assertFalse(extractor._registry)
+        self.assertFalse(os.path.exists(path))
+
+    def test_registry_key(self):
+        key = extractor._registry_key()
+        self.assertEqual(extractor._registry_key(), key)
+
+        try:
+            config.set(("extractor",), "danbooru", {"user-agent": "foo"})
+            self.assertEqual(extractor._registry_key(), key)
+
+            # custom BaseExtractor instance
+            config.set(("extractor",), "danbooru", {
+                "myinst": {"root": "https://myinst.example.org"}})
+            key_inst = extractor._registry_key()
+            self.assertNotEqual(key_inst, key)
+
+            config.set(("extractor", "danbooru", "myinst"),
+                       "pattern", r"myinst\.example\.org")
+            self.assertNotEqual(extractor._registry_key(), key_inst)
+        finally:
+            config.clear()
+
     def test_add(self):
         uri = "fake:foobar"
         self.assertIsNone(extractor.find(uri))
@@ -299,6 +424,218 @@ class TestExtractorWait(unittest.TestCase):
         return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
 
 
+class TestExtractorPrefetch(unittest.TestCase):
+
+    def setUp(self):
+        self.extr = extractor.find("generic:https://example.org/")
+
+    def tearDown(self):
+        config.clear()
+
+    def test_disabled(self):
+        self.assertIsNone(self.extr._prefetch_pages(str, 1))
+        config.set(("extractor",), "page-prefetch", 0)
+        self.assertIsNone(self.extr._prefetch_pages(str, 1))
+
+    def test_order(self):
+        config.set(("extractor",), "page-prefetch", 4)
+        requested = []
+
+        def fetch(page):
+            requested.append(page)
+            # later pages finish first
+            time.sleep((10 - page) * 0.002 if page < 10 else 0)
+            return [page] if page <= 7 else []
+
+        pages = self.extr._prefetch_pages(fetch, 1)
+        self.assertEqual(list(pages), [[1], [2], [3], [4], [5], [6], [7], []])
+        self.assertLessEqual(max(requested), 7 + 4)
+
+    def test_step(self):
+        config.set(("extractor",), "page-prefetch", 2)
+
+        pages = self.extr._prefetch_pages(
+            lambda offset: [offset] if offset < 200 else None, 0, 50)
+        self.assertEqual(list(pages), [[0], [50], [100], [150], None])
+
+    def test_exception(self):
+        config.set(("extractor",), "page-prefetch", 3)
+
+        def fetch(page):
+            if page == 3:
+                raise ValueError(page)
+            return [page]
+
+        pages = self.extr._prefetch_pages(fetch, 1)
+        self.assertEqual(next(pages), [1])
+        self.assertEqual(next(pages), [2])
+        with self.assertRaises(ValueError):
+            next(pages)
+
+    def test_sleep_request(self):
+        extr = self.extr
+        extr.initialize()
+        extr._interval = lambda: 0.03
+        Extractor.request_timestamps.clear()
+
+        times = []
+        session = Mock()
+        session.request.side_effect = \
+            lambda *args, **kwargs: times.append(time.time()) or Mock(
+                status_code=200)
+
+        threads = [
+            threading.Thread(target=extr.request,
+                             args=("https://example.org/",),
+                             kwargs={"session": session})
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        times.sort()
+        self.assertEqual(len(times), 4)
+        for previous, current in zip(times, times[1:]):
+            self.assertGreaterEqual(current - previous, 0.025)
+
+    def test_sleep_request_categories(self):
+        Extractor.request_timestamps.clear()
+        session = Mock()
+        session.request.return_value = Mock(status_code=200)
+
+        # requests of other categories do not wait for each other
+        extrs = []
+        for category in ("foo", "bar", "baz"):
+            extr = extractor.find("generic:https://example.org/")
+            extr.initialize()
+            extr.category = category
+            extr._interval = lambda: 0.5
+            extr.sleep = Mock()
+            extr.request("https://example.org/", session=session)
+            extrs.append(extr)
+        for extr in extrs:
+            extr.sleep.assert_not_called()
+
+        extr.request("https://example.org/", session=session)
+        extr.sleep.assert_called_once()
+
+    def test_danbooru(self):
+        def results(page):
+            page = page or 1
+            num = 200 if page < 4 else 10 if page == 4 else 0
+            return [{"id": page * 1000 + i} for i in range(num)]
+
+        requested = self._run_pagination(
+            "https://danbooru.donmai.us/posts?tags=bonocho",
+            lambda extr: extr._pagination("/posts.json", {"tags": "bonocho"}),
+            "page", results)
+        self.assertEqual(requested, [None, 2, 3, 4])
+
+    def test_gelbooru(self):
+        def results(pid):
+            num = 100 if pid < 2 else 30 if pid == 2 else 0
+            return {"post": [{"id": pid * 1000 + i} for i in range(num)]}
+
+        requested = self._run_pagination(
+            "https://gelbooru.com/index.php?page=post&s=list&tags=bonocho",
+            lambda extr: extr._pagination({"tags": "bonocho sort:score"}),
+            "pid", results)
+        self.assertEqual(requested, [0, 1, 2])
+
+    def test_kemono(self):
+        from gallery_dl.extractor import kemonoparty
+
+        def results(offset):
+            num = 50 if offset < 100 else 20 if offset == 100 else 0
+            return [{"id": offset + i} for i in range(num)]
+
+        requested = self._run_pagination(
+            "https://kemono.su/fanbox/user/6993449",
+            lambda extr: kemonoparty.KemonoAPI(extr)._pagination(
+                "/posts", {"o": 60}),
+            "o", results)
+        self.assertEqual(requested, [50, 100])
+
+    def _run_pagination(self, url, pagination, key, results):
+        """Compare the results of 'pagination' with and without prefetching
+
+        Returns the values of 'key' requested without prefetching.
+        """
+        outputs = []
+        for prefetch in (0, 3):
+            config.set(("extractor",), "page-prefetch", prefetch)
+            extr = extractor.find(url)
+            extr.initialize()
+
+            requested = []
+            lock = threading.Lock()
+
+            def request(url, params=None, **kwargs):
+                value = params[key]
+                with lock:
+                    requested.append(value)
+                return Mock(json=Mock(return_value=results(value)))
+
+            with patch.object(extr, "request", request):
+                items = list(pagination(extr))
+            outputs.append((items, requested))
+
+        (items, requested), (items_prefetch, requested_prefetch) = outputs
+        self.assertTrue(items)
+        self.assertEqual(items, items_prefetch)
+        # prefetching requests at most 'page-prefetch' pages too many
+        self.assertLessEqual(len(requested_prefetch), len(requested) + 3)
+        return requested
+
+
+class TestExtractorMapWindow(unittest.TestCase):
+
+    def setUp(self):
+        self.extr = extractor.find("generic:https://example.org/")
+
+    def tearDown(self):
+        config.clear()
+
+    def test_disabled(self):
+        result = self.extr._map_window(str, (1, 2, 3))
+        self.assertIsInstance(result, map)
+        self.assertEqual(list(result), ["1", "2", "3"])
+
+    def test_order(self):
+        config.set(("extractor",), "metadata-parallel", 3)
+        consumed = []
+
+        def items():
+            for num in range(10):
+                consumed.append(num)
+                yield num
+
+        def func(num):
+            time.sleep((10 - num) * 0.002)
+            return num * 2
+
+        results = self.extr._map_window(func, items())
+        self.assertEqual(next(results), 0)
+        self.assertEqual(consumed, [0, 1, 2])
+        self.assertEqual(list(results), list(range(2, 20, 2)))
+
+    def test_exception(self):
+        config.set(("extractor",), "metadata-parallel", 2)
+
+        def func(num):
+            if num == 2:
+                raise ValueError(num)
+            return num
+
+        results = self.extr._map_window(func, range(5))
+        self.assertEqual(next(results), 0)
+        self.assertEqual(next(results), 1)
+        with self.assertRaises(ValueError):
+            next(results)
+
+
 class TextExtractorOAuth(unittest.TestCase):
 
     def test_oauth1(self):
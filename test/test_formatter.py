@@ -502,5 +502,54 @@ def noarg():
         self.assertEqual(output, result, format_string)
 
 
+class TestFormatterCompiled(TestFormatter):
+    """Run all tests with generated format_map() functions"""
+
+    def setUp(self):
+        formatter._COMPILE = True
+        formatter._CACHE.clear()
+
+    def tearDown(self):
+        formatter._COMPILE = False
+        formatter._CACHE.clear()
+
+    def test_compiled(self):
+        fmt = formatter.parse("{a} {b}")
+        self.assertEqual(fmt.format_map.__name__, "format_map")
+        self.assertNotIsInstance(fmt.format_map, type(fmt.__init__))
+
+        fmt = formatter.parse("{a}")
+        self.assertNotEqual(fmt.format_map.__name__, "format_map")
+
+    def test_compiled_equal(self):
+        format_strings = (
+            "{a}/{b}_{i:>04}.{l[2]}",
+            "{d[a]}{d[c]}{d[z]}{z.attr}{a[:5]!u}",
+            "{z|title2|title1:?</>/}-{z|title3|title4}-{z|n}",
+            "{z|_env[HOME]|'x'} {_nul} {_lit[foo]!u} {'bar'}",
+            "{a:Rh/C/RE/e/RL/l/}{l:J-/}{a!l:L5/too long/}",
+        )
+        for default in (None, "", "DEFAULT"):
+            for format_string in format_strings:
+                formatter._COMPILE = False
+                expected = formatter.StringFormatter(
+                    format_string, default).format_map(self.kwdict)
+                formatter._COMPILE = True
+                result = formatter.StringFormatter(
+                    format_string, default).format_map(self.kwdict)
+                self.assertEqual(result, expected, format_string)
+
+    def _run_test(self, format_string, result, default=None, fmt=format):
+        TestFormatter._run_test(self, format_string, result, default, fmt)
+
+        # add literal text to get a generated function
+        if isinstance(result, str) and format_string[0] != "\f":
+            TestFormatter._run_test(
+                self, "<" + format_string + ">", "<" + result + ">",
+                default, fmt)
+            TestFormatter._run_test(
+                self, format_string * 2, result * 2, default, fmt)
+
+
 if __name__ == "__main__":
     unittest.main()
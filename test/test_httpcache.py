@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+import os
+import sys
+import unittest
+
+import io
+import tempfile
+import threading
+import http.server
+import http.cookiejar
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gallery_dl import httpcache, config, extractor, util  # noqa E402
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(self.headers)
+        path = self.path
+        body = (path * 100).encode()
+
+        if path.startswith("/redirect"):
+            self.send_response(302)
+            self.send_header("Location", "/plain" + path[9:])
+            self.end_headers()
+            return
+        elif path.startswith("/etag"):
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+        elif path.startswith("/modified"):
+            if self.headers.get("If-Modified-Since"):
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Last-Modified", "Fri, 01 Jan 2010 00:00:00 GMT")
+        elif path.startswith("/nostore"):
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Cache-Control", "no-store")
+        else:
+            self.send_response(200)
+
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Set-Cookie", "foo=bar")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = server = http.server.ThreadingHTTPServer(
+            ("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        server.requests = []
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cls.root = "http://{}:{}".format(*server.server_address)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = httpcache.HttpCache(
+            os.path.join(self.tmpdir.name, "http.sqlite3"))
+        self.session = requests.Session()
+        # keep 'Set-Cookie' responses from adding credentials
+        self.session.cookies.set_policy(
+            http.cookiejar.DefaultCookiePolicy(allowed_domains=()))
+        self.server.requests.clear()
+
+    def tearDown(self):
+        self.session.close()
+        self.cache.close()
+        self.tmpdir.cleanup()
+
+    def _request(self, path, ttl=0, **kwargs):
+        return self.cache.request(
+            self.session, self.root + path, ttl, kwargs)
+
+    def test_etag(self):
+        response = self._request("/etag")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(hasattr(response, "from_cache"))
+
+        response = self._request("/etag")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.text, "/etag" * 100)
+        self.assertEqual(response.headers["ETag"], '"v1"')
+        self.assertNotIn("Set-Cookie", response.headers)
+
+        requests = self.server.requests
+        self.assertEqual(len(requests), 2)
+        self.assertIsNone(requests[0].get("If-None-Match"))
+        self.assertEqual(requests[1].get("If-None-Match"), '"v1"')
+
+    def test_last_modified(self):
+        self._request("/modified", headers={"X-Test": "1"})
+        response = self._request("/modified", headers={"X-Test": "2"})
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.text, "/modified" * 100)
+
+        requests = self.server.requests
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[1].get("If-Modified-Since"),
+                         "Fri, 01 Jan 2010 00:00:00 GMT")
+        self.assertEqual(requests[1].get("X-Test"), "2")
+
+    def test_ttl(self):
+        for _ in range(3):
+            response = self._request("/plain", 60)
+            self.assertEqual(response.text, "/plain" * 100)
+        self.assertEqual(len(self.server.requests), 1)
+
+        # without TTL, responses without validators are not reused
+        self._request("/other")
+        response = self._request("/other")
+        self.assertFalse(hasattr(response, "from_cache"))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_params(self):
+        self._request("/plain", 60, params={"page": 1})
+        self._request("/plain", 60, params={"page": 2})
+        self._request("/plain", 60, params={"page": 1})
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_credentials(self):
+        self._request("/plain", 60)
+        self._request("/plain", 60, headers={"Authorization": "Bearer A"})
+        self._request("/plain", 60, headers={"Authorization": "Bearer B"})
+        self._request("/plain", 60, cookies={"session": "A"})
+        self._request("/plain", 60, headers={"X-Csrf-Token": "A"})
+        self.assertEqual(len(self.server.requests), 5)
+
+        for kwargs in ({}, {"headers": {"Authorization": "Bearer B"}},
+                       {"cookies": {"session": "A"}}):
+            response = self._request("/plain", 60, **kwargs)
+            self.assertTrue(response.from_cache, kwargs)
+        self.assertEqual(len(self.server.requests), 5)
+
+        # other headers do not affect the cache key
+        response = self._request("/plain", 60, headers={"X-Test": "1"})
+        self.assertTrue(response.from_cache)
+
+        # session cookies and auth
+        self.session.cookies = requests.cookies.cookiejar_from_dict(
+            {"session": "A"})
+        self.assertTrue(self._request("/plain", 60).from_cache)
+        self.session.auth = ("user", "pass")
+        self.assertFalse(hasattr(self._request("/plain", 60), "from_cache"))
+        self.assertEqual(len(self.server.requests), 6)
+
+    def test_redirect(self):
+        url = self.root + "/plain-redirected"
+        self._request("/redirect-redirected", 60)
+        response = self._request("/redirect-redirected", 60)
+
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.url, url)
+        self.assertEqual(response.request.url, url)
+        self.assertEqual(response.request.method, "GET")
+        self.assertEqual(response.text, "/plain-redirected" * 100)
+        self.assertEqual(len(self.server.requests), 2)
+
+        fp = io.BytesIO()
+        util.dump_response(response, fp, headers=True)
+        self.assertIn(("GET " + url).encode(), fp.getvalue())
+
+    def test_no_store(self):
+        self._request("/nostore")
+        response = self._request("/nostore")
+        self.assertFalse(hasattr(response, "from_cache"))
+        self.assertIsNone(self.server.requests[1].get("If-None-Match"))
+
+    def test_compression(self):
+        self._request("/etag")
+        size = self.cache.db.execute(
+            "SELECT size FROM responses").fetchone()[0]
+        self.assertEqual(size, self.cache.size)
+        self.assertLess(size, len("/etag" * 100))
+
+    def test_eviction(self):
+        self._request("/etag1", 60)
+        size = self.cache.size
+        self.cache.maxsize = size * 3
+
+        self._request("/etag2", 60)
+        self._request("/etag3", 60)
+        self._request("/etag1", 60)  # mark as recently used
+        self._request("/etag4", 60)
+        self.assertLessEqual(self.cache.size, self.cache.maxsize)
+
+        urls = {url for url, in self.cache.db.execute(
+            "SELECT key FROM responses")}
+        self.assertIn(self.root + "/etag1", urls)
+        self.assertIn(self.root + "/etag4", urls)
+        self.assertNotIn(self.root + "/etag2", urls)
+
+    def test_extractor(self):
+        path = os.path.join(self.tmpdir.name, "shared.sqlite3")
+        config.set(("cache",), "http-file", path)
+        config.set(("extractor",), "http-cache", True)
+        httpcache._instance = None
+        try:
+            extr = extractor.find("generic:https://example.org/")
+            extr.initialize()
+            self.assertIsInstance(extr._httpcache, httpcache.HttpCache)
+            extr.session.cookies.set_policy(
+                http.cookiejar.DefaultCookiePolicy(allowed_domains=()))
+
+            url = self.root + "/etag"
+            self.assertEqual(extr.request(url).text, "/etag" * 100)
+            response = extr.request(url)
+            self.assertEqual(response.text, "/etag" * 100)
+            self.assertTrue(response.from_cache)
+
+            response = extr.request(url, stream=True)
+            self.assertFalse(hasattr(response, "from_cache"))
+            response.close()
+        finally:
+            if httpcache._instance:
+                httpcache._instance.close()
+            httpcache._instance = None
+            config.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
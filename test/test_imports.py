@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+import os
+import sys
+import unittest
+
+import json
+import subprocess
+
+ROOTDIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CODE = """
+import sys, time, json
+before = set(sys.modules)
+time_start = time.perf_counter()
+{}
+time_elapsed = time.perf_counter() - time_start
+sys.stdout.write("\\n" + json.dumps({{
+    "time"   : time_elapsed,
+    "modules": sorted(set(sys.modules) - before),
+}}))
+"""
+
+# modules that should only get imported when actually needed
+HEAVY = (
+    "requests",
+    "ssl",
+    "sqlite3",
+    "http.cookiejar",
+    "email.utils",
+    "gallery_dl.job",
+    "gallery_dl.cache",
+    "gallery_dl.archive",
+    "gallery_dl.urlindex",
+    "gallery_dl.extractor.common",
+)
+
+# generous upper bounds to catch regressions,
+# not to measure performance on slow test systems
+MODULES_MAX = 60
+TIME_MAX = 1.0
+
+
+class TestImports(unittest.TestCase):
+
+    def _run(self, code):
+        env = os.environ.copy()
+        env.pop("PYTHONDONTWRITEBYTECODE", None)
+        out = subprocess.run(
+            (sys.executable, "-c", CODE.format(code)),
+            cwd=ROOTDIR, env=env, check=True,
+            stdout=subprocess.PIPE, universal_newlines=True,
+        ).stdout
+        return json.loads(out.rpartition("\n")[2])
+
+    def _assert_light(self, result, allowed=()):
+        modules = result["modules"]
+        for name in HEAVY:
+            if name not in allowed:
+                self.assertNotIn(name, modules)
+        self.assertLess(len(modules), MODULES_MAX, modules)
+        self.assertLess(result["time"], TIME_MAX)
+
+    def test_import(self):
+        result = self._run("import gallery_dl")
+        self._assert_light(result)
+
+    def test_version(self):
+        result = self._run("""
+import gallery_dl
+sys.argv = ["gallery-dl", "--version"]
+try:
+    gallery_dl.main()
+except SystemExit:
+    pass
+""")
+        self._assert_light(result)
+
+    def test_list_modules(self):
+        result = self._run("""
+import gallery_dl
+sys.argv = ["gallery-dl", "--ignore-config", "--list-modules"]
+gallery_dl.main()
+""")
+        self._assert_light(result)
+
+    def test_cache(self):
+        result = self._run("""
+from gallery_dl import cache
+@cache.cache()
+def func():
+    pass
+assert cache.DatabaseCacheDecorator.db is None
+""")
+        self._assert_light(result, ("gallery_dl.cache",))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,12 +10,18 @@
 import os
 import sys
 import unittest
+import tempfile
 from unittest.mock import patch
+import errno
 
 import io
+import json
+import time
+import sqlite3
+import threading
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from gallery_dl import job, config, text  # noqa E402
+from gallery_dl import job, config, text, exception  # noqa E402
 from gallery_dl.extractor.common import Extractor, Message  # noqa E402
 
 
@@ -65,6 +71,263 @@ class TestDownloadJob(TestJob):
         self.assertEqual(func(TestExtractorParent), False)
         self.assertEqual(func(TestExtractorAlt)   , False)
 
+    def test_downloads_parallel(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "downloads-parallel", 3)
+            extr = TestExtractorText.from_url("test:text")
+            tjob = self.jobclass(extr)
+
+            paths = []
+            tjob.out.success = paths.append
+            tjob.run()
+
+            self.assertEqual(tjob.status, 0)
+            self.assertEqual(tjob.workers, 3)
+            self.assertEqual(len(paths), 10)
+            for num, path in enumerate(paths, 1):
+                self.assertEqual(
+                    os.path.basename(path), "test_{}.txt".format(num))
+                with open(path) as fp:
+                    self.assertEqual(fp.read(), "content {}".format(num))
+
+    def test_downloads_parallel_same_path(self):
+        for workers in (0, 3):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config.set((), "base-directory", tmpdir)
+                config.set((), "downloads-parallel", workers)
+                config.set((), "filename", "same.{extension}")
+                extr = TestExtractorText.from_url("test:text")
+                tjob = self.jobclass(extr)
+
+                success = []
+                skipped = []
+                tjob.out.success = success.append
+                tjob.out.skip = skipped.append
+                tjob.run()
+
+                self.assertEqual(tjob.status, 0)
+                self.assertEqual(len(success), 1)
+                self.assertEqual(len(skipped), 9)
+                with open(success[0]) as fp:
+                    self.assertEqual(fp.read(), "content 1")
+
+    def test_downloads_parallel_start(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "downloads-parallel", 3)
+            extr = TestExtractorText.from_url("test:text")
+            tjob = self.jobclass(extr)
+
+            started = []
+            tjob.out.start = started.append
+            tjob.out.success = lambda path: None
+            tjob.run()
+
+        self.assertEqual(
+            [os.path.basename(path) for path in started],
+            ["test_{}.txt".format(num) for num in range(1, 11)])
+
+    def test_downloads_parallel_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "downloads-parallel", 3)
+            extr = TestExtractorText.from_url("test:text")
+            tjob = self.jobclass(extr)
+
+            exc = OSError(errno.ENOSPC, "No space left on device")
+            with patch("gallery_dl.downloader.text.TextDownloader.download",
+                       side_effect=exc):
+                self.assertEqual(tjob.run(), 128)
+            self.assertFalse(tjob._pending)
+
+    def test_downloads_parallel_postprocessor_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "downloads-parallel", 3)
+            config.set((), "postprocessors", [{
+                "name": "exec", "command": ["true"]}])
+            extr = TestExtractorText.from_url("test:text")
+            tjob = self.jobclass(extr)
+
+            with patch("gallery_dl.postprocessor.exec.ExecPP._exec",
+                       side_effect=ValueError("test")):
+                self.assertEqual(tjob.run(), 1)
+            self.assertFalse(tjob._pending)
+
+    def test_downloads_parallel_abort(self):
+        for skip, exc in (("abort:2", None),
+                          ("terminate:2", exception.TerminateExtraction)):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config.set((), "base-directory", tmpdir)
+                config.set((), "downloads-parallel", 3)
+                config.set((), "skip", skip)
+
+                path = os.path.join(tmpdir, "test_category")
+                os.mkdir(path)
+                for num in (5, 6):
+                    with open(os.path.join(
+                            path, "test_{}.txt".format(num)), "w"):
+                        pass
+
+                extr = TestExtractorText.from_url("test:text")
+                tjob = self.jobclass(extr)
+                paths = []
+                tjob.out.success = paths.append
+
+                if exc is None:
+                    self.assertEqual(tjob.run(), 0)
+                else:
+                    with self.assertRaises(exc):
+                        tjob.run()
+
+                # downloads submitted before aborting still get finished
+                self.assertEqual(
+                    [os.path.basename(path) for path in paths],
+                    ["test_{}.txt".format(num) for num in range(1, 5)])
+                self.assertEqual(len(os.listdir(path)), 6)
+
+    def test_deferred(self):
+        from concurrent.futures import Future
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "archive", os.path.join(tmpdir, "archive.db"))
+            config.set((), "archive-format", "{num}")
+            extr = TestExtractorText.from_url("test:text")
+            tjob = self.jobclass(extr)
+
+            timers = []
+            paths = []
+            tjob.out.success = paths.append
+
+            def defer(pathfmt):
+                # later files finish first; file 4 fails
+                num = pathfmt.kwdict["num"]
+                pathfmt.pending = future = Future()
+                timer = threading.Timer(
+                    0.005 * (10 - num), future.set_result, (num != 4,))
+                timers.append(timer)
+                timer.start()
+
+            initialize = tjob.initialize
+
+            def init(kwdict=None):
+                initialize(kwdict)
+                tjob.hooks = {"file": [defer]}
+            tjob.initialize = init
+
+            self.assertEqual(tjob.run(), 0)
+            for timer in timers:
+                timer.join()
+
+            self.assertFalse(tjob._deferred)
+            self.assertEqual(
+                [os.path.basename(path) for path in paths],
+                ["test_{}.txt".format(num)
+                 for num in range(1, 11) if num != 4])
+
+            with sqlite3.connect(os.path.join(tmpdir, "archive.db")) as db:
+                entries = db.execute("SELECT entry FROM archive").fetchall()
+            self.assertEqual(
+                sorted(entry for entry, in entries),
+                sorted("test_category{}".format(num)
+                       for num in range(1, 11) if num != 4))
+
+    def test_children_parallel(self):
+        for ordered in (True, False):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                config.set((), "base-directory", tmpdir)
+                config.set((), "children-parallel", 3)
+                config.set((), "children-ordered", ordered)
+                extr = TestExtractorQueue.from_url("test:queue")
+                tjob = self.jobclass(extr)
+                tjob.run()
+
+                self.assertEqual(tjob.status, 0)
+                self.assertEqual(tjob.children, 3)
+                self.assertFalse(tjob._children_pending)
+                self.assertEqual(len(tjob.visited), 6)
+
+                path = os.path.join(tmpdir, "test_category")
+                self.assertEqual(
+                    sorted(os.listdir(path)),
+                    ["test_{}.txt".format(num) for num in range(1, 7)])
+                with open(os.path.join(path, "test_4.txt")) as fp:
+                    self.assertEqual(fp.read(), "content 4")
+
+    def test_children_parallel_nested(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "children-parallel", 3)
+            extr = TestExtractorQueueNested.from_url("test:nested")
+            tjob = self.jobclass(extr)
+            out = tjob.out
+            start = out.start
+
+            children = []
+            run_child = tjob._run_child
+
+            def _run_child(job):
+                children.append((job.extractor.subcategory, job.children,
+                                 job.out.__class__.__name__))
+                return run_child(job)
+
+            with patch.object(self.jobclass, "_run_child",
+                              staticmethod(_run_child)):
+                tjob.run()
+
+            self.assertEqual(tjob.status, 0)
+            self.assertEqual(len(os.listdir(
+                os.path.join(tmpdir, "test_category"))), 6)
+
+            # only the top-level job uses a worker pool
+            self.assertEqual(len(children), 8)
+            for subcategory, num, cls in children:
+                self.assertEqual(num, 0)
+                if subcategory == "test_subcategory_queue":
+                    self.assertEqual(cls, "ChildOutput")
+
+            # output of the parent job stays unchanged
+            self.assertIs(tjob.out, out)
+            self.assertEqual(tjob.out.start, start)
+
+    def test_children_parallel_parent_skip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "children-parallel", 3)
+            config.set((), "parent-skip", True)
+            extr = TestExtractorQueue.from_url("test:queue")
+            tjob = self.jobclass(extr)
+
+            tjob.run()
+
+            self.assertEqual(tjob.status, 0)
+            self.assertIsNone(tjob._children_executor)
+            self.assertEqual(len(os.listdir(
+                os.path.join(tmpdir, "test_category"))), 6)
+
+    def test_archive_probe(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config.set((), "base-directory", tmpdir)
+            config.set((), "archive", os.path.join(tmpdir, "archive.db"))
+
+            def run(probe=False):
+                extr = TestExtractorProbe.from_url("test:probe")
+                self.jobclass(extr).run()
+                self.assertEqual(extr.archive_probe, probe)
+                self.assertEqual(extr.probes_many, extr.probes)
+                return extr.probes
+
+            self.assertEqual(run(), [False, False, False])
+            self.assertEqual(run(), [False, False, False])
+
+            config.set((), "archive-probe", True)
+            self.assertEqual(run(True), [True, True, True])
+
+            config.set((), "skip", False)
+            self.assertEqual(run(), [False, False, False])
+
 
 class TestKeywordJob(TestJob):
     jobclass = job.KeywordJob
@@ -353,6 +616,57 @@ class TestDataJob(TestJob):
         self.assertEqual(tjob.data[-1][0], Message.Url)
         self.assertEqual(tjob.data[-1][2]["num"], "3")
 
+    def test_stream(self):
+        extr = TestExtractor.from_url("test:")
+        tjob = self.jobclass(extr, file=io.StringIO())
+        tjob.run()
+        expected = tjob.file.getvalue()
+
+        for value in (True, "array"):
+            config.set(("output",), "json-stream", value)
+            extr = TestExtractor.from_url("test:")
+            tjob = self.jobclass(extr, file=io.StringIO())
+            tjob.run()
+            self.assertIsInstance(tjob.data, job.DataStream)
+            self.assertEqual(tjob.file.getvalue(), expected)
+
+    def test_stream_lines(self):
+        config.set(("output",), "json-stream", "lines")
+        config.set(("output",), "num-to-str", True)
+        extr = TestExtractor.from_url("test:")
+        tjob = self.jobclass(extr, file=io.StringIO())
+        tjob.run()
+
+        lines = tjob.file.getvalue().split("\n")
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[-1], "")
+        self.assertEqual(json.loads(lines[0])[0], Message.Directory)
+        for num, line in enumerate(lines[1:4], 1):
+            self.assertNotIn(" ", line)
+            msg = json.loads(line)
+            self.assertEqual(msg[1], "https://example.org/{}.jpg".format(num))
+            self.assertEqual(msg[2]["num"], str(num))
+
+    def test_stream_resolve(self):
+        config.set(("output",), "json-stream", "lines")
+        extr = TestExtractorQueue.from_url("test:queue")
+        tjob = self.jobclass(extr, file=io.StringIO(), resolve=1)
+        tjob.run()
+
+        urls = [msg[1] for msg in map(
+            json.loads, tjob.file.getvalue().splitlines())
+            if msg[0] == Message.Url]
+        self.assertEqual(len(urls), 7)
+
+    def test_stream_closed(self):
+        config.set(("output",), "json-stream", "lines")
+        extr = TestExtractor.from_url("test:")
+        tjob = self.jobclass(extr, file=io.StringIO())
+        tjob.file.close()
+        self.assertEqual(tjob.run(), 0)
+        self.assertIsNone(tjob.data.fp)
+        self.assertEqual(tjob.data.count, 1)
+
 
 class TestExtractor(Extractor):
     category = "test_category"
@@ -412,6 +726,78 @@ class TestExtractorException(Extractor):
         return 1/0
 
 
+class TestExtractorText(Extractor):
+    category = "test_category"
+    subcategory = "test_subcategory_text"
+    filename_fmt = "test_{num}.{extension}"
+    pattern = r"test:text$"
+
+    def items(self):
+        data = {"extension": "txt"}
+        yield Message.Directory, data
+
+        for data["num"] in range(1, 11):
+            yield Message.Url, "text:content {}".format(data["num"]), data
+
+
+class TestExtractorQueue(Extractor):
+    category = "test_category"
+    subcategory = "test_subcategory_queue"
+    pattern = r"test:queue(?:#\d+)?$"
+
+    def items(self):
+        for num in (1, 2, 3, 4, 5, 6, 3):
+            yield Message.Queue, "test:queue/{}".format(num), {
+                "_extractor": TestExtractorQueueChild}
+
+
+class TestExtractorQueueNested(Extractor):
+    category = "test_category"
+    subcategory = "test_subcategory_nested"
+    pattern = r"test:nested$"
+
+    def items(self):
+        for num in range(2):
+            yield Message.Queue, "test:queue#{}".format(num), {
+                "_extractor": TestExtractorQueue}
+
+
+class TestExtractorQueueChild(Extractor):
+    category = "test_category"
+    subcategory = "test_subcategory_queue_child"
+    directory_fmt = ("{category}",)
+    filename_fmt = "test_{num}.{extension}"
+    pattern = r"test:queue/(\d+)$"
+
+    def items(self):
+        num = int(self.groups[0])
+        time.sleep((6 - num) * 0.01)
+        yield Message.Directory, {}
+        yield Message.Url, "text:content {}".format(num), {
+            "num": num, "extension": "txt"}
+
+
+class TestExtractorProbe(Extractor):
+    category = "test_category"
+    subcategory = "test_subcategory_probe"
+    filename_fmt = "probe_{num}.{extension}"
+    archive_fmt = "{num}"
+    pattern = r"test:probe$"
+
+    def items(self):
+        self.probes = []
+
+        # probe before the first Directory message
+        self.probes_many = self.archived_many([
+            {"num": num, "extension": "txt"} for num in range(1, 4)])
+
+        for num in range(1, 4):
+            data = {"num": num, "extension": "txt"}
+            self.probes.append(self.archived(data))
+            yield Message.Directory, data
+            yield Message.Url, "text:content", data
+
+
 class TestExtractorAlt(Extractor):
     category = "test_category_alt"
     subcategory = "test_subcategory"
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+import os
+import sys
+import unittest
+from unittest.mock import Mock
+
+import time
+import tempfile
+import threading
+import collections
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import gallery_dl  # noqa E402
+from gallery_dl import config, output  # noqa E402
+
+
+class FakeJob():
+    lock = threading.Lock()
+
+    def __init__(self, extr):
+        self.extr = extr
+        self.out = output.NullOutput()
+
+    def run(self):
+        cls = self.__class__
+        category = self.extr.category
+
+        with cls.lock:
+            cls.started.append(self.extr.url)
+            cls.outputs.add(self.out.__class__.__name__)
+            cls.ahead = max(
+                cls.ahead, cls.input_manager._index - len(cls.started))
+            cls.active[category] += 1
+            for key, value in cls.active.items():
+                cls.maximum[key] = max(cls.maximum[key], value)
+            cls.maximum["total"] = max(
+                cls.maximum["total"], sum(cls.active.values()))
+
+        time.sleep(0.02)
+
+        with cls.lock:
+            cls.active[category] -= 1
+        return 4 if "error" in self.extr.url else 0
+
+    @classmethod
+    def reset(cls, input_manager):
+        cls.input_manager = input_manager
+        cls.started = []
+        cls.outputs = set()
+        cls.ahead = 0
+        cls.active = collections.Counter()
+        cls.maximum = collections.Counter()
+
+
+class TestJobScheduler(unittest.TestCase):
+
+    def tearDown(self):
+        config.clear()
+
+    def _run(self, urls, jobs=3):
+        input_manager = gallery_dl.InputManager()
+        input_manager.add_list(urls)
+        FakeJob.reset(input_manager)
+        scheduler = gallery_dl.JobScheduler(FakeJob, input_manager, jobs)
+        return scheduler.run()
+
+    def test_jobs(self):
+        urls = ["https://example.org/{}.jpg".format(i) for i in range(12)]
+        self.assertEqual(self._run(urls, 3), 0)
+
+        self.assertEqual(sorted(FakeJob.started), sorted(urls))
+        self.assertEqual(FakeJob.outputs, {"ChildOutput"})
+        # 'category-jobs' defaults to 'jobs'
+        self.assertEqual(FakeJob.maximum["directlink"], 3)
+        self.assertEqual(FakeJob.maximum["total"], 3)
+
+    def test_category_jobs(self):
+        config.set(("extractor", "directlink"), "category-jobs", 1)
+        urls = []
+        for i in range(6):
+            urls.append("https://example.org/{}.jpg".format(i))
+            urls.append("generic:https://example.org/{}".format(i))
+        self.assertEqual(self._run(urls, 3), 0)
+
+        self.assertEqual(len(FakeJob.started), 12)
+        self.assertEqual(FakeJob.maximum["directlink"], 1)
+        self.assertEqual(FakeJob.maximum["generic"], 2)
+        self.assertEqual(FakeJob.maximum["total"], 3)
+
+    def test_read_ahead(self):
+        config.set(("extractor", "directlink"), "category-jobs", 1)
+        urls = ["https://example.org/{}.jpg".format(i) for i in range(20)]
+        self._run(urls, 4)
+
+        self.assertEqual(FakeJob.started, urls)
+        self.assertLessEqual(FakeJob.ahead, 4)
+
+    def test_status(self):
+        urls = [
+            "https://example.org/1.jpg",
+            "https://example.org/error.jpg",
+            "foo:bar",
+        ]
+        self.assertEqual(self._run(urls), 4 | 64)
+        self.assertEqual(len(FakeJob.started), 2)
+
+    def test_input_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "input.txt")
+            with open(path, "w") as fp:
+                fp.write("https://example.org/1.jpg\n"
+                         "https://example.org/error.jpg\n"
+                         "https://example.org/3.jpg\n")
+
+            input_manager = gallery_dl.InputManager()
+            input_manager.err = Mock()
+            input_manager.add_file(path, "c")
+            FakeJob.reset(input_manager)
+            scheduler = gallery_dl.JobScheduler(FakeJob, input_manager, 2)
+            self.assertEqual(scheduler.run(), 4)
+
+            with open(path) as fp:
+                self.assertEqual(fp.read(),
+                                 "# https://example.org/1.jpg\n"
+                                 "# https://example.org/error.jpg\n"
+                                 "# https://example.org/3.jpg\n")
+            input_manager.err.info.assert_called_once_with(
+                "https://example.org/error.jpg")
+
+
+class TestInputManager(unittest.TestCase):
+
+    def test_success_error(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "input.txt")
+            with open(path, "w") as fp:
+                fp.write("https://example.org/1\n"
+                         "https://example.org/2\n"
+                         "https://example.org/3\n")
+
+            input_manager = gallery_dl.InputManager()
+            input_manager.err = Mock()
+            input_manager.add_file(path, "d")
+            items = input_manager.urls
+
+            # explicit items, handled out of order
+            input_manager.success(items[2])
+            input_manager.error("https://example.org/1", items[0])
+            input_manager.err.info.assert_called_once_with(
+                "https://example.org/1")
+            with open(path) as fp:
+                self.assertEqual(fp.read(), "https://example.org/2\n")
+
+            # implicit current item
+            for _ in input_manager:
+                if input_manager._index == 1:
+                    input_manager.success()
+                input_manager.next()
+            with open(path) as fp:
+                self.assertEqual(fp.read(), "")
+
+    def test_error_url(self):
+        input_manager = gallery_dl.InputManager()
+        input_manager.err = Mock()
+        input_manager.add_list(["https://example.org/1"])
+
+        for url in input_manager:
+            input_manager.error()
+            input_manager.error("https://example.org/2", None)
+            input_manager.next()
+
+        self.assertEqual(
+            [c[0][0] for c in input_manager.err.info.call_args_list],
+            ["https://example.org/1", "https://example.org/2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
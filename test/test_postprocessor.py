@@ -12,10 +12,12 @@ import sys
 import unittest
 from unittest.mock import Mock, mock_open, patch
 
+import json
 import shutil
 import logging
 import zipfile
 import tempfile
+import threading
 import collections
 from datetime import datetime
 
@@ -24,6 +26,11 @@ from gallery_dl import extractor, output, path  # noqa E402
 from gallery_dl import postprocessor, config  # noqa E402
 from gallery_dl.postprocessor.common import PostProcessor  # noqa E402
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class MockPostprocessorModule(Mock):
     __postprocessor__ = "mock"
@@ -39,7 +46,7 @@ class FakeJob():
         self.get_logger = logging.getLogger
         self.hooks = collections.defaultdict(list)
 
-    def register_hooks(self, hooks, options):
+    def register_hooks(self, hooks, options=None):
         for hook, callback in hooks.items():
             self.hooks[hook].append(callback)
 
@@ -315,6 +322,50 @@ class HashTest(BasePostprocessorTest):
             "3e1095b50736c4fd1e2deea152e3c8ecd5993462a747208e4d842659935a1c62",
             kwdict["b"], "sha512")
 
+    def test_digests(self):
+        self._create({"hashes": "sha256:a,md5"})
+        self._trigger(("prepare",))
+
+        kwdict = self.pathfmt.kwdict
+        self.assertEqual(kwdict["_http_hash"], {"sha256", "md5"})
+
+        # reuse digests computed during download
+        kwdict["_http_digests"] = {"sha256": "abc", "md5": "123"}
+        self._trigger(("file",))
+        self.assertEqual(kwdict["a"], "abc")
+        self.assertEqual(kwdict["md5"], "123")
+
+        # reading the file is necessary
+        kwdict["_http_digests"] = {"sha256": "abc"}
+        with self.pathfmt.open() as fp:
+            fp.write(b"Foo Bar\n")
+        self._trigger(("file",))
+        self.assertEqual(
+            "35c9c9c7c90ad764bae9e2623f522c24", kwdict["md5"], "md5")
+
+    def test_digests_modified(self):
+        class RewritePP(PostProcessor):
+            def __init__(self, job):
+                PostProcessor.__init__(self, job)
+                job.register_hooks({"file": self.run}, None)
+
+            def run(self, pathfmt):
+                with pathfmt.open() as fp:
+                    fp.write(b"Foo Bar\n")
+
+        RewritePP(self.job)
+        self._create({"hashes": "md5"})
+        self._trigger(("prepare",))
+
+        kwdict = self.pathfmt.kwdict
+        self.assertNotIn("_http_hash", kwdict)
+
+        # digests of the downloaded file no longer match its content
+        kwdict["_http_digests"] = {"md5": "123"}
+        self._trigger(("file",))
+        self.assertEqual(
+            "35c9c9c7c90ad764bae9e2623f522c24", kwdict["md5"], "md5")
+
 
 class MetadataTest(BasePostprocessorTest):
 
@@ -593,6 +644,115 @@ class MetadataTest(BasePostprocessorTest):
 {"category": "test", "extension": "ext", "filename": "file"}
 """)
 
+    def test_metadata_jsonl(self):
+        pp = self._create({"mode": "jsonl", "sort": True})
+        path = self.pathfmt.realdirectory + "data.jsonl"
+        if os.path.exists(path):
+            os.unlink(path)
+
+        kwdict = self.pathfmt.kwdict
+        for num in range(3):
+            kwdict["num"] = num
+            self._trigger()
+        self.assertEqual(len(pp.writers), 1)
+        self.assertEqual(pp.paths, {
+            self.pathfmt.realdirectory: (self.pathfmt.realdirectory, path)})
+        self.assertEqual(os.path.getsize(path), 0)
+
+        self._trigger(("finalize",))
+        self.assertEqual(len(pp.writers), 0)
+        with open(path, encoding="utf-8") as fp:
+            lines = fp.readlines()
+        self.assertEqual(lines, [
+            '{{"category": "test", "extension": "ext", '
+            '"filename": "file", "num": {}}}\n'.format(num)
+            for num in range(3)
+        ])
+
+    def test_metadata_jsonl_flush(self):
+        pp = self._create({"mode": "jsonl", "buffer": 1})
+        path = self.pathfmt.realdirectory + "data.jsonl"
+        if os.path.exists(path):
+            os.unlink(path)
+
+        self._trigger()
+        self.assertEqual(pp.writers[path].size, 0)
+        self.assertGreater(os.path.getsize(path), 0)
+        self._trigger(("finalize",))
+
+    def test_metadata_jsonl_post_after(self):
+        pp = self._create({"mode": "jsonl"})
+        path = self.pathfmt.realdirectory + "data.jsonl"
+        if os.path.exists(path):
+            os.unlink(path)
+
+        self.assertEqual(self.job.hooks["post-after"], [pp.flush])
+        self.assertEqual(self.job.hooks["finalize"], [pp.finalize])
+
+        pp.run(self.pathfmt)
+        self.assertEqual(os.path.getsize(path), 0)
+
+        self._trigger(("post-after",))
+        self.assertEqual(len(pp.writers), 1)
+        self.assertGreater(os.path.getsize(path), 0)
+        self._trigger(("finalize",))
+
+    def test_metadata_jsonl_writers(self):
+        pp1 = self._create({"mode": "jsonl"})
+        pp2 = self._create({"mode": "jsonl", "filename": "other.jsonl"})
+        self.assertIsNot(pp1.writers, pp2.writers)
+
+        self._trigger()
+        self.assertEqual(len(pp1.writers), 1)
+        self.assertEqual(len(pp2.writers), 1)
+        self._trigger(("finalize",))
+
+    def test_metadata_jsonl_partial_write(self):
+        pp = self._create({"mode": "jsonl"})
+        self._trigger()
+        writer = next(iter(pp.writers.values()))
+        writer.fp.close()
+
+        written = []
+
+        def write(data):
+            # write at most 10 bytes per call
+            written.append(bytes(data[:10]))
+            return len(written[-1])
+
+        writer.fp = Mock(write=write)
+        writer.flush()
+        data = b"".join(written)
+        self.assertGreater(len(written), 1)
+        self.assertEqual(data[-1:], b"\n")
+        self.assertEqual(json.loads(data.decode()), self.pathfmt.kwdict)
+        self.assertEqual(writer.size, 0)
+        pp.writers.clear()
+
+    def test_metadata_jsonl_unbuffered(self):
+        pp = self._create({"mode": "jsonl", "buffer": False})
+        self.assertIsNone(pp.writers)
+
+        with patch("builtins.open", mock_open()) as m:
+            self._trigger()
+
+        path = self.pathfmt.realdirectory + "data.jsonl"
+        m.assert_called_once_with(path, "a", encoding="utf-8")
+
+    def test_metadata_jsonl_orjson(self):
+        pp = self._create({"mode": "jsonl", "separators": [",", ":"]})
+        if orjson is None:
+            return self.skipTest("orjson not available")
+
+        encode = pp._make_encoder({"separators": [",", ":"]}).encode
+        self.assertIsNot(pp._json_encode, encode)
+        for obj in (
+            {"a": "ワールド", "b": [1, 2.5, None, True], "c": {"d": {}}},
+            {"date": datetime(2010, 1, 1, 12, 30), 1: "one"},
+            {"large": 2 ** 80},
+        ):
+            self.assertEqual(pp._json_encode(obj), encode(obj))
+
     def test_metadata_modify(self):
         kwdict = {"foo": 0, "bar": {"bax": 1, "bay": 2, "baz": 3, "ba2": {}}}
         self._create({
@@ -843,6 +1003,149 @@ class RenameTest(BasePostprocessorTest):
         self.assertEqual(sorted(os.listdir(path)), ["12345.ext", "file.ext"])
 
 
+@unittest.skipIf(os.name == "nt", "no executable scripts")
+class UgoiraTest(BasePostprocessorTest):
+
+    FRAMES = [
+        {"file": "000000.jpg", "delay": 100},
+        {"file": "000001.jpg", "delay": 200},
+        {"file": "000002.jpg", "delay": 100},
+    ]
+
+    def _create(self, options=None, status=0):
+        # fake 'ffmpeg' writing its input to the output path
+        ffmpeg = os.path.join(self.dir.name, "ffmpeg")
+        with open(ffmpeg, "w") as fp:
+            fp.write("#!{}\n"
+                     "import sys\n"
+                     "data = sys.stdin.buffer.read()\n"
+                     "with open(sys.argv[-1], 'wb') as fp:\n"
+                     "    fp.write(data)\n"
+                     "sys.exit({})\n".format(sys.executable, status))
+        os.chmod(ffmpeg, 0o755)
+
+        opts = {"pipe": True, "mode": "concat", "ffmpeg-location": ffmpeg}
+        if options:
+            opts.update(options)
+        pp = BasePostprocessorTest._create(self, opts, {
+            "_ugoira_frame_data": [frame.copy() for frame in self.FRAMES],
+        })
+
+        os.makedirs(self.pathfmt.realdirectory, exist_ok=True)
+        with zipfile.ZipFile(self.pathfmt.temppath, "w") as zfile:
+            for frame in self.FRAMES:
+                zfile.writestr(frame["file"], frame["file"][5])
+        return pp
+
+    def tearDown(self):
+        BasePostprocessorTest.tearDown(self)
+        shutil.rmtree(os.path.join(self.dir.name, "test"))
+
+    def test_ugoira_pipe(self):
+        pp = self._create({"keep-files": True})
+        self.assertIsNone(pp._executor)
+        with patch.object(pp.log, "debug") as log:
+            self._trigger()
+
+        path = os.path.join(self.dir.name, "test", "file.webm")
+        with open(path) as fp:
+            self.assertEqual(fp.read(), "0112")
+        self.assertEqual(log.call_args_list[0][0][0][1:7], [
+            "-f", "image2pipe", "-framerate", "1000/100", "-i", "-"])
+        self.assertFalse(self.pathfmt.delete)
+
+    def test_ugoira_pipe_sequence(self):
+        pp = self._create()
+        frames = [{"file": "a", "delay": 33}, {"file": "b", "delay": 67},
+                  {"file": "c", "delay": 33}, {"file": "d", "delay": 33}]
+        args, sequence = pp._process_pipe(frames)
+        self.assertEqual(args[4], "1000/10")
+        self.assertEqual("".join(sequence), "aaabbbbbbbcccdddd")
+
+        frames = [{"file": "a", "delay": 50}, {"file": "b", "delay": 50}]
+        args, sequence = pp._process_pipe(frames)
+        self.assertEqual(args[4], "1000/50")
+        self.assertEqual(sequence, ["a", "b"])
+
+    def test_ugoira_pipe_workers(self):
+        pp = self._create({"workers": 2})
+        self._trigger()
+        self.assertTrue(self.pathfmt.delete)
+        self.assertEqual(len(pp._pending), 1)
+
+        self._trigger(("finalize",))
+        self.assertIsNone(pp._executor)
+        path = os.path.join(self.dir.name, "test", "file.webm")
+        with open(path) as fp:
+            self.assertEqual(fp.read(), "0112")
+
+    def test_ugoira_pipe_workers_pending(self):
+        for status in (0, 1):
+            if status:
+                self.tearDown()
+            event = threading.Event()
+            pp = self._create({"workers": 1})
+            path = os.path.join(self.dir.name, "test", "file.webm")
+
+            with patch("gallery_dl.util.Popen",
+                       self._fake_process(event, status)), \
+                    self.assertLogs(pp.log, "DEBUG") as cm:
+                self._trigger()
+                future = self.pathfmt.pending
+                self.assertFalse(future.done())
+                self.assertFalse(os.path.exists(path))
+
+                event.set()
+                self.assertIs(future.result(), not status)
+                self._trigger(("finalize",))
+
+            if status:
+                self.assertFalse(os.path.exists(path))
+                self.assertIn(
+                    "ERROR:postprocessor.ugoira:ValueError: "
+                    "Non-zero exit status when running", "\n".join(cm.output))
+            else:
+                with open(path) as fp:
+                    self.assertEqual(fp.read(), "0112")
+
+    @staticmethod
+    def _fake_process(event, status):
+        class Stdin():
+            def __init__(self):
+                self.data = []
+                self.write = self.data.append
+
+            def close(self):
+                pass
+
+        class Process():
+            def __init__(self, args, stdin=None, stdout=None, stderr=None):
+                self.path = args[-1]
+                self.stdin = Stdin()
+
+            def wait(self):
+                event.wait()
+                with open(self.path, "wb") as fp:
+                    fp.write(b"".join(self.stdin.data))
+                return status
+
+            def kill(self):
+                pass
+
+        return Process
+
+    def test_ugoira_pipe_workers_error(self):
+        pp = self._create({"workers": 1}, 1)
+        with self.assertLogs(pp.log, "ERROR"):
+            self._trigger(("prepare", "file", "finalize"))
+
+        path = os.path.join(self.dir.name, "test")
+        self.assertEqual(sorted(os.listdir(path)), ["file.ext", "file.zip"])
+        with zipfile.ZipFile(os.path.join(path, "file.zip")) as zfile:
+            self.assertEqual(zfile.namelist(), [
+                frame["file"] for frame in self.FRAMES])
+
+
 class ZipTest(BasePostprocessorTest):
 
     def test_zip_default(self):
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import time
+import email.utils
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gallery_dl import ratelimit  # noqa E402
+
+
+class Clock():
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self._patch = patch.object(ratelimit.time, "monotonic", self.clock)
+        self._patch.start()
+
+    def tearDown(self):
+        self._patch.stop()
+
+    def test_rate(self):
+        bucket = ratelimit.TokenBucket(2.0)
+
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.5)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+        self.clock.now += 1.0
+        self.assertEqual(bucket.reserve(), 0.5)
+
+        self.clock.now += 10.0
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.5)
+
+    def test_burst(self):
+        bucket = ratelimit.TokenBucket(1.0, 3)
+
+        for _ in range(3):
+            self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+        self.clock.now += 100.0
+        for _ in range(3):
+            self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 1.0)
+
+    def test_penalize(self):
+        bucket = ratelimit.TokenBucket(4.0, 2)
+
+        bucket.penalize(10.0)
+        self.assertEqual(bucket.rate, 2.0)
+        self.assertEqual(bucket.reserve(), 10.5)
+
+        # rate recovers with each request
+        self.assertEqual(bucket.rate, 2.25)
+        for _ in range(10):
+            bucket.reserve()
+        self.assertEqual(bucket.rate, 4.0)
+
+    def test_penalize_min(self):
+        bucket = ratelimit.TokenBucket(8.0)
+
+        for _ in range(10):
+            bucket.penalize()
+        self.assertEqual(bucket.rate, 1.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def setUp(self):
+        ratelimit.clear()
+
+    def tearDown(self):
+        ratelimit.clear()
+
+    def test_scope_host(self):
+        limiter = ratelimit.RateLimiter(1.0)
+        other = ratelimit.RateLimiter(1.0, scope="host")
+
+        bucket = limiter.bucket("https://example.org/path?query")
+        self.assertIs(other.bucket("http://EXAMPLE.org/"), bucket)
+        self.assertIsNot(limiter.bucket("https://example.com/"), bucket)
+
+        self.assertEqual(limiter.reserve("https://example.org/1"), 0.0)
+        self.assertGreater(other.reserve("https://example.org/2"), 0.5)
+
+    def test_scope_category(self):
+        limiter = ratelimit.RateLimiter(1.0, 1, "category", "foo")
+
+        bucket = limiter.bucket("https://example.org/")
+        self.assertIs(limiter.bucket("https://cdn.example.net/"), bucket)
+        self.assertIsNot(
+            ratelimit.RateLimiter(1.0).bucket("https://example.org/"),
+            bucket)
+
+    def test_penalize(self):
+        limiter = ratelimit.RateLimiter(1.0)
+        url = "https://example.org/"
+
+        self.assertEqual(limiter.penalize(url), 0.0)
+        self.assertEqual(limiter.penalize(url, "30"), 30.0)
+        self.assertGreater(limiter.reserve(url), 29.0)
+
+    def test_build(self):
+        self.assertIsNone(ratelimit.build(None))
+        self.assertIsNone(ratelimit.build(0))
+        self.assertIsNone(ratelimit.build(-1.0))
+        self.assertIsNone(ratelimit.build("foo"))
+
+        limiter = ratelimit.build("2.5", 0, "category", "bar")
+        self.assertEqual(limiter.rate, 2.5)
+        self.assertEqual(limiter.burst, 1)
+        self.assertEqual(limiter.category, "bar")
+
+        limiter = ratelimit.build(2, 5, "host", "bar")
+        self.assertEqual(limiter.burst, 5)
+        self.assertIsNone(limiter.category)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(ratelimit.parse_retry_after("120"), 120.0)
+        self.assertEqual(ratelimit.parse_retry_after("1.5"), 1.5)
+        self.assertEqual(ratelimit.parse_retry_after("-5"), 0.0)
+        self.assertEqual(ratelimit.parse_retry_after("foo"), 0.0)
+
+        date = email.utils.formatdate(time.time() + 60.0, usegmt=True)
+        self.assertAlmostEqual(
+            ratelimit.parse_retry_after(date), 60.0, delta=2.0)
+
+        date = email.utils.formatdate(time.time() - 60.0, usegmt=True)
+        self.assertEqual(ratelimit.parse_retry_after(date), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+import os
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+import time
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gallery_dl import retry, extractor, exception  # noqa E402
+
+URL = "https://example.org/file.jpg"
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        retry.clear()
+
+    def tearDown(self):
+        retry.clear()
+
+    def test_linear(self):
+        policy = retry.RetryPolicy()
+        self.assertEqual(policy.backoff, "linear")
+        self.assertEqual(
+            [policy.delay(URL, tries) for tries in range(1, 6)],
+            [1.0, 2.0, 3.0, 4.0, 5.0])
+
+        policy = retry.RetryPolicy("invalid")
+        self.assertEqual(policy.backoff, "linear")
+
+    def test_exponential(self):
+        policy = retry.RetryPolicy("exponential", 10.0)
+        self.assertEqual(
+            [policy.delay(URL, tries) for tries in range(1, 7)],
+            [1.0, 2.0, 4.0, 8.0, 10.0, 10.0])
+
+    def test_jitter(self):
+        policy = retry.RetryPolicy("jitter", 30.0)
+
+        seconds = 0.0
+        for tries in range(1, 50):
+            previous = seconds
+            seconds = policy.delay(URL, tries, previous)
+            self.assertGreaterEqual(seconds, 1.0)
+            self.assertLessEqual(seconds, max(previous * 3.0, 3.0))
+            self.assertLessEqual(seconds, 30.0)
+
+    def test_headers(self):
+        policy = retry.RetryPolicy(maximum=100.0)
+
+        self.assertEqual(policy.delay(URL, 1, 0.0, {}), 1.0)
+        self.assertEqual(
+            policy.delay(URL, 1, 0.0, {"Retry-After": "20"}), 20.0)
+        self.assertEqual(
+            policy.delay(URL, 5, 0.0, {"Retry-After": "2"}), 5.0)
+        self.assertEqual(
+            policy.delay(URL, 1, 0.0, {"Retry-After": "1000"}), 100.0)
+
+    def test_delay_from_headers(self):
+        delay = retry.delay_from_headers
+
+        self.assertEqual(delay({}), 0.0)
+        self.assertEqual(delay({"Retry-After": "12"}), 12.0)
+        self.assertEqual(delay({"X-RateLimit-Reset": "30"}), 30.0)
+        self.assertEqual(delay({"X-RateLimit-Reset": "30",
+                                "X-RateLimit-Remaining": "5"}), 0.0)
+        self.assertEqual(delay({"X-RateLimit-Reset": "foo"}), 0.0)
+        self.assertAlmostEqual(
+            delay({"X-RateLimit-Reset": str(int(time.time()) + 60),
+                   "X-RateLimit-Remaining": "0"}), 60.0, delta=2.0)
+        self.assertEqual(
+            delay({"X-RateLimit-Reset": str(int(time.time()) - 60)}), 0.0)
+
+    def test_circuit(self):
+        policy = retry.RetryPolicy(circuit=3, circuit_timeout=10.0)
+        other = "https://example.net/"
+
+        with patch.object(retry.time, "monotonic", lambda: 1000.0):
+            for _ in range(2):
+                policy.failure(URL)
+            self.assertTrue(policy.check(URL))
+
+            policy.success(URL)
+            for _ in range(2):
+                policy.failure(URL)
+            self.assertTrue(policy.check(URL))
+
+            policy.failure(URL)
+            self.assertFalse(policy.check(URL))
+            self.assertFalse(policy.check("http://EXAMPLE.ORG/other"))
+            self.assertTrue(policy.check(other))
+
+        with patch.object(retry.time, "monotonic", lambda: 1010.0):
+            # half-open: a single failure opens the circuit again
+            self.assertTrue(policy.check(URL))
+            policy.failure(URL)
+            self.assertFalse(policy.check(URL))
+
+        with patch.object(retry.time, "monotonic", lambda: 1020.0):
+            self.assertTrue(policy.check(URL))
+            policy.success(URL)
+            policy.failure(URL)
+            self.assertTrue(policy.check(URL))
+
+    def test_circuit_disabled(self):
+        policy = retry.RetryPolicy()
+        for _ in range(100):
+            policy.failure(URL)
+        self.assertTrue(policy.check(URL))
+
+    def test_stats(self):
+        policy = retry.RetryPolicy(circuit=2)
+
+        self.assertEqual(retry.stats(), {})
+
+        policy.failure(URL)
+        policy.delay(URL, 1)
+        policy.failure(URL)
+        policy.delay(URL, 2)
+        policy.check(URL)
+        policy.check(URL)
+        policy.failure("https://example.net/")
+
+        self.assertEqual(retry.stats(), {
+            "example.org": {"retries": 2, "delay": 3.0, "failures": 2,
+                            "circuit": 1, "rejected": 2},
+            "example.net": {"retries": 0, "delay": 0.0, "failures": 1,
+                            "circuit": 0, "rejected": 0},
+        })
+
+        stats = retry.stats()
+        stats["example.org"]["retries"] = 100
+        self.assertEqual(retry.stats()["example.org"]["retries"], 2)
+
+    def test_log_stats(self):
+        policy = retry.RetryPolicy()
+        policy.failure(URL)
+        policy.delay(URL, 1)
+
+        log = logging.getLogger("test")
+        with self.assertLogs(log, "DEBUG") as cm:
+            retry.log_stats(log)
+        self.assertEqual(cm.output, [
+            "DEBUG:test:Retry statistics for 'example.org': 1 failures, "
+            "1 retries (1.0s delay), 0 circuit openings, 0 rejected requests",
+        ])
+
+
+class TestExtractorRequest(unittest.TestCase):
+
+    def setUp(self):
+        retry.clear()
+
+    def tearDown(self):
+        retry.clear()
+
+    def test_backoff(self):
+        extr = extractor.find(URL)
+        extr.initialize()
+        extr._ratelimit = Mock()
+        extr._ratelimit.reserve.return_value = 0.0
+        extr._interval = lambda: 0.5
+
+        response = Mock(status_code=500, reason="Error", url=URL, headers={})
+        session = Mock()
+        session.request.return_value = response
+
+        previous = []
+
+        def delay(url, tries, prev=0.0, headers=None):
+            previous.append(prev)
+            return tries * 10.0
+        extr._retry.delay = delay
+
+        with patch.object(extr, "sleep") as sleep, \
+                self.assertRaises(exception.HttpError):
+            extr.request(URL, session=session, retries=3)
+
+        # the backoff delay does not get replaced by other delays
+        self.assertEqual(previous, [0.0, 10.0, 20.0])
+        self.assertEqual(
+            [c[0] for c in sleep.call_args_list if c[0][1] == "retry"],
+            [(10.0, "retry"), (20.0, "retry"), (30.0, "retry")])
+
+    def test_handle_429_ratelimit(self):
+        extr = extractor.find(URL)
+        extr.initialize()
+        extr._ratelimit = Mock()
+        extr._ratelimit.reserve.return_value = 0.0
+        extr._handle_429 = Mock(return_value=True)
+
+        session = Mock()
+        session.request.side_effect = (
+            Mock(status_code=429, reason="Too Many Requests", url=URL,
+                 headers={"Retry-After": "30"}),
+            Mock(status_code=200, headers={}),
+        )
+
+        response = extr.request(URL, session=session)
+        self.assertEqual(response.status_code, 200)
+
+        # the rate limit backs off even when '_handle_429()' handles it
+        extr._handle_429.assert_called_once()
+        extr._ratelimit.penalize.assert_called_once_with(URL, "30")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Copyright 2026 Mike Fährmann
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License version 2 as
+# published by the Free Software Foundation.
+
+import os
+import sys
+import unittest
+
+import re
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from gallery_dl import urlindex  # noqa E402
+from gallery_dl.urlindex import HOST, SUFFIX, PREFIX  # noqa E402
+
+
+class Pattern():
+
+    def __init__(self, pattern):
+        self.pattern = re.compile(pattern)
+
+
+class TestPatternKeys(unittest.TestCase):
+
+    def _keys(self, pattern):
+        return urlindex.pattern_keys(pattern)
+
+    def test_host(self):
+        self.assertEqual(
+            self._keys(r"(?:https?://)?(?:www\.)?example\.org/(\d+)"),
+            {(HOST, "example.org"), (HOST, "www.example.org")},
+        )
+        self.assertEqual(
+            self._keys(r"(?i)https://(?:EXAMPLE\.(?:org|net))(?:/|$)"),
+            {(HOST, "example.org"), (HOST, "example.net")},
+        )
+        self.assertEqual(
+            self._keys(r"https?://example\.org[/?#]"),
+            {(HOST, "example.org")},
+        )
+
+    def test_suffix(self):
+        self.assertEqual(
+            self._keys(r"(?:https?://)?([\w-]+)\.example\.org/(\d+)"),
+            {(SUFFIX, "example.org")},
+        )
+        self.assertEqual(
+            self._keys(r"(?:https?://)?(?:[\w-]+\.)?example\.org/?$"),
+            {(SUFFIX, "example.org"), (HOST, "example.org")},
+        )
+
+    def test_prefix(self):
+        self.assertEqual(
+            self._keys(r"(?i)(?:g(?:eneric)?:)(.+)"),
+            {(PREFIX, "g:"), (PREFIX, "generic:")},
+        )
+        self.assertEqual(
+            self._keys(r"https://example\.org(?::\d+)?/"),
+            {(PREFIX, "https://example."), (HOST, "example.org")},
+        )
+
+        # a host name ending with a literal does not guarantee
+        # that match() stops at its end
+        self.assertEqual(
+            self._keys(r"example\.org"),
+            {(PREFIX, "example.org")},
+        )
+        self.assertEqual(
+            self._keys(r"https:/+example\.org/"),
+            {(PREFIX, "https:/")},
+        )
+
+    def test_fallback(self):
+        self.assertIsNone(self._keys(r"(.*)"))
+        self.assertIsNone(self._keys(r"(?:https?://)?([^/]+)/"))
+        self.assertIsNone(self._keys(r"(?:https?://)?.+\.example\.org/"))
+        self.assertIsNone(self._keys(r"(?:https?://)?\w+\.example\.\w+/"))
+        self.assertIsNone(self._keys(r"("))
+
+
+class TestPatternIndex(unittest.TestCase):
+
+    def test_candidates(self):
+        patterns = [
+            Pattern(r"(?:https?://)?(?:www\.)?example\.org/(\d+)"),
+            Pattern(r"(?:https?://)?([\w-]+)\.example\.org/?$"),
+            Pattern(r"(?:https?://)?example\.net/"),
+            Pattern(r"ex:(.+)"),
+            Pattern(r"(?:https?://)?([^/?#]+)/(.+)\.jpg"),
+        ]
+        index = urlindex.PatternIndex(patterns)
+        p1, p2, p3, p4, p5 = patterns
+
+        def candidates(url):
+            return index.candidates(url)
+
+        self.assertEqual(candidates("https://example.org/123"), [p1, p5])
+        self.assertEqual(candidates("WWW.EXAMPLE.ORG/123"), [p1, p2, p5])
+        self.assertEqual(candidates("http://a.b.example.org"), [p2, p5])
+        self.assertEqual(candidates("https://example.net/"), [p3, p5])
+        self.assertEqual(candidates("ex:foobar"), [p4, p5])
+        self.assertEqual(candidates("https://example.com/"), [p5])
+        self.assertEqual(candidates(""), [p5])
+        self.assertEqual(candidates("https://example.org/\n"), patterns)
+        self.assertEqual(candidates("https://exämple.org/"), patterns)
+
+        with self.assertRaises(TypeError):
+            candidates(None)
+
+    def test_update(self):
+        patterns = [Pattern(r"(?:https?://)?example\.org/")]
+        index = urlindex.PatternIndex(patterns)
+        self.assertEqual(len(index.candidates("example.net/")), 0)
+
+        patterns.append(Pattern(r"(?:https?://)?example\.net/"))
+        self.assertEqual(index.candidates("example.net/"), [patterns[1]])
+        self.assertEqual(index.candidates("example.org/"), [patterns[0]])
+
+
+if __name__ == "__main__":
+    unittest.main()